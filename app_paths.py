@@ -0,0 +1,23 @@
+"""Per-user locations for files the app writes."""
+import os
+import sys
+
+APP_DIR_NAME = "PeakAimAssistant"
+
+
+def user_cache_dir():
+    """Directory for regenerable data such as pre-scaled images"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+        return os.path.join(base, APP_DIR_NAME, 'cache')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, APP_DIR_NAME.lower())
+
+
+def user_config_dir():
+    """Directory for settings that should survive updates and reinstalls"""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
+        return os.path.join(base, APP_DIR_NAME)
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, APP_DIR_NAME.lower())
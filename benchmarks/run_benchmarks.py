@@ -0,0 +1,334 @@
+"""Benchmarks for the engine and the GUI, with results written as JSON.
+
+Runs anywhere: input comes from MemoryInputBackend and the Qt parts use the
+offscreen platform unless QT_QPA_PLATFORM is already set.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --only latency throughput
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from input_backend import MemoryInputBackend, MonotonicClock
+from input_trace import TraceWriter
+from macro_engine import MacroEngine
+
+BURST_EVENTS = 10_000
+
+
+def nanoseconds_summary(samples):
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'mean_ns': int(statistics.fmean(samples)),
+        'p50_ns': samples[len(samples) // 2],
+        'p99_ns': samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+        'min_ns': samples[0],
+        'max_ns': samples[-1],
+    }
+
+
+def latency_summary(stats):
+    return {name: getattr(stats, name).summary() for name in ('press', 'release')}
+
+
+def mash_replay(count, seed=1):
+    """Deterministic key-mashing sequence: E/Q edges with the odd right click"""
+    rng = random.Random(seed)
+    down = set()
+    events = []
+    while len(events) < count:
+        if rng.random() < 0.05:
+            events.append(('mouse', 'right', True))
+            events.append(('mouse', 'right', False))
+            continue
+        key = rng.choice('eq')
+        events.append(('key', key, key not in down))
+        down ^= {key}
+    return events[:count]
+
+
+def feed(backend, events):
+    for kind, name, pressed in events:
+        if kind == 'key':
+            if pressed:
+                backend.key_down(name)
+            else:
+                backend.key_up(name)
+        elif pressed:
+            backend.mouse_down(name)
+        else:
+            backend.mouse_up(name)
+
+
+def bench_latency(iterations):
+    """Trigger edge to aim press/release, inline and across the engine thread"""
+    results = {}
+
+    backend = MemoryInputBackend(MonotonicClock())
+    engine = MacroEngine(backend)
+    engine.start()
+    engine.set_enabled(True)
+    engine.pump()
+    engine.latency.reset()
+    for i in range(iterations):
+        key = 'e' if i % 2 else 'q'
+        backend.key_down(key)
+        engine.pump()
+        backend.key_up(key)
+        engine.pump()
+    engine.stop()
+    results['inline'] = latency_summary(engine.latency)
+
+    backend = MemoryInputBackend(MonotonicClock())
+    engine = MacroEngine(backend)
+    thread = threading.Thread(target=engine.run)
+    thread.start()
+    engine.set_enabled(True)
+    time.sleep(0.05)
+    engine.latency.reset()
+    for i in range(iterations):
+        key = 'e' if i % 2 else 'q'
+        backend.key_down(key)
+        # Give the engine thread time to go back to sleep, like real typing
+        time.sleep(0.0005)
+        backend.key_up(key)
+        time.sleep(0.0005)
+    engine.shutdown()
+    thread.join()
+    results['threaded'] = latency_summary(engine.latency)
+    return results
+
+
+def bench_throughput(bursts):
+    """Events per second the engine absorbs from 10k-event mashing bursts"""
+    events = mash_replay(BURST_EVENTS)
+
+    def run_inline(trace=None):
+        backend = MemoryInputBackend()
+        engine = MacroEngine(backend, trace=trace)
+        engine.start()
+        engine.set_enabled(True)
+        engine.pump()
+        feed(backend, events)
+        began = time.perf_counter_ns()
+        engine.pump()
+        elapsed = time.perf_counter_ns() - began
+        engine.stop()
+        return elapsed
+
+    inline = [run_inline() for _ in range(bursts)]
+
+    # Same bursts with input tracing on, to keep its overhead visible
+    traced = []
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(bursts):
+            trace = TraceWriter(os.path.join(directory, f'{index}.patrace'))
+            traced.append(run_inline(trace))
+            trace.close()
+
+    threaded = []
+    overflowed = 0
+    for _ in range(bursts):
+        backend = MemoryInputBackend(MonotonicClock())
+        engine = MacroEngine(backend)
+        thread = threading.Thread(target=engine.run)
+        thread.start()
+        engine.set_enabled(True)
+        time.sleep(0.02)
+        began = time.perf_counter_ns()
+        feed(backend, events)
+        # Shutdown is queued behind the burst, so join() waits for all of it
+        engine.shutdown()
+        thread.join()
+        threaded.append(time.perf_counter_ns() - began)
+        overflowed += engine.queue.overflowed
+
+    def rate(durations):
+        best = min(durations)
+        return {
+            'events': BURST_EVENTS,
+            'bursts': len(durations),
+            'best_ns': best,
+            'median_ns': int(statistics.median(durations)),
+            'events_per_second': int(BURST_EVENTS * 1_000_000_000 / best),
+        }
+
+    results = {'dispatch': rate(inline), 'dispatch_traced': rate(traced), 'producer_to_engine': rate(threaded)}
+    results['producer_to_engine']['overflowed'] = overflowed
+    return results
+
+
+def bench_idle(seconds):
+    """Engine thread wakeups with no input: disabled, enabled, and holding a trigger"""
+    results = {}
+    for case in ('disabled', 'enabled', 'holding'):
+        backend = MemoryInputBackend(MonotonicClock())
+        engine = MacroEngine(backend)
+        thread = threading.Thread(target=engine.run)
+        thread.start()
+        engine.set_enabled(case != 'disabled')
+        if case == 'holding':
+            backend.key_down('e')
+        time.sleep(0.1)
+        before = engine.wakeups.total
+        time.sleep(seconds)
+        wakeups = engine.wakeups.total - before
+        engine.shutdown()
+        thread.join()
+        results[case] = {
+            'seconds': seconds,
+            'wakeups': wakeups,
+            'wakeups_per_minute': round(wakeups * 60 / seconds, 1),
+        }
+    return results
+
+
+QT_APP = []
+
+
+def qt_app():
+    """The one QApplication, kept referenced for the whole run"""
+    if not QT_APP:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication(sys.argv[:1])
+        app.setQuitOnLastWindowClosed(False)
+        QT_APP.append(app)
+    return QT_APP[0]
+
+
+def bench_overlay(iterations):
+    """Per-call cost of OverlayWindow.update_status, changing and unchanged"""
+    qt_app()
+    from peak_aim_gui import OverlayWindow
+    overlay = OverlayWindow()
+
+    states = [(False, False), (True, False), (True, True), (False, True)]
+    changed = []
+    for i in range(iterations):
+        active, scope_open = states[i % len(states)]
+        began = time.perf_counter_ns()
+        overlay.update_status(active, scope_open, True)
+        changed.append(time.perf_counter_ns() - began)
+
+    unchanged = []
+    for _ in range(iterations):
+        began = time.perf_counter_ns()
+        overlay.update_status(False, True, True)
+        unchanged.append(time.perf_counter_ns() - began)
+
+    overlay.deleteLater()
+    return {'changed': nanoseconds_summary(changed), 'unchanged': nanoseconds_summary(unchanged)}
+
+
+def bench_startup(iterations):
+    """MainWindow construction to first hook, minimized and with the window shown"""
+    app = qt_app()
+    import peak_aim_gui
+    from control_socket import PIPE_NAME, NamedPipeTransport, UnixSocketTransport
+    from profiles import FakeForegroundProvider
+    from settings_store import SettingsStore
+
+    results = {}
+    # Stats and the image cache go to one private directory for the whole run,
+    # so pre-scaled images are cached after the first window as in real use
+    with tempfile.TemporaryDirectory() as data_dir:
+        for start_minimized in (True, False):
+            samples = []
+            for _ in range(iterations):
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, 'settings.json')
+                    store = SettingsStore(path, legacy_path=os.path.join(directory, 'legacy.json'))
+                    settings, _ = store.load()
+                    settings['start_minimized'] = start_minimized
+                    store.write(settings)
+
+                    # A private control endpoint, so a running instance keeps its own
+                    if sys.platform == 'win32':
+                        transport = NamedPipeTransport(f"{PIPE_NAME}-bench-{os.getpid()}")
+                    else:
+                        transport = UnixSocketTransport(os.path.join(directory, 'control.sock'))
+                    began = time.perf_counter_ns()
+                    window = peak_aim_gui.MainWindow(MemoryInputBackend(), store, FakeForegroundProvider(),
+                                                     control_transport=transport, data_dir=data_dir)
+                    samples.append(time.perf_counter_ns() - began)
+
+                    window.settings_watcher.stop()
+                    window.control_server.stop()
+                    window.profile_switcher.stop()
+                    window.macro_thread.stop()
+                    window.macro_thread.wait()
+                    window.settings_store.flush()
+                    window.tray_icon.hide()
+                    window.overlay.close()
+                    window.close()
+                    window.deleteLater()
+                    app.processEvents()
+            results['minimized' if start_minimized else 'shown'] = nanoseconds_summary(samples)
+    results['import'] = peak_aim_gui.STARTUP.to_dict()
+    return results
+
+
+BENCHMARKS = {
+    'latency': (bench_latency, 2000),
+    'throughput': (bench_throughput, 5),
+    'idle': (bench_idle, 3),
+    'overlay': (bench_overlay, 20000),
+    'startup': (bench_startup, 5),
+}
+
+
+def environment():
+    info = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+    try:
+        from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+        info['qt'] = QT_VERSION_STR
+        info['pyqt'] = PYQT_VERSION_STR
+    except ImportError:
+        pass
+    return info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Peak & Aim Assistant benchmarks.")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply every iteration count")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        function, iterations = BENCHMARKS[name]
+        print(f"running {name}...", file=sys.stderr, flush=True)
+        results[name] = function(max(1, int(iterations * args.scale)))
+
+    report = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Table-driven key bindings: which trigger keys hold which output, and when not."""
+from timeline import STEP_PRESS, STEP_RELEASE
+
+# Output name that stands for the configured aim button
+AIM_OUTPUT = "Aim Button"
+
+# Conditions a rule can be inhibited by, as bits of MacroEngine.conditions
+COND_SCOPE = 1
+CONDITIONS = {
+    'scope': COND_SCOPE,
+}
+
+# Hold the aim key while E or Q is down and the scope is not active.
+#
+# A rule may give a "sequence" instead of (or as well as) an output: steps
+# such as {'at_ms': 0, 'press': 'Q'}, {'at_ms': 15, 'press': AIM_OUTPUT}
+# run at those offsets once the rule activates. If the rule deactivates
+# first, the remaining steps are skipped and keys the sequence still holds
+# are released in reverse press order.
+DEFAULT_BINDINGS = [
+    {'name': "Peak & Aim", 'triggers': ['E', 'Q'], 'inhibit': ['scope'], 'output': AIM_OUTPUT},
+]
+
+
+class BindingError(ValueError):
+    pass
+
+
+class CompiledBindings:
+    """Binding rules flattened into lookup tables and bitmasks.
+
+    Every trigger key gets one bit. For rule i, trigger_masks[i] has the bits
+    of its trigger keys, inhibit_masks[i] the condition bits that suppress it
+    and outputs[i] the lowercase key it holds (None for a sequence-only
+    rule). sequences[i] holds (offset_ns, STEP_*, key) steps sorted by
+    offset, empty for plain rules. output_keys lists every key a rule can
+    press, for resolving them once up front. key_rules and condition_rules
+    map a key or condition to the rules it can affect, so an input event only
+    touches those rules.
+    """
+
+    def __init__(self, rules, aim_button):
+        self.rules = rules
+        self.key_bits = {}
+        self.key_rules = {}
+        self.condition_rules = {bit: () for bit in CONDITIONS.values()}
+        self.names = []
+        self.trigger_masks = []
+        self.inhibit_masks = []
+        self.outputs = []
+        self.sequences = []
+
+        for index, rule in enumerate(rules):
+            triggers = rule.get('triggers') or []
+            if not triggers:
+                raise BindingError(f"Binding {index + 1} has no trigger keys")
+
+            trigger_mask = 0
+            for trigger in triggers:
+                key = str(trigger).lower()
+                if key not in self.key_bits:
+                    self.key_bits[key] = 1 << len(self.key_bits)
+                    self.key_rules[key] = ()
+                trigger_mask |= self.key_bits[key]
+                if index not in self.key_rules[key]:
+                    self.key_rules[key] += (index,)
+
+            inhibit_mask = 0
+            for condition in rule.get('inhibit') or []:
+                bit = CONDITIONS.get(str(condition).lower())
+                if bit is None:
+                    raise BindingError(f"Unknown inhibit condition '{condition}'")
+                inhibit_mask |= bit
+                self.condition_rules[bit] += (index,)
+
+            sequence = compile_sequence(rule.get('sequence') or [], aim_button, index)
+            output = rule.get('output') or (None if sequence else AIM_OUTPUT)
+            if output == AIM_OUTPUT:
+                output = aim_button
+            self.names.append(rule.get('name') or f"Binding {index + 1}")
+            self.trigger_masks.append(trigger_mask)
+            self.inhibit_masks.append(inhibit_mask)
+            self.outputs.append(str(output).lower() if output else None)
+            self.sequences.append(sequence)
+
+        self.trigger_keys = tuple(self.key_bits)
+        self.rule_count = len(self.outputs)
+        output_keys = [output for output in self.outputs if output]
+        output_keys += [key for sequence in self.sequences for _, _, key in sequence]
+        self.output_keys = tuple(dict.fromkeys(output_keys))
+
+
+def compile_sequence(steps, aim_button, index):
+    compiled = []
+    for step in steps:
+        if 'press' in step:
+            action, key = STEP_PRESS, step['press']
+        elif 'release' in step:
+            action, key = STEP_RELEASE, step['release']
+        else:
+            raise BindingError(f"Binding {index + 1} has a sequence step without 'press' or 'release'")
+        try:
+            at_ms = float(step.get('at_ms', 0))
+        except (TypeError, ValueError):
+            raise BindingError(f"Binding {index + 1} has a non-numeric step offset '{step.get('at_ms')}'")
+        if at_ms < 0:
+            raise BindingError(f"Binding {index + 1} has a negative step offset")
+        if key == AIM_OUTPUT:
+            key = aim_button
+        compiled.append((int(at_ms * 1_000_000), action, str(key).lower()))
+    # Stable sort: steps at the same offset keep their written order
+    compiled.sort(key=lambda step: step[0])
+    return tuple(compiled)
+
+
+def compile_bindings(rules, aim_button):
+    return CompiledBindings(rules or DEFAULT_BINDINGS, aim_button)
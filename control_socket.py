@@ -0,0 +1,326 @@
+"""Local control endpoint for toggling and querying the running instance.
+
+The protocol is one command per line and one reply line per command:
+
+    toggle            -> ok
+    status            -> ok {"enabled": true, "scope_open": false, ...}
+    profile [NAME]    -> ok {"profile": "Default"}
+    stats             -> ok {"peeks": 12, ...}
+    show              -> ok                 (GUI only)
+
+Failures reply "error <message>". On Linux and macOS the endpoint is a
+Unix domain socket, so scripts can also talk to it with socat or nc -U;
+on Windows it is a named pipe carrying the same lines as messages.
+
+    python control_socket.py status
+"""
+import json
+import os
+import socket
+import sys
+import threading
+
+from app_paths import user_cache_dir
+from event_log import EVENT_LOG
+
+SOCKET_FILE_NAME = "control.sock"
+PIPE_NAME = r"\\.\pipe\PeakAimAssistant-control"
+CONNECT_TIMEOUT_SECONDS = 1.0
+MAX_LINE_BYTES = 4096
+
+
+class ControlError(Exception):
+    """The running instance replied with an error or dropped the connection"""
+
+
+class NotRunningError(ControlError):
+    """Nothing is listening on the control endpoint"""
+
+
+class UnixChannel:
+    """One connection over a Unix domain socket, read and written by line"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile('rb')
+
+    def read_line(self):
+        """Next line without the newline, or None once the peer has gone"""
+        try:
+            line = self.reader.readline(MAX_LINE_BYTES)
+        except OSError:
+            return None
+        if not line:
+            return None
+        return line.decode('utf-8', 'replace').rstrip('\r\n')
+
+    def write_line(self, text):
+        self.sock.sendall(text.encode('utf-8') + b"\n")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+class UnixSocketTransport:
+    """Unix domain socket in the cache directory, readable only by this user"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_cache_dir(), SOCKET_FILE_NAME)
+
+    def listen(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Only the instance lock holder listens, so a file left here belongs
+        # to a process that died without cleaning up
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(4)
+        return listener
+
+    def accept(self, listener):
+        sock, _ = listener.accept()
+        return UnixChannel(sock)
+
+    def connect(self, timeout=CONNECT_TIMEOUT_SECONDS):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return UnixChannel(sock)
+
+    def close(self, listener):
+        listener.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class PipeChannel:
+    """One named pipe connection; each message carries one line"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def read_line(self):
+        try:
+            data = self.connection.recv_bytes(MAX_LINE_BYTES)
+        except (EOFError, OSError):
+            return None
+        return data.decode('utf-8', 'replace').rstrip('\r\n')
+
+    def write_line(self, text):
+        self.connection.send_bytes(text.encode('utf-8'))
+
+    def close(self):
+        self.connection.close()
+
+
+class NamedPipeTransport:
+    """Windows named pipe through multiprocessing.connection"""
+
+    def __init__(self, name=PIPE_NAME):
+        self.name = name
+
+    def listen(self):
+        from multiprocessing.connection import Listener
+        return Listener(self.name, family='AF_PIPE')
+
+    def accept(self, listener):
+        return PipeChannel(listener.accept())
+
+    def connect(self, timeout=CONNECT_TIMEOUT_SECONDS):
+        from multiprocessing.connection import Client
+        # Client() waits for a busy pipe on its own; a missing pipe raises
+        # FileNotFoundError right away
+        return PipeChannel(Client(self.name, family='AF_PIPE'))
+
+    def close(self, listener):
+        listener.close()
+
+
+def default_transport():
+    if sys.platform == 'win32':
+        return NamedPipeTransport()
+    return UnixSocketTransport()
+
+
+class ControlServer:
+    """Accepts connections on a background thread and answers commands.
+
+    commands maps a command word to a function taking the rest of the line
+    (possibly empty) and returning a JSON-serializable payload or None.
+    Functions run on the connection's thread, so anything that touches
+    the GUI has to hand the work to the Qt thread itself.
+    """
+
+    def __init__(self, commands, transport=None):
+        self.commands = commands
+        self.transport = transport or default_transport()
+        self.listener = None
+        self.thread = None
+        self.stopping = False
+        self.handled = 0
+
+    def start(self):
+        """Start listening; False if the endpoint could not be created"""
+        try:
+            self.listener = self.transport.listen()
+        except OSError:
+            return False
+        self.thread = threading.Thread(target=self.accept_loop, name="ControlServer", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        if self.listener is None:
+            return
+        self.stopping = True
+        # A throwaway connection wakes the blocking accept on every platform
+        try:
+            self.transport.connect(0.2).close()
+        except OSError:
+            pass
+        if self.thread is not None:
+            self.thread.join(1.0)
+        self.transport.close(self.listener)
+        self.listener = None
+
+    def accept_loop(self):
+        while not self.stopping:
+            try:
+                channel = self.transport.accept(self.listener)
+            except OSError:
+                break
+            if self.stopping:
+                channel.close()
+                break
+            threading.Thread(target=self.serve, args=(channel,), name="ControlConnection", daemon=True).start()
+
+    def serve(self, channel):
+        try:
+            while True:
+                line = channel.read_line()
+                if line is None:
+                    break
+                if not line.strip():
+                    continue
+                channel.write_line(self.handle(line))
+        except OSError:
+            pass
+        finally:
+            channel.close()
+
+    def handle(self, line):
+        word, _, argument = line.strip().partition(' ')
+        command = self.commands.get(word.lower())
+        if command is None:
+            return f"error unknown command '{word}'"
+        try:
+            payload = command(argument.strip())
+        except ControlError as e:
+            return f"error {e}"
+        except Exception as e:
+            EVENT_LOG.error('control', 'command_failed', {'command': word}, e)
+            return f"error {word} failed: {e}"
+        self.handled += 1
+        if payload is None:
+            return "ok"
+        return "ok " + json.dumps(payload)
+
+
+class ControlClient:
+    """Connection to the running instance; reusable for several commands"""
+
+    def __init__(self, transport=None, timeout=CONNECT_TIMEOUT_SECONDS):
+        self.transport = transport or default_transport()
+        try:
+            self.channel = self.transport.connect(timeout)
+        except OSError as e:
+            raise NotRunningError(f"Peak & Aim Assistant is not running ({e})") from None
+
+    def send(self, line):
+        """Send one command; returns the reply payload (None for a bare ok)"""
+        try:
+            self.channel.write_line(line)
+            reply = self.channel.read_line()
+        except OSError as e:
+            raise ControlError(f"Lost connection to the running instance ({e})") from None
+        if reply is None:
+            raise ControlError("The running instance closed the connection")
+        status, _, payload = reply.partition(' ')
+        if status != 'ok':
+            raise ControlError(payload or reply)
+        return json.loads(payload) if payload else None
+
+    def close(self):
+        self.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def send_command(line, transport=None):
+    with ControlClient(transport) as client:
+        return client.send(line)
+
+
+def engine_status(engine, profile_name):
+    """Payload of the status command, read without stopping the engine"""
+    active, scope_open, aim_held = engine.status.state
+    return {
+        'enabled': engine.enabled,
+        'scope_open': scope_open,
+        'aim_held': aim_held,
+        'profile': profile_name,
+        'engine_mode': engine.engine_mode,
+    }
+
+
+def engine_stats(engine):
+    """Payload of the stats command: session counters and hold percentiles"""
+    stats = engine.stats
+    stats.aggregate()
+    payload = stats.snapshot()
+    holds = stats.hold_histogram
+    payload['holds'] = holds.count
+    if holds.count:
+        payload['hold_p50_ms'] = holds.percentile(50) / 1_000_000
+        payload['hold_p90_ms'] = holds.percentile(90) / 1_000_000
+        payload['hold_max_ms'] = holds.max / 1_000_000
+    payload['wakeups'] = engine.wakeups.total
+    payload['log_dropped'] = EVENT_LOG.dropped
+    return payload
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: control_socket.py COMMAND [ARGUMENT]", file=sys.stderr)
+        return 2
+    try:
+        payload = send_command(" ".join(argv))
+    except ControlError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if payload is not None:
+        print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
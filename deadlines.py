@@ -0,0 +1,99 @@
+"""Deadline scheduler used by the engine thread to sleep until work is due."""
+import heapq
+
+
+class DeadlineScheduler:
+    """At most one pending deadline per name, ordered in a heap.
+
+    Re-arming a name replaces its previous deadline; cancelled entries are
+    left in the heap and skipped when they reach the top.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.seq = 0
+        self.fired = 0
+
+    def arm(self, name, deadline_ns, callback):
+        old = self.entries.get(name)
+        if old is not None:
+            old[3] = None
+        self.seq += 1
+        entry = [deadline_ns, self.seq, name, callback]
+        self.entries[name] = entry
+        heapq.heappush(self.heap, entry)
+
+    def cancel(self, name):
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            entry[3] = None
+
+    def armed(self, name):
+        return name in self.entries
+
+    def deadline(self, name):
+        entry = self.entries.get(name)
+        return entry[0] if entry is not None else None
+
+    def next_deadline(self):
+        """Earliest pending deadline in ns, or None when nothing is armed"""
+        heap = self.heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_due(self, now_ns, on_error=None):
+        """Fire every callback whose deadline is at or before now_ns.
+
+        If on_error is given, a callback that raises is reported as
+        on_error(name, exception) and the remaining due callbacks still run.
+        """
+        heap = self.heap
+        while heap and heap[0][0] <= now_ns:
+            deadline_ns, _, name, callback = heapq.heappop(heap)
+            if callback is None:
+                continue
+            del self.entries[name]
+            self.fired += 1
+            if on_error is None:
+                callback(now_ns)
+                continue
+            try:
+                callback(now_ns)
+            except Exception as e:
+                on_error(name, e)
+
+
+class WakeupCounter:
+    """Counts engine thread wakeups, split by cause, with a one-minute rate.
+
+    Wakeups land in one-second buckets of a 60-slot ring, so the rate
+    covers the last minute without keeping a timestamp per wakeup.
+    """
+
+    CAUSES = ('input', 'deadline')
+
+    def __init__(self):
+        self.total = 0
+        self.by_cause = dict.fromkeys(self.CAUSES, 0)
+        self.buckets = [0] * 60
+        self.bucket_seconds = [-1] * 60
+
+    def record(self, now_ns, cause):
+        self.total += 1
+        self.by_cause[cause] += 1
+        second = now_ns // 1_000_000_000
+        index = second % 60
+        if self.bucket_seconds[index] != second:
+            self.bucket_seconds[index] = second
+            self.buckets[index] = 0
+        self.buckets[index] += 1
+
+    def per_minute(self, now_ns):
+        """Wakeups during the last 60 seconds"""
+        oldest = now_ns // 1_000_000_000 - 59
+        return sum(count for count, second in zip(self.buckets, self.bucket_seconds) if second >= oldest)
+
+    def to_dict(self, now_ns):
+        return {'total': self.total, 'per_minute': self.per_minute(now_ns), **self.by_cause}
@@ -0,0 +1,199 @@
+"""Profiling mode: cProfile per thread and tracemalloc snapshots, written as text reports."""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from app_paths import user_cache_dir
+
+SNAPSHOT_INTERVAL_S = 60.0
+TRACE_FRAMES = 8
+TOP_FUNCTIONS = 60
+TOP_ALLOCATIONS = 25
+# Per report file; a longer report is cut off with a note
+MAX_REPORT_BYTES = 256 * 1024
+KEEP_SESSIONS = 5
+REPORT_SUFFIX = '.txt'
+
+
+def diagnostics_dir():
+    return os.path.join(user_cache_dir(), 'diagnostics')
+
+
+def prune_sessions(directory, keep=KEEP_SESSIONS):
+    """Delete report files of all but the newest `keep` sessions"""
+    names = [name for name in os.listdir(directory) if name.endswith(REPORT_SUFFIX)]
+    # Files of one session share the "profile-<date>-<time>" prefix
+    sessions = sorted({name.rsplit('-', 1)[0] for name in names})
+    stale = set(sessions[:max(0, len(sessions) - keep)])
+    for name in names:
+        if name.rsplit('-', 1)[0] in stale:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+class CappedReport:
+    """Text file that stops growing at MAX_REPORT_BYTES"""
+
+    def __init__(self, path, limit=MAX_REPORT_BYTES):
+        self.path = path
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+
+    def write(self, text):
+        if self.truncated:
+            return
+        data = text.encode('utf-8')
+        if self.size + len(data) > self.limit:
+            data = data[:max(0, self.limit - self.size)] + b"\n[report truncated at size limit]\n"
+            self.truncated = True
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        self.size += len(data)
+
+
+class ProfilingSession:
+    """cProfile over the engine thread and the calling (Qt or main) thread, plus tracemalloc growth"""
+    # From 3.12 cProfile runs on sys.monitoring, which allows one profiler
+    # per process; only the engine thread is profiled there
+    PROFILE_MAIN_THREAD = sys.version_info < (3, 12)
+
+    def __init__(self, engine, main_name='qt', directory=None, interval=SNAPSHOT_INTERVAL_S):
+        self.engine = engine
+        self.main_name = main_name
+        self.directory = directory or diagnostics_dir()
+        self.interval = interval
+        self.prefix = None
+        self.main_profiler = None
+        self.engine_profiler = None
+        self.snapshot_thread = None
+        self.report_thread = None
+        self.stopping = threading.Event()
+        self.baseline = None
+        self.memory_report = None
+        self.started = None
+
+    @property
+    def active(self):
+        return self.prefix is not None
+
+    def path(self, kind):
+        return os.path.join(self.directory, f"{self.prefix}-{kind}{REPORT_SUFFIX}")
+
+    def start(self):
+        """Begin profiling; call it on the thread whose time should be measured"""
+        if self.active:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        prune_sessions(self.directory, KEEP_SESSIONS - 1)
+        stamp = time.strftime('profile-%Y%m%d-%H%M%S')
+        self.prefix = stamp
+        count = 1
+        while os.path.exists(self.path('memory')):
+            count += 1
+            self.prefix = f"{stamp}-{count}"
+        self.started = time.monotonic()
+
+        tracemalloc.start(TRACE_FRAMES)
+        self.baseline = self.take_snapshot()
+        self.memory_report = CappedReport(self.path('memory'))
+        self.stopping.clear()
+        self.snapshot_thread = threading.Thread(target=self.snapshot_loop, name="ProfilingSnapshots", daemon=True)
+        self.snapshot_thread.start()
+
+        self.engine_profiler = cProfile.Profile()
+        self.engine.post(self.engine_profiler.enable)
+        if self.PROFILE_MAIN_THREAD:
+            self.main_profiler = cProfile.Profile()
+            self.main_profiler.enable()
+
+    def stop(self):
+        """Stop every profiler and write the reports; returns their paths"""
+        if not self.active:
+            return []
+        paths = [self.path('engine')]
+        if self.main_profiler is not None:
+            self.main_profiler.disable()
+            paths.append(self.write_profile(self.main_name, self.main_profiler))
+        disabled = threading.Event()
+        engine_profiler = self.engine_profiler
+
+        def disable_engine_profiler():
+            engine_profiler.disable()
+            disabled.set()
+        self.engine.post(disable_engine_profiler)
+
+        self.stopping.set()
+        self.snapshot_thread.join(2.0)
+        self.write_memory(final=True)
+        tracemalloc.stop()
+        paths.append(self.memory_report.path)
+
+        # The engine report is written once the engine thread has switched
+        # its profiler off, so the caller (often the Qt thread) never waits
+        elapsed = time.monotonic() - self.started
+        self.report_thread = threading.Thread(target=self.write_engine_profile,
+                                              args=(self.path('engine'), engine_profiler, disabled, elapsed),
+                                              name="ProfilingReport")
+        self.report_thread.start()
+        self.prefix = None
+        self.main_profiler = self.engine_profiler = None
+        self.baseline = None
+        return paths
+
+    def write_engine_profile(self, path, profiler, disabled, elapsed):
+        # An engine that has already stopped never runs the disable call;
+        # its profile is written as far as it got
+        disabled.wait(1.0)
+        self.write_report(path, 'engine', profiler, elapsed)
+
+    def write_profile(self, name, profiler):
+        return self.write_report(self.path(name), name, profiler, time.monotonic() - self.started)
+
+    @staticmethod
+    def write_report(path, name, profiler, elapsed):
+        buffer = io.StringIO()
+        buffer.write(f"{name} thread, {elapsed:.0f} s profiled\n\n")
+        try:
+            stats = pstats.Stats(profiler, stream=buffer)
+        except TypeError:
+            # Nothing was recorded on that thread
+            buffer.write("No calls recorded.\n")
+        else:
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+            buffer.write("\n")
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+        report = CappedReport(path)
+        report.write(buffer.getvalue())
+        return report.path
+
+    @staticmethod
+    def take_snapshot():
+        snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def snapshot_loop(self):
+        while not self.stopping.wait(self.interval):
+            self.write_memory()
+
+    def write_memory(self, final=False):
+        snapshot = self.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        elapsed = time.monotonic() - self.started
+        lines = [f"== {'final' if final else 'snapshot'} at {elapsed:.0f} s: "
+                 f"{current / 1024:.0f} KiB traced, peak {peak / 1024:.0f} KiB",
+                 f"Top {TOP_ALLOCATIONS} growth since profiling started:"]
+        for stat in snapshot.compare_to(self.baseline, 'lineno')[:TOP_ALLOCATIONS]:
+            lines.append(f"  {stat}")
+        self.memory_report.write("\n".join(lines) + "\n\n")
@@ -0,0 +1,365 @@
+"""Engine in a child process, with shared-memory status and a control pipe.
+
+Keeps the engine out of reach of the Qt thread's GIL holds. If the parent
+exits, its end of the control pipe closes and the child shuts the engine
+down, which releases any held key.
+"""
+import gc
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from multiprocessing.sharedctypes import RawArray
+
+from control_socket import engine_stats
+from event_log import EVENT_LOG
+from input_backend import SystemInputBackend
+from input_trace import TraceWriter, new_trace_path
+from latency import LatencyStats
+from macro_engine import MacroEngine
+from profiling import profiling_session
+from session_stats import COUNTER_NAMES, SessionStats, StatsWriter
+
+# Slots of the shared status block
+SEQUENCE = 0        # odd while the child is writing the slots below
+ENABLED = 1
+SCOPE_OPEN = 2
+AIM_HELD = 3
+LAST_PRESS_NS = 4   # latest trigger -> aim press latency, for the overlay
+WAKEUPS = 5
+NOTIFY_PENDING = 6  # set by the child when it notifies, cleared by the parent's take_status()
+STATE_SLOTS = 8
+
+# Messages on the event pipe
+EVENT_STATUS = b's'
+EVENT_UNRESOLVED = b'u'   # followed by newline-separated key names
+
+HIGH_PRIORITY_CLASS = 0x00000080
+POSIX_NICE = -10
+QUERY_TIMEOUT_S = 2.0
+STOP_TIMEOUT_S = 2.0
+ENGINE_LOG_FILE_NAME = "engine-events.log"
+
+
+class EngineProcessError(OSError):
+    """The engine process is gone or did not answer in time"""
+
+
+def raise_priority():
+    """Raise this process's scheduling priority; False if the OS refused"""
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        return bool(kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), HIGH_PRIORITY_CLASS))
+    try:
+        # A negative nice value needs root or CAP_SYS_NICE
+        os.setpriority(os.PRIO_PROCESS, 0, POSIX_NICE)
+    except OSError:
+        return False
+    return True
+
+
+class SharedStatus:
+    """Status slots in shared memory, written by the child under a sequence count"""
+
+    def __init__(self, slots=None):
+        self.slots = slots if slots is not None else RawArray('q', STATE_SLOTS)
+
+    def write(self, state, last_press_ns, wakeups):
+        slots = self.slots
+        slots[SEQUENCE] += 1
+        enabled, scope_open, aim_held = state
+        slots[ENABLED] = enabled
+        slots[SCOPE_OPEN] = scope_open
+        slots[AIM_HELD] = aim_held
+        slots[LAST_PRESS_NS] = last_press_ns
+        slots[WAKEUPS] = wakeups
+        slots[SEQUENCE] += 1
+
+    def read(self):
+        """(enabled, scope open, aim held, last press ns, wakeups) as one consistent set"""
+        slots = self.slots
+        # A child that died mid-write leaves the count odd; give up eventually
+        for _ in range(1000):
+            before = slots[SEQUENCE]
+            values = slots[ENABLED:WAKEUPS + 1]
+            if not before & 1 and slots[SEQUENCE] == before:
+                break
+        return values
+
+
+def engine_commands(engine):
+    """Commands the parent may send; each runs on the child's control thread"""
+    profiling = None
+
+    def unresolved():
+        return list(engine.unresolved)
+
+    def latency():
+        texts = {name: engine.latency.describe(name) for name in LatencyStats.NAMES}
+        return texts, engine.wakeups.per_minute(engine.backend.monotonic_ns())
+
+    def export_latency(path):
+        engine.latency.export_json(path, {'timeline_steps': engine.timeline_report()})
+
+    def start_profiling():
+        nonlocal profiling
+        if profiling is None:
+            profiling = profiling_session(engine, 'control')
+        profiling.start()
+
+    def stop_profiling():
+        return profiling.stop() if profiling is not None else []
+
+    return {
+        'set_enabled': engine.set_enabled,
+        'toggle': engine.toggle,
+        'set_aim_button': engine.set_aim_button,
+        'set_bindings': engine.set_bindings,
+        'set_hotkey': engine.set_hotkey,
+        'set_engine_mode': engine.set_engine_mode,
+        'apply_profile': engine.apply_profile,
+        'unresolved': unresolved,
+        'summary': engine.stats.summary,
+        'stats': lambda: engine_stats(engine),
+        'latency': latency,
+        'export_latency': export_latency,
+        'reset_latency': engine.latency.reset,
+        'start_profiling': start_profiling,
+        'stop_profiling': stop_profiling,
+    }
+
+
+def serve_commands(engine, control, notify_unresolved):
+    commands = engine_commands(engine)
+    while True:
+        try:
+            name, args, sequence = control.recv()
+        except (EOFError, OSError):
+            # The parent exited or died without asking us to stop
+            EVENT_LOG.warning('engine_process', 'parent_gone')
+            break
+        if name == 'shutdown':
+            break
+        result = error = None
+        try:
+            result = commands[name](*args)
+        except Exception as e:
+            EVENT_LOG.error('engine_process', 'command_failed', {'command': name}, e)
+            error = f"{type(e).__name__}: {e}"
+        notify_unresolved()
+        if sequence:
+            try:
+                control.send((sequence, result, error))
+            except OSError:
+                break
+    engine.shutdown()
+
+
+def engine_main(control, events, status_slots, counters, config, backend_factory):
+    """Child process body; returns once the parent stops it or goes away"""
+    raised = raise_priority()
+    EVENT_LOG.start(file_name=ENGINE_LOG_FILE_NAME)
+    EVENT_LOG.info('engine_process', 'started', {'pid': os.getpid(), 'raised_priority': raised})
+
+    trace = None
+    if config['record_traces']:
+        try:
+            trace = TraceWriter(new_trace_path(config['trace_dir']))
+        except OSError as e:
+            EVENT_LOG.warning('engine_process', 'trace_failed', None, e)
+    engine = MacroEngine(backend_factory(), config['aim_button'], config['engine_mode'], config['bindings'],
+                         trace)
+    engine.stats = SessionStats(counters=counters)
+    if sys.platform != 'win32':
+        # A POSIX terminate() is a SIGTERM: shut down like a lost parent,
+        # releasing held keys. On Windows it is TerminateProcess, which runs
+        # nothing, so EngineProcess.stop() only uses it as a last resort.
+        signal.signal(signal.SIGTERM, lambda signum, frame: engine.shutdown())
+
+    status = SharedStatus(status_slots)
+    events_lock = threading.Lock()
+
+    def send_event(data):
+        with events_lock:
+            try:
+                events.send_bytes(data)
+            except OSError:
+                pass
+
+    def publish():
+        status.write(engine.status.take(), engine.latency.press.last, engine.wakeups.total)
+        # One byte per change the parent has read, so a stalled parent can
+        # never fill the pipe and block the engine thread
+        if not status_slots[NOTIFY_PENDING]:
+            status_slots[NOTIFY_PENDING] = 1
+            send_event(EVENT_STATUS)
+    engine.status.notify = publish
+
+    reported = 0
+
+    def notify_unresolved():
+        nonlocal reported
+        unresolved = engine.unresolved
+        if len(unresolved) > reported:
+            send_event(EVENT_UNRESOLVED + "\n".join(unresolved[reported:]).encode('utf-8'))
+            reported = len(unresolved)
+
+    stats_writer = None
+    if config['record_stats']:
+        stats_writer = StatsWriter(engine.stats, config['stats_path'])
+        stats_writer.start()
+    notify_unresolved()
+    threading.Thread(target=serve_commands, args=(engine, control, notify_unresolved),
+                     name="EngineControl", daemon=True).start()
+    # Everything allocated so far lives as long as the process; keep the
+    # collector from walking it again on every full collection
+    gc.freeze()
+    try:
+        engine.run()
+    finally:
+        if stats_writer is not None:
+            stats_writer.stop()
+        if trace is not None:
+            trace.close()
+        EVENT_LOG.info('engine_process', 'stopped', {'dropped_records': EVENT_LOG.dropped})
+        EVENT_LOG.stop()
+
+
+class EngineProcess:
+    """Parent side: starts the child, sends it commands and reads its status.
+
+    The on_* callbacks run on a reader thread, like a StatusBus notification.
+    """
+
+    def __init__(self, config, on_status=None, on_unresolved=None, on_exit=None,
+                 backend_factory=SystemInputBackend):
+        self.config = config
+        self.on_status = on_status
+        self.on_unresolved = on_unresolved
+        self.on_exit = on_exit
+        self.backend_factory = backend_factory
+        self.status = SharedStatus()
+        self.counters = RawArray('Q', len(COUNTER_NAMES))
+        self.unresolved = []
+        # Spawned, not forked, so the child holds no copy of the Qt state; the
+        # GUI starts from the Qt-free peak_aim.py so the child does not import Qt
+        self.context = multiprocessing.get_context('spawn')
+        self.control, self.child_control = self.context.Pipe()
+        self.events, self.child_events = self.context.Pipe(duplex=False)
+        self.process = None
+        self.reader = None
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.stopping = False
+
+    def start(self):
+        self.process = self.context.Process(target=engine_main, name="PeakAimEngine",
+                                            args=(self.child_control, self.child_events, self.status.slots,
+                                                  self.counters, self.config, self.backend_factory))
+        self.process.start()
+        # The parent's copies would keep the pipes open after the child exits
+        self.child_control.close()
+        self.child_events.close()
+        self.reader = threading.Thread(target=self.read_events, name="EngineEvents", daemon=True)
+        self.reader.start()
+
+    def read_events(self):
+        while True:
+            try:
+                data = self.events.recv_bytes()
+            except (EOFError, OSError):
+                break
+            if data == EVENT_STATUS:
+                if self.on_status is not None:
+                    self.on_status()
+            elif data.startswith(EVENT_UNRESOLVED):
+                self.unresolved.extend(data[1:].decode('utf-8').split("\n"))
+                if self.on_unresolved is not None:
+                    self.on_unresolved()
+        if not self.stopping:
+            EVENT_LOG.error('engine_process', 'exited_unexpectedly')
+            if self.on_exit is not None:
+                self.on_exit()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def send(self, name, *args):
+        """Send a command without waiting for it to run"""
+        with self.lock:
+            try:
+                self.control.send((name, args, 0))
+            except OSError as e:
+                raise EngineProcessError(f"Engine process is not running ({e})") from None
+
+    def query(self, name, *args):
+        """Run a command in the child and return its result"""
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+            reply = None
+            try:
+                self.control.send((name, args, sequence))
+                # Skip replies to earlier queries that timed out
+                while reply != sequence and self.control.poll(QUERY_TIMEOUT_S):
+                    reply, result, error = self.control.recv()
+            except (EOFError, OSError) as e:
+                raise EngineProcessError(f"Engine process is not running ({e})") from None
+        if reply != sequence:
+            raise EngineProcessError(f"Engine process did not answer '{name}'")
+        if error is not None:
+            raise EngineProcessError(error)
+        return result
+
+    def take_status(self):
+        """Latest (active, scope open, aim held) state; re-arms the notification"""
+        self.status.slots[NOTIFY_PENDING] = 0
+        enabled, scope_open, aim_held, _, _ = self.status.read()
+        return bool(enabled), bool(scope_open), bool(aim_held)
+
+    def read_status(self):
+        return self.status.read()
+
+    def stop(self):
+        """Ask the child over the control pipe to release everything and exit; kill it if it does not"""
+        if self.process is None:
+            return
+        self.stopping = True
+        try:
+            self.send('shutdown')
+        except EngineProcessError:
+            pass
+        self.process.join(STOP_TIMEOUT_S)
+        if self.process.is_alive():
+            EVENT_LOG.error('engine_process', 'stop_timeout', {'may_leave_keys_held': sys.platform == 'win32'})
+            # Last resort: on Windows this is TerminateProcess, which runs no cleanup
+            self.process.terminate()
+            self.process.join(1.0)
+        self.reader.join(1.0)
+        self.control.close()
+        self.events.close()
+        self.process = None
+
+
+class RemoteProfiling:
+    """ProfilingSession interface for the child's engine; the Qt thread is not profiled"""
+
+    def __init__(self, process):
+        self.process = process
+        self.active = False
+
+    def start(self):
+        if self.active:
+            return
+        self.process.query('start_profiling')
+        self.active = True
+
+    def stop(self):
+        if not self.active:
+            return []
+        self.active = False
+        return self.process.query('stop_profiling')
+
@@ -0,0 +1,195 @@
+"""Structured diagnostics log: callers append to a ring, a background thread writes the files.
+
+The writer appends one JSON object per line to events.log and rotates it at
+MAX_FILE_BYTES, keeping BACKUP_COUNT old files.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+from app_paths import user_cache_dir
+
+RING_SIZE = 4096
+FLUSH_INTERVAL_S = 0.5
+MAX_FILE_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+LOG_FILE_NAME = "events.log"
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+
+
+def log_dir():
+    return os.path.join(user_cache_dir(), 'logs')
+
+
+class RotatingFile:
+    """Append-only text file renamed to .1, .2, ... once it reaches max_bytes"""
+
+    def __init__(self, path, max_bytes=MAX_FILE_BYTES, backups=BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            self.size = os.path.getsize(path)
+        except OSError:
+            self.size = 0
+
+    def rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        if self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        self.size += len(data)
+
+
+class EventLog:
+    """Bounded ring of (time_ns, level, source, event, fields, exception) records.
+
+    Any thread may call record(); a full ring drops its oldest record and
+    counts it instead of making the caller wait.
+    """
+
+    def __init__(self, size=RING_SIZE, min_level=INFO):
+        self.size = size
+        self.min_level = min_level
+        self.records = deque(maxlen=size)
+        self.dropped = 0
+        self.reported_dropped = 0
+        self.written = 0
+        self.idle = True
+        self.activity = threading.Event()
+        self.thread = None
+        self.stopping = False
+        self.output = None
+        self.last_error = None
+
+    def record(self, level, source, event, fields=None, exc=None):
+        """Queue a record; never blocks and never raises"""
+        if level < self.min_level:
+            return
+        records = self.records
+        if len(records) == self.size:
+            # The append below pushes the oldest record out
+            self.dropped += 1
+        records.append((time.time_ns(), level, source, event, fields, exc))
+        if self.idle:
+            self.idle = False
+            self.activity.set()
+
+    def debug(self, source, event, fields=None):
+        self.record(DEBUG, source, event, fields)
+
+    def info(self, source, event, fields=None):
+        self.record(INFO, source, event, fields)
+
+    def warning(self, source, event, fields=None, exc=None):
+        self.record(WARNING, source, event, fields, exc)
+
+    def error(self, source, event, fields=None, exc=None):
+        self.record(ERROR, source, event, fields, exc)
+
+    @property
+    def path(self):
+        return self.output.path if self.output is not None else None
+
+    def start(self, directory=None, file_name=LOG_FILE_NAME):
+        """Open the log file and start the writer thread; False if the file cannot be used"""
+        if self.thread is not None:
+            return True
+        try:
+            self.output = RotatingFile(os.path.join(directory or log_dir(), file_name))
+        except OSError as e:
+            self.last_error = e
+            return False
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="EventLogWriter", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Write everything still queued and end the writer thread"""
+        if self.thread is None:
+            return
+        self.stopping = True
+        self.activity.set()
+        self.thread.join(2.0)
+        self.thread = None
+
+    def run(self):
+        while not self.stopping:
+            if self.idle:
+                self.activity.wait()
+                self.activity.clear()
+                continue
+            # Collect a burst into one write
+            self.activity.wait(FLUSH_INTERVAL_S)
+            if not self.flush():
+                self.idle = True
+                # A record that raced the flag would otherwise wait for the next one
+                if self.records:
+                    self.idle = False
+        self.flush()
+
+    def flush(self):
+        """Write queued records; False if there were none"""
+        lines = []
+        total = self.dropped
+        dropped, self.reported_dropped = total - self.reported_dropped, total
+        if dropped:
+            lines.append(json.dumps({'time': self.format_time(time.time_ns()), 'level': 'warning',
+                                     'source': 'log', 'event': 'records_dropped', 'count': dropped}))
+        records = self.records
+        while True:
+            try:
+                record = records.popleft()
+            except IndexError:
+                break
+            lines.append(self.format(record))
+        if not lines:
+            return False
+        try:
+            self.output.write("\n".join(lines) + "\n")
+            self.written += len(lines)
+        except OSError as e:
+            self.last_error = e
+        return True
+
+    @staticmethod
+    def format_time(time_ns):
+        seconds, nanoseconds = divmod(time_ns, 1_000_000_000)
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(seconds)) + f".{nanoseconds // 1000:06d}"
+
+    def format(self, record):
+        time_ns, level, source, event, fields, exc = record
+        entry = {'time': self.format_time(time_ns), 'level': LEVEL_NAMES.get(level, level),
+                 'source': source, 'event': event}
+        if fields:
+            entry.update(fields)
+        if exc is not None:
+            entry['error'] = f"{type(exc).__name__}: {exc}"
+            entry['traceback'] = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        return json.dumps(entry, default=repr)
+
+
+# Shared by every module; the entry points start and stop its writer
+EVENT_LOG = EventLog()
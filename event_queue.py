@@ -0,0 +1,159 @@
+"""Single-producer/single-consumer event rings between input threads and the engine."""
+import heapq
+import threading
+from array import array
+from collections import deque
+from operator import itemgetter
+
+# Record kinds
+EV_KEY = 1        # code: interned key id, value: 1 down / 0 up
+EV_MOUSE = 2      # code: MOUSE_BUTTON_CODES id, value: 1 down / 0 up
+EV_CONTROL = 3    # code: CTRL_* command, value: int argument, payload: object
+
+# Control commands
+CTRL_ENABLE = 1
+CTRL_TOGGLE = 2
+CTRL_CALL = 3       # payload: (function, args) run on the engine thread
+CTRL_SHUTDOWN = 4
+
+MOUSE_BUTTON_CODES = {'left': 1, 'right': 2, 'middle': 3, 'x1': 4, 'x2': 5}
+MOUSE_BUTTON_NAMES = {code: name for name, code in MOUSE_BUTTON_CODES.items()}
+
+DEFAULT_CAPACITY = 1024
+
+by_time = itemgetter(0)
+
+
+class SpscRing:
+    """Fixed-size single-producer, single-consumer ring of (t_ns, kind, code, value, payload) records.
+
+    A full ring spills into an overflow deque rather than block or drop, so
+    records always come out in push order.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, owner=None):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        # The producer thread, if known
+        self.owner = owner
+        self.mask = capacity - 1
+        self.times = array('q', [0]) * capacity
+        self.kinds = array('B', [0]) * capacity
+        self.codes = array('H', [0]) * capacity
+        self.values = array('i', [0]) * capacity
+        self.payloads = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.overflow = deque()
+        self.overflowed = 0
+
+    def __len__(self):
+        return self.tail - self.head + len(self.overflow)
+
+    def push(self, t_ns, kind, code, value=0, payload=None):
+        tail = self.tail
+        if self.overflow or tail - self.head > self.mask:
+            self.overflowed += 1
+            self.overflow.append((t_ns, kind, code, value, payload))
+            return
+        index = tail & self.mask
+        self.times[index] = t_ns
+        self.kinds[index] = kind
+        self.codes[index] = code
+        self.values[index] = value
+        self.payloads[index] = payload
+        self.tail = tail + 1
+
+    def drain(self, out):
+        """Append every published record to out, oldest first"""
+        head = self.head
+        tail = self.tail
+        mask = self.mask
+        while head < tail:
+            index = head & mask
+            out.append((self.times[index], self.kinds[index], self.codes[index],
+                        self.values[index], self.payloads[index]))
+            self.payloads[index] = None
+            head += 1
+        self.head = head
+        overflow = self.overflow
+        while overflow:
+            out.append(overflow.popleft())
+
+
+class EventQueue:
+    """One SpscRing per producer thread, merged by timestamp for a single consumer"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.local = threading.local()
+        self.rings = ()
+        self.rings_lock = threading.Lock()
+        self.prune_pending = False
+        # Overflow count of rings already pruned
+        self.pruned_overflowed = 0
+        self.wakeup = threading.Event()
+        self.waiting = False
+
+    def ring(self):
+        ring = getattr(self.local, 'ring', None)
+        if ring is None:
+            ring = SpscRing(self.capacity, threading.current_thread())
+            with self.rings_lock:
+                self.rings = self.rings + (ring,)
+                self.prune_pending = True
+            self.local.ring = ring
+        return ring
+
+    def push(self, t_ns, kind, code, value=0, payload=None):
+        ring = getattr(self.local, 'ring', None) or self.ring()
+        ring.push(t_ns, kind, code, value, payload)
+        if self.waiting:
+            self.wakeup.set()
+
+    def pending(self):
+        return any(len(ring) for ring in self.rings)
+
+    @property
+    def overflowed(self):
+        return self.pruned_overflowed + sum(ring.overflowed for ring in self.rings)
+
+    def drain(self):
+        """All queued records from every producer, in timestamp order"""
+        batches = []
+        for ring in self.rings:
+            if ring.tail != ring.head or ring.overflow:
+                batch = []
+                ring.drain(batch)
+                batches.append(batch)
+        if self.prune_pending:
+            self.prune()
+        if not batches:
+            return ()
+        if len(batches) == 1:
+            return batches[0]
+        return list(heapq.merge(*batches, key=by_time))
+
+    def prune(self):
+        """Forget drained rings whose producer thread has exited; consumer side only"""
+        with self.rings_lock:
+            self.prune_pending = False
+            live = []
+            for ring in self.rings:
+                # A dead thread pushes nothing more, so an empty ring of one is done
+                if len(ring) or ring.owner.is_alive():
+                    live.append(ring)
+                else:
+                    self.pruned_overflowed += ring.overflowed
+            self.rings = tuple(live)
+
+    def wait(self, timeout=None):
+        """Block until something is pushed or timeout seconds pass (None = forever)"""
+        self.waiting = True
+        try:
+            if self.pending():
+                return
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+        finally:
+            self.waiting = False
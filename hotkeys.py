@@ -0,0 +1,74 @@
+"""Toggle hotkeys: single keys, chords such as Ctrl+Shift+F8, and mouse side buttons."""
+import re
+
+MODIFIERS = ('ctrl', 'shift', 'alt', 'windows')
+
+# Mouse buttons a hotkey can use, by MOUSE_BUTTON_CODES name
+MOUSE_HOTKEY_NAMES = {'middle': 'mouse3', 'x1': 'mouse4', 'x2': 'mouse5'}
+MOUSE_HOTKEY_KEYS = frozenset(MOUSE_HOTKEY_NAMES.values())
+
+KEY_ALIASES = {
+    'control': 'ctrl',
+    'win': 'windows',
+    'cmd': 'windows',
+    'middle click': 'mouse3',
+    'xbutton1': 'mouse4',
+    'xbutton2': 'mouse5',
+}
+
+# Split on '+' only between parts, so "Num+" and "Ctrl++" keep their plus key
+PART_SEPARATOR = re.compile(r'\+(?=.)')
+
+
+class HotkeyError(ValueError):
+    pass
+
+
+def parse_hotkey(text):
+    """Lowercase key names of a hotkey string, modifiers first"""
+    parts = [part.strip().lower() for part in PART_SEPARATOR.split(str(text).strip())]
+    if not parts or not all(parts):
+        raise HotkeyError(f"Invalid hotkey '{text}'")
+    keys = []
+    for part in parts:
+        key = KEY_ALIASES.get(part, part)
+        if key in keys:
+            raise HotkeyError(f"Hotkey '{text}' names {part} twice")
+        keys.append(key)
+    return tuple(sorted(keys, key=lambda key: key not in MODIFIERS))
+
+
+class HotkeyMatcher:
+    """A hotkey compiled into one bit per key it watches.
+
+    key_event() returns True on the edge that completes the chord. A chord
+    with a modifier watches all modifiers, so Ctrl+Shift+F8 does not fire
+    Ctrl+F8; a plain key fires whatever modifiers are held.
+    """
+
+    def __init__(self, text=None):
+        self.text = text
+        self.keys = parse_hotkey(text) if text else ()
+        watched = list(self.keys)
+        if any(key in MODIFIERS for key in self.keys):
+            watched += [key for key in MODIFIERS if key not in watched]
+        self.key_bits = {key: 1 << index for index, key in enumerate(watched)}
+        self.mask = 0
+        for key in self.keys:
+            self.mask |= self.key_bits[key]
+        self.down = 0
+
+    @property
+    def keyboard_keys(self):
+        """Watched keys that come from the keyboard hook"""
+        return tuple(key for key in self.key_bits if key not in MOUSE_HOTKEY_KEYS)
+
+    def key_event(self, key, pressed):
+        bit = self.key_bits.get(key)
+        if bit is None:
+            return False
+        down = self.down | bit if pressed else self.down & ~bit
+        if down == self.down:
+            return False
+        self.down = down
+        return pressed and down == self.mask
@@ -0,0 +1,292 @@
+"""Input backends used by the macro engine.
+
+SystemInputBackend talks to the real OS through the `keyboard` module and
+pynput. MemoryInputBackend is a deterministic in-memory stand-in with a
+controllable clock, so the engine can be driven and measured headlessly.
+
+Keys the engine presses are resolved once, when bindings load, into an
+OutputDescriptor (a scan code or a mouse button); press() and release()
+take those descriptors, so the hold path never parses a key name.
+"""
+import time
+from collections import namedtuple
+
+from event_log import EVENT_LOG
+
+OUTPUT_KEY = 1
+OUTPUT_MOUSE = 2
+
+# name: the setting's key name, device: OUTPUT_*, code: scan code or mouse button
+OutputDescriptor = namedtuple('OutputDescriptor', 'name device code')
+
+# Mouse buttons that can be held as an output, by lowercase setting name
+MOUSE_OUTPUTS = {
+    'left click': 'left',
+    'right click': 'right',
+    'middle click': 'middle',
+    'mouse4': 'x1',
+    'mouse5': 'x2',
+}
+
+# Numpad keys by PC scan code (the same numbers as Linux key codes). The
+# keyboard library folds "num 5" into "5", so these cannot go by name.
+NUMPAD_SCAN_CODES = {
+    'num0': 0x52, 'num1': 0x4F, 'num2': 0x50, 'num3': 0x51, 'num4': 0x4B,
+    'num5': 0x4C, 'num6': 0x4D, 'num7': 0x47, 'num8': 0x48, 'num9': 0x49,
+    'num*': 0x37, 'num-': 0x4A, 'num+': 0x4E, 'numdel': 0x53,
+}
+
+# Setting names the keyboard library spells differently. Num/ and NumEnter
+# are extended keys that share a scan code with / and Enter; the library
+# sends those for them too.
+KEY_NAME_ALIASES = {
+    'scrolllock': 'scroll lock',
+    'num/': '/',
+    'numenter': 'enter',
+}
+
+# Setting names of keys on the numpad. On Windows the numpad digits share
+# scan codes with the arrow and navigation keys (Num8 and Up are both
+# 0x48) and only the hook event's is_keypad flag tells them apart.
+KEYPAD_KEYS = frozenset(NUMPAD_SCAN_CODES) | {'num/', 'numenter'}
+
+
+class InputBackend:
+    """Key state, key output, keyboard and mouse-button events"""
+
+    def monotonic_ns(self):
+        return time.monotonic_ns()
+
+    def is_pressed(self, key):
+        raise NotImplementedError
+
+    def press(self, output):
+        """Press an OutputDescriptor from resolve_output()"""
+        raise NotImplementedError
+
+    def release(self, output):
+        raise NotImplementedError
+
+    def resolve_output(self, name):
+        """OutputDescriptor for a key or mouse button name, or None if there is none"""
+        button = MOUSE_OUTPUTS.get(name)
+        if button is not None:
+            return OutputDescriptor(name, OUTPUT_MOUSE, button)
+        codes = self.scan_codes(name)
+        if not codes:
+            return None
+        return OutputDescriptor(name, OUTPUT_KEY, codes[0])
+
+    def scan_codes(self, key):
+        """Scan codes of key; empty if the name is unknown"""
+        raise NotImplementedError
+
+    def hook_codes(self, key):
+        """Codes the keyboard hook passes to its callback for key; empty if the name is unknown"""
+        return self.scan_codes(key)
+
+    def hook_keyboard(self, callback):
+        """Call callback(hook_code, pressed) on every key edge; returns a handle"""
+        raise NotImplementedError
+
+    def unhook_keyboard(self, handle):
+        raise NotImplementedError
+
+    def add_mouse_listener(self, callback):
+        """Call callback(button, pressed) for mouse buttons ('left', 'right', ...)"""
+        raise NotImplementedError
+
+    def remove_mouse_listener(self, handle):
+        raise NotImplementedError
+
+
+class SystemInputBackend(InputBackend):
+    """Real input through the global `keyboard` hook and a pynput mouse listener"""
+
+    def __init__(self):
+        # Imported here so the in-memory backend works without a desktop session
+        import keyboard
+        from pynput.mouse import Button, Controller as MouseController, Listener as MouseListener
+        self.keyboard = keyboard
+        self.mouse_buttons = Button
+        self.mouse = MouseController()
+        self.mouse_listener_class = MouseListener
+
+    def is_pressed(self, key):
+        # By scan code, so numpad keys and aliased names work as they do in the hook
+        is_pressed = self.keyboard.is_pressed
+        return any(is_pressed(code) for code in self.scan_codes(key))
+
+    def press(self, output):
+        if output.device == OUTPUT_MOUSE:
+            self.mouse.press(output.code)
+        else:
+            self.keyboard.press(output.code)
+
+    def release(self, output):
+        if output.device == OUTPUT_MOUSE:
+            self.mouse.release(output.code)
+        else:
+            self.keyboard.release(output.code)
+
+    def resolve_output(self, name):
+        output = super().resolve_output(name)
+        if output is not None and output.device == OUTPUT_MOUSE:
+            # Side buttons only exist in pynput on some platforms
+            button = getattr(self.mouse_buttons, output.code, None)
+            if button is None:
+                return None
+            output = output._replace(code=button)
+        return output
+
+    def scan_codes(self, key):
+        code = NUMPAD_SCAN_CODES.get(key)
+        if code is not None:
+            return (code,)
+        try:
+            return tuple(self.keyboard.key_to_scan_codes(KEY_NAME_ALIASES.get(key, key)))
+        except ValueError:
+            return ()
+
+    def hook_codes(self, key):
+        """(scan code, is keypad) pairs, so Num8 and Up are different keys"""
+        keypad = key in KEYPAD_KEYS
+        return tuple((code, keypad) for code in self.scan_codes(key))
+
+    def hook_keyboard(self, callback):
+        key_down = self.keyboard.KEY_DOWN
+
+        def on_event(event):
+            try:
+                callback((event.scan_code, bool(event.is_keypad)), event.event_type == key_down)
+            except Exception as e:
+                EVENT_LOG.error('keyboard_hook', 'callback_failed', {'scan_code': event.scan_code}, e)
+        return self.keyboard.hook(on_event)
+
+    def unhook_keyboard(self, handle):
+        self.keyboard.unhook(handle)
+
+    def add_mouse_listener(self, callback):
+        def on_click(x, y, button, pressed):
+            try:
+                callback(button.name, pressed)
+            except Exception as e:
+                # Raising here would end pynput's listener thread
+                EVENT_LOG.error('mouse_listener', 'callback_failed', {'button': button.name}, e)
+        listener = self.mouse_listener_class(on_click=on_click)
+        listener.start()
+        return listener
+
+    def remove_mouse_listener(self, handle):
+        handle.stop()
+
+
+class ManualClock:
+    """Monotonic clock that only moves when told to"""
+
+    def __init__(self, start_ns=0):
+        self.now_ns = start_ns
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def advance(self, seconds=0, ms=0, ns=0):
+        self.now_ns += int(seconds * 1_000_000_000) + int(ms * 1_000_000) + ns
+
+
+class MonotonicClock:
+    """Real clock for driving MemoryInputBackend in benchmarks"""
+
+    def monotonic_ns(self):
+        return time.monotonic_ns()
+
+    def advance(self, seconds=0, ms=0, ns=0):
+        time.sleep(seconds + ms / 1000 + ns / 1_000_000_000)
+
+
+class MemoryInputBackend(InputBackend):
+    """Deterministic in-memory input for tests and benchmarks.
+
+    Drive it with key_down/key_up/mouse_down/mouse_up; hooks fire synchronously
+    on the calling thread, with the key name standing in for the hook code.
+    Every press/release the engine emits is appended to `output` as
+    (timestamp_ns, action, key).
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or ManualClock()
+        self.pressed = set()
+        self.held = set()
+        self.output = []
+        self.keyboard_hooks = {}
+        self.mouse_listeners = {}
+        self.next_handle = 0
+
+    def monotonic_ns(self):
+        return self.clock.monotonic_ns()
+
+    def new_handle(self):
+        self.next_handle += 1
+        return self.next_handle
+
+    # Engine-facing API
+
+    def is_pressed(self, key):
+        return key in self.pressed
+
+    def press(self, output):
+        self.held.add(output.name)
+        self.output.append((self.clock.monotonic_ns(), 'press', output.name))
+
+    def release(self, output):
+        self.held.discard(output.name)
+        self.output.append((self.clock.monotonic_ns(), 'release', output.name))
+
+    def scan_codes(self, key):
+        return (key,)
+
+    def hook_keyboard(self, callback):
+        handle = self.new_handle()
+        self.keyboard_hooks[handle] = callback
+        return handle
+
+    def unhook_keyboard(self, handle):
+        del self.keyboard_hooks[handle]
+
+    def add_mouse_listener(self, callback):
+        handle = self.new_handle()
+        self.mouse_listeners[handle] = callback
+        return handle
+
+    def remove_mouse_listener(self, handle):
+        del self.mouse_listeners[handle]
+
+    # Synthetic input
+
+    def key_down(self, key):
+        self.pressed.add(key)
+        for callback in list(self.keyboard_hooks.values()):
+            callback(key, True)
+
+    def key_up(self, key):
+        self.pressed.discard(key)
+        for callback in list(self.keyboard_hooks.values()):
+            callback(key, False)
+
+    def mouse_down(self, button='right'):
+        for callback in list(self.mouse_listeners.values()):
+            callback(button, True)
+
+    def mouse_up(self, button='right'):
+        for callback in list(self.mouse_listeners.values()):
+            callback(button, False)
+
+    def tap(self, key, hold_ms=0):
+        self.key_down(key)
+        self.clock.advance(ms=hold_ms)
+        self.key_up(key)
+
+    def click(self, button='right', hold_ms=0):
+        self.mouse_down(button)
+        self.clock.advance(ms=hold_ms)
+        self.mouse_up(button)
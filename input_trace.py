@@ -0,0 +1,397 @@
+"""Compact binary traces of what the engine saw and did, and deterministic replay.
+
+A trace is a small header and fixed-size 16-byte records; key names and
+engine configuration ride in META records as JSON spread over raw slots.
+
+    python input_trace.py dump TRACE
+    python input_trace.py replay TRACE [--realtime]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import deque, namedtuple
+
+from app_paths import user_cache_dir
+from input_backend import MemoryInputBackend
+
+MAGIC = b'PATRACE\x00'
+# 2 added TIMER_ARM records
+VERSION = 2
+# magic, format version, record size
+HEADER = struct.Struct('<8sII')
+# t_ns, lag_ns (dispatch time - t_ns), device, action, code
+RECORD = struct.Struct('<qiBBH')
+HEADER_SIZE = HEADER.size
+RECORD_SIZE = RECORD.size
+
+# Devices
+DEV_KEY = 1       # key edge forwarded by the keyboard hook; action 1 down / 0 up
+DEV_MOUSE = 2     # mouse button edge; code is an event_queue MOUSE_BUTTON_CODES id
+DEV_OUTPUT = 3    # key the engine pressed (1) or released (0)
+DEV_SAMPLE = 4    # physical key state the engine read (polling, hold guard, enable)
+DEV_TIMER = 5     # action TIMER_*
+DEV_CONTROL = 6   # code CONTROL_*; for CONTROL_ENABLE action is the new enabled state
+DEV_META = 7      # code: number of following slots holding a JSON blob of lag_ns bytes
+
+CONTROL_ENABLE = 1
+CONTROL_STOP = 2
+
+TIMER_RUN = 0     # deadlines due at t_ns ran
+TIMER_ARM = 1     # the deadline named by code was armed for t_ns
+
+DEVICE_NAMES = {
+    DEV_KEY: 'key', DEV_MOUSE: 'mouse', DEV_OUTPUT: 'output', DEV_SAMPLE: 'sample',
+    DEV_TIMER: 'timer', DEV_CONTROL: 'control', DEV_META: 'meta',
+}
+# Devices whose code is an interned key name
+KEY_DEVICES = (DEV_KEY, DEV_OUTPUT, DEV_SAMPLE)
+
+MAX_LAG_NS = 2 ** 31 - 1
+TRACE_SUFFIX = '.patrace'
+KEEP_TRACES = 10
+
+TraceRecord = namedtuple('TraceRecord', 't_ns lag_ns device action code name meta')
+
+
+class TraceError(ValueError):
+    pass
+
+
+def trace_dir():
+    return os.path.join(user_cache_dir(), 'traces')
+
+
+def new_trace_path(directory=None, keep=KEEP_TRACES):
+    """Timestamped path for a new trace, pruning all but the newest `keep`"""
+    directory = directory or trace_dir()
+    os.makedirs(directory, exist_ok=True)
+    traces = sorted(name for name in os.listdir(directory) if name.endswith(TRACE_SUFFIX))
+    for name in traces[:max(0, len(traces) - keep + 1)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+    return os.path.join(directory, time.strftime('trace-%Y%m%d-%H%M%S') + TRACE_SUFFIX)
+
+
+class TraceWriter:
+    """Buffered record writer; only the engine thread may call it"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'ab', buffering=64 * 1024)
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        self.key_ids = {}
+        self.records = 0
+        self.dirty = False
+
+    def record(self, t_ns, lag_ns, device, action, code):
+        self.file.write(RECORD.pack(t_ns, min(lag_ns, MAX_LAG_NS), device, action, code))
+        self.records += 1
+        self.dirty = True
+
+    def key(self, t_ns, lag_ns, device, name, action):
+        code = self.key_ids.get(name)
+        if code is None:
+            code = len(self.key_ids)
+            self.key_ids[name] = code
+            self.meta(t_ns, {'key': name, 'id': code})
+        self.record(t_ns, lag_ns, device, action, code)
+
+    def meta(self, t_ns, data):
+        blob = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        slots = -(-len(blob) // RECORD_SIZE)
+        self.record(t_ns, len(blob), DEV_META, 0, slots)
+        self.file.write(blob.ljust(slots * RECORD_SIZE, b'\x00'))
+        self.records += slots
+
+    def flush(self):
+        if self.dirty:
+            self.file.flush()
+            self.dirty = False
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class TraceReader:
+    """Memory-mapped, read-only view of a trace file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise TraceError(f"{path} is not a trace file")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise TraceError(f"{path} is not a trace file")
+        if version > VERSION:
+            raise TraceError(f"{path} uses trace format {version}, this build reads {VERSION}")
+        self.version = version
+        # A partly written last record (crash mid-write) is ignored
+        self.slots = (size - HEADER_SIZE) // RECORD_SIZE
+
+    def __iter__(self):
+        names = {}
+        buffer = self.map
+        slot = 0
+        while slot < self.slots:
+            offset = HEADER_SIZE + slot * RECORD_SIZE
+            t_ns, lag_ns, device, action, code = RECORD.unpack_from(buffer, offset)
+            slot += 1
+            if device == DEV_META:
+                if slot + code > self.slots:
+                    return
+                start = offset + RECORD_SIZE
+                meta = json.loads(bytes(buffer[start:start + lag_ns]).decode('utf-8'))
+                slot += code
+                if 'key' in meta:
+                    names[meta['id']] = meta['key']
+                yield TraceRecord(t_ns, 0, device, action, code, None, meta)
+                continue
+            named = device in KEY_DEVICES or (device == DEV_TIMER and action == TIMER_ARM)
+            name = names.get(code) if named else None
+            yield TraceRecord(t_ns, lag_ns, device, action, code, name, None)
+
+    def close(self):
+        self.map.close()
+
+
+def engine_config(engine):
+    """JSON-able snapshot of everything that changes how the engine decides"""
+    return {
+        'aim_button': engine.aim_button,
+        'bindings': engine.binding_rules,
+        'engine_mode': engine.engine_mode,
+        'scope_tap_ms': engine.scope.tap_threshold_ns / 1_000_000,
+        'scope_reset_seconds': engine.scope.reset_timeout_ns / 1_000_000_000,
+    }
+
+
+class ReplayBackend(MemoryInputBackend):
+    """Answers is_pressed() and deadline times with what the trace recorded"""
+
+    def __init__(self, samples, arms=None):
+        super().__init__()
+        self.samples = deque(samples)
+        # deadline name -> deque of recorded deadlines; None for traces without them
+        self.arms = arms
+        self.desyncs = 0
+
+    def arm_time(self, name, deadline_ns):
+        """The deadline the recording armed in place of this one"""
+        if self.arms is None:
+            return deadline_ns
+        recorded = self.arms.get(name)
+        if recorded:
+            return recorded.popleft()
+        self.desyncs += 1
+        return deadline_ns
+
+    def is_pressed(self, key):
+        if self.samples and self.samples[0][0] == key:
+            return self.samples.popleft()[1]
+        self.desyncs += 1
+        return key in self.pressed
+
+
+class ReplayResult:
+    def __init__(self, expected, actual, desyncs, records):
+        self.expected = expected
+        self.actual = actual
+        self.desyncs = desyncs
+        self.records = records
+        self.divergence = None
+        for index in range(max(len(expected), len(actual))):
+            want = expected[index][1:] if index < len(expected) else None
+            got = actual[index][1:] if index < len(actual) else None
+            if want != got:
+                self.divergence = (index, want, got)
+                break
+
+    @property
+    def matches(self):
+        return self.divergence is None and not self.desyncs
+
+    def report(self):
+        lines = [f"{self.records} records, {len(self.expected)} recorded outputs, "
+                 f"{len(self.actual)} replayed outputs"]
+        if self.divergence is not None:
+            index, want, got = self.divergence
+            lines.append(f"Diverged at output {index}: recorded {want}, replayed {got}")
+        if self.desyncs:
+            lines.append(f"{self.desyncs} key-state reads had no matching sample")
+        if self.matches:
+            lines.append("Replay matches the recording")
+        return "\n".join(lines)
+
+
+def replay_engine(backend, config):
+    """MacroEngine for replay, configured like the recording's first config record"""
+    from macro_engine import MacroEngine
+
+    class ReplayEngine(MacroEngine):
+        def arm(self, name, deadline_ns, callback):
+            # At the recorded time: the replay clock stands at dispatch time,
+            # a little before the live engine read its clock to arm
+            super().arm(name, self.backend.arm_time(name, deadline_ns), callback)
+
+    engine = ReplayEngine(backend, config['aim_button'], config['engine_mode'], config['bindings'])
+    engine.scope.configure(config['scope_tap_ms'], config['scope_reset_seconds'])
+    return engine
+
+
+def apply_config(engine, previous, config, call=None):
+    """Repeat one recorded configuration change through the handler the live engine ran"""
+    changed = {field for field in config if config[field] != previous.get(field)}
+    if call is None:
+        if changed & {'scope_tap_ms', 'scope_reset_seconds'} or changed >= {'aim_button', 'bindings'}:
+            call = 'change_profile'
+        elif 'aim_button' in changed:
+            call = 'change_aim_button'
+        elif 'bindings' in changed:
+            call = 'change_bindings'
+    aim_button, rules = config['aim_button'], config['bindings']
+    if call == 'change_profile':
+        engine.change_profile(aim_button, rules, engine.compile(rules, aim_button),
+                              config['scope_tap_ms'], config['scope_reset_seconds'])
+    elif call == 'change_aim_button':
+        engine.change_aim_button(aim_button, engine.compile(engine.binding_rules, aim_button))
+    elif call == 'change_bindings':
+        engine.change_bindings(rules, engine.compile(rules, engine.aim_button))
+    if 'engine_mode' in changed:
+        engine.change_engine_mode(config['engine_mode'])
+
+
+def replay(path, realtime=False, speed=1.0):
+    """Feed a trace through a fresh engine and compare the outputs it makes"""
+    from event_queue import EV_KEY, EV_MOUSE
+
+    reader = TraceReader(path)
+    try:
+        records = list(reader)
+    finally:
+        reader.close()
+
+    samples = [(record.name, bool(record.action)) for record in records if record.device == DEV_SAMPLE]
+    arms = None
+    if reader.version >= 2:
+        arms = {}
+        for record in records:
+            if record.device == DEV_TIMER and record.action == TIMER_ARM:
+                arms.setdefault(record.name, deque()).append(record.t_ns)
+    backend = ReplayBackend(samples, arms)
+    clock = backend.clock
+    engine = None
+    config = None
+    expected = []
+    started = time.monotonic_ns()
+    first_ns = None
+
+    for record in records:
+        if record.device == DEV_META:
+            previous, config = config, record.meta.get('config', config)
+            if config is previous:
+                continue
+            clock.now_ns = record.t_ns
+            if engine is None:
+                engine = replay_engine(backend, config)
+                engine.start()
+            else:
+                apply_config(engine, previous, config, record.meta.get('call'))
+            continue
+        if engine is None:
+            raise TraceError(f"{path} has events before the engine configuration")
+        if record.device == DEV_TIMER and record.action == TIMER_ARM:
+            # Consumed through ReplayBackend.arm_time()
+            continue
+
+        now_ns = record.t_ns + record.lag_ns
+        if realtime:
+            if first_ns is None:
+                first_ns = now_ns
+            delay = (now_ns - first_ns) / speed - (time.monotonic_ns() - started)
+            if delay > 0:
+                time.sleep(delay / 1_000_000_000)
+        clock.now_ns = now_ns
+
+        if record.device in (DEV_KEY, DEV_MOUSE):
+            if record.device == DEV_KEY:
+                event = (record.t_ns, EV_KEY, engine.key_code(record.name), record.action, None)
+            else:
+                event = (record.t_ns, EV_MOUSE, record.code, record.action, None)
+            try:
+                engine.dispatch(event)
+            except Exception:
+                engine.release_all()
+        elif record.device == DEV_CONTROL:
+            if record.code == CONTROL_STOP:
+                engine.stop()
+            else:
+                engine.change_enabled(bool(record.action))
+        elif record.device == DEV_TIMER:
+            engine.deadlines.run_due(record.t_ns, engine.deadline_failed)
+        elif record.device == DEV_OUTPUT:
+            expected.append((record.t_ns, 'press' if record.action else 'release', record.name))
+
+    actual = list(backend.output)
+    if engine is not None:
+        engine.remove_hooks()
+    return ReplayResult(expected, actual, backend.desyncs, len(records))
+
+
+def dump(path, out=sys.stdout):
+    reader = TraceReader(path)
+    try:
+        first_ns = None
+        for record in reader:
+            if first_ns is None:
+                first_ns = record.t_ns
+            at = (record.t_ns - first_ns) / 1_000_000
+            device = DEVICE_NAMES.get(record.device, str(record.device))
+            if record.device == DEV_META:
+                print(f"{at:12.3f} ms  {device:<8} {json.dumps(record.meta)}", file=out)
+            elif record.device == DEV_TIMER and record.action == TIMER_ARM:
+                # Stamped with the deadline, which is later than the records around it
+                print(f"{at:12.3f} ms  {device:<8} {record.name} due", file=out)
+            else:
+                what = record.name if record.name is not None else record.code
+                print(f"{at:12.3f} ms  {device:<8} {what} {record.action}  (+{record.lag_ns / 1000:.1f} µs)",
+                      file=out)
+    finally:
+        reader.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay a Peak & Aim Assistant input trace.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    dump_parser = commands.add_parser('dump', help="print every record")
+    dump_parser.add_argument('trace')
+    replay_parser = commands.add_parser('replay', help="run the trace through the engine and compare outputs")
+    replay_parser.add_argument('trace')
+    replay_parser.add_argument('--realtime', action='store_true', help="keep the recorded timing")
+    replay_parser.add_argument('--speed', type=float, default=1.0, help="time scale for --realtime")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'dump':
+            dump(args.trace)
+            return 0
+        result = replay(args.trace, realtime=args.realtime, speed=args.speed)
+    except (OSError, TraceError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(result.report())
+    return 0 if result.matches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Single-instance lock shared by the GUI and the headless entry point."""
+import os
+import sys
+
+from app_paths import user_cache_dir
+
+LOCK_FILE_NAME = "instance.lock"
+
+
+class InstanceLock:
+    """Exclusive lock on a small file in the user's cache directory.
+
+    The OS drops the lock when the process exits or crashes, so a stale
+    lock file never blocks the next launch.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_cache_dir(), LOCK_FILE_NAME)
+        self.handle = None
+
+    def acquire(self):
+        """Take the lock; False if another instance already holds it"""
+        if self.handle is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        handle = open(self.path, 'a+')
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self.handle = handle
+        return True
+
+    def release(self):
+        if self.handle is None:
+            return
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        self.handle.close()
+        self.handle = None
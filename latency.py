@@ -0,0 +1,153 @@
+"""Low-overhead latency histograms for the macro engine."""
+import json
+
+# Each power of two is split into 2**(SUB_BUCKET_BITS - 1) linear buckets,
+# which keeps every recorded value within ~3% of its bucket.
+SUB_BUCKET_BITS = 6
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+# Values above ~68 s (2**36 ns) land in the last bucket
+MAX_TRACKABLE_NS = (1 << 36) - 1
+
+
+def bucket_index(value):
+    bits = value.bit_length()
+    if bits <= SUB_BUCKET_BITS:
+        return value
+    shift = bits - SUB_BUCKET_BITS
+    return shift * SUB_BUCKET_HALF + (value >> shift)
+
+
+def bucket_bounds(index):
+    """Lowest and highest value that map to a bucket"""
+    if index < 2 * SUB_BUCKET_HALF:
+        return index, index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    low = (index - shift * SUB_BUCKET_HALF) << shift
+    return low, low + (1 << shift) - 1
+
+
+BUCKET_COUNT = bucket_index(MAX_TRACKABLE_NS) + 1
+
+# Upper bounds of the "fast" and "ok" levels used by the overlay indicator
+LATENCY_LEVELS_NS = (1_000_000, 5_000_000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket HDR-style histogram of nanosecond durations.
+
+    record() is a bucket lookup plus a few integer updates, so it can sit
+    next to the code it measures without moving the numbers.
+    """
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+
+    def record(self, value_ns):
+        if value_ns < 0:
+            value_ns = 0
+        elif value_ns > MAX_TRACKABLE_NS:
+            value_ns = MAX_TRACKABLE_NS
+        self.counts[bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        self.last = value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def reset(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+
+    def percentile(self, percent):
+        """Value at the given percentile (midpoint of its bucket), in ns"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * percent / 100.0 + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            if bucket:
+                seen += bucket
+                if seen >= target:
+                    low, high = bucket_bounds(index)
+                    return min((low + high) // 2, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ns': self.total // self.count if self.count else 0,
+            'p50_ns': self.percentile(50),
+            'p90_ns': self.percentile(90),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max,
+        }
+
+    def to_dict(self):
+        data = self.summary()
+        data['buckets'] = [
+            [bucket_bounds(index)[0], bucket_bounds(index)[1], bucket]
+            for index, bucket in enumerate(self.counts) if bucket
+        ]
+        return data
+
+
+def latency_level(value_ns):
+    """0 fast, 1 ok, 2 slow, by LATENCY_LEVELS_NS"""
+    for level, bound in enumerate(LATENCY_LEVELS_NS):
+        if value_ns <= bound:
+            return level
+    return len(LATENCY_LEVELS_NS)
+
+
+def format_ns(value_ns):
+    if value_ns < 1_000_000:
+        return f"{value_ns / 1000:.0f} µs"
+    return f"{value_ns / 1_000_000:.2f} ms"
+
+
+class LatencyStats:
+    """Press, release and right-click classification latency of one engine"""
+
+    NAMES = ('press', 'release', 'scope', 'timeline')
+    LABELS = {
+        'press': "Trigger → Aim Press",
+        'release': "Trigger → Aim Release",
+        'scope': "Right-Click Classify",
+        'timeline': "Sequence Step Jitter",
+    }
+
+    def __init__(self):
+        self.press = LatencyHistogram()
+        self.release = LatencyHistogram()
+        self.scope = LatencyHistogram()
+        # How late each timed sequence step ran, versus its scheduled offset
+        self.timeline = LatencyHistogram()
+
+    def reset(self):
+        for name in self.NAMES:
+            getattr(self, name).reset()
+
+    def describe(self, name):
+        """One line for the tray menu: p50/p99/max"""
+        histogram = getattr(self, name)
+        if not histogram.count:
+            return f"{self.LABELS[name]}: no samples"
+        return (f"{self.LABELS[name]}: p50 {format_ns(histogram.percentile(50))} | "
+                f"p99 {format_ns(histogram.percentile(99))} | "
+                f"max {format_ns(histogram.max)} (n={histogram.count})")
+
+    def to_dict(self):
+        return {name: getattr(self, name).to_dict() for name in self.NAMES}
+
+    def export_json(self, path, extra=None):
+        data = self.to_dict()
+        data.update(extra or {})
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
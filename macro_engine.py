@@ -0,0 +1,707 @@
+"""Hold/scope state machine behind the Peak & Aim macro, independent of Qt."""
+import threading
+
+from bindings import COND_SCOPE, compile_bindings
+from deadlines import DeadlineScheduler, WakeupCounter
+from event_log import EVENT_LOG
+from event_queue import (CTRL_CALL, CTRL_ENABLE, CTRL_SHUTDOWN, CTRL_TOGGLE, EV_CONTROL, EV_KEY,
+                         EV_MOUSE, MOUSE_BUTTON_CODES, MOUSE_BUTTON_NAMES, EventQueue)
+from hotkeys import MOUSE_HOTKEY_NAMES, HotkeyMatcher
+from input_backend import MOUSE_OUTPUTS
+from input_trace import (CONTROL_ENABLE, CONTROL_STOP, DEV_CONTROL, DEV_KEY, DEV_MOUSE, DEV_OUTPUT,
+                         DEV_SAMPLE, DEV_TIMER, TIMER_ARM, TIMER_RUN, engine_config)
+from latency import LatencyHistogram, LatencyStats
+from scope import DEFAULT_RESET_TIMEOUT_S, DEFAULT_TAP_THRESHOLD_MS, HOLD, IGNORED, TAP, ScopeTracker
+from session_stats import AUTO_RESETS, FORCED_RELEASES, PEEKS, SCOPE_HOLDS, SCOPE_TOGGLES, SEQUENCES, SessionStats
+from status_bus import StatusBus
+from timeline import SPIN_MARGIN_NS, STEP_PRESS, TimelineRun, TimerResolution
+
+# Event: keyboard/mouse hooks drive the engine directly
+# Polling: fallback loop that samples the trigger keys every 50 ms
+ENGINE_MODES = ['Event', 'Polling']
+
+# While an output is held, re-check the physical trigger keys this soon after
+# the last trigger edge, backing off to HOLD_GUARD_MAX_MS during a long hold
+HOLD_GUARD_MS = 250
+HOLD_GUARD_MAX_MS = 1000
+# Trigger sampling interval of the polling engine
+POLL_INTERVAL_MS = 50
+
+
+class MacroEngine:
+    """Holds binding outputs while their trigger keys are down.
+
+    Every piece of engine state is owned by the thread that calls run() (or
+    pump() in tests and benchmarks); other threads only push records onto
+    the EventQueue.
+    """
+
+    def __init__(self, backend, aim_button='o', engine_mode='Event', bindings=None, trace=None):
+        self.backend = backend
+        self.enabled = False
+        self.scope = ScopeTracker()
+        self.aim_button = aim_button.lower()
+        self.engine_mode = engine_mode
+        self.binding_rules = bindings
+        # The aim button and rules as last requested, which callers compile
+        # against; the engine thread's copies above lag until it catches up
+        self.requested = (self.aim_button, bindings)
+        self.request_lock = threading.Lock()
+        # key name -> OutputDescriptor (None if it does not resolve); only grows,
+        # so a key pressed under old bindings can still be released
+        self.outputs = {}
+        self.unresolved = []
+        self.bindings = self.compile(bindings, self.aim_button)
+        self.pressed_mask = 0
+        self.conditions = 0
+        self.rule_active = [False] * self.bindings.rule_count
+        # output key -> how many active rules and running sequences want it
+        # down; the backend sees a press or release only on 0 <-> 1
+        self.output_refs = {}
+        self.held_outputs = set()
+        # Listener names of mouse buttons the engine itself has pressed
+        self.held_buttons = set()
+        # rule index -> TimelineRun for active rules with a sequence
+        self.timelines = {}
+        self.step_jitter = {}
+        self.timer_resolution = TimerResolution()
+        self.key_codes = {}
+        self.key_names = []
+        self.hotkey = HotkeyMatcher()
+        # hook code -> interned key code, read by the keyboard hook thread
+        self.hook_map = {}
+        self.hook_code_cache = {}
+        self.queue = EventQueue()
+        self.keyboard_hook = None
+        self.mouse_listener = None
+        self.latency = LatencyStats()
+        self.stats = SessionStats()
+        self.hold_started_ns = None
+        self.status = StatusBus((False, False, False))
+        self.deadlines = DeadlineScheduler()
+        self.hold_guard_ms = HOLD_GUARD_MS
+        self.wakeups = WakeupCounter()
+        self.running = False
+        # Optional input_trace.TraceWriter, written only from the engine thread
+        self.trace = trace
+
+    def arm(self, name, deadline_ns, callback):
+        if self.trace is not None:
+            self.trace.key(deadline_ns, 0, DEV_TIMER, name, TIMER_ARM)
+        self.deadlines.arm(name, deadline_ns, callback)
+
+    @property
+    def aim_held(self):
+        return bool(self.held_outputs)
+
+    @property
+    def holding(self):
+        """True while anything is held or a sequence is in flight"""
+        return bool(self.held_outputs or self.timelines)
+
+    def compile(self, rules, aim_button):
+        """Compile bindings and resolve every key they can press, on the caller's thread"""
+        compiled = compile_bindings(rules, aim_button)
+        for key in compiled.output_keys:
+            if key not in self.outputs:
+                output = self.backend.resolve_output(key)
+                if output is None:
+                    self.unresolved.append(key)
+                self.outputs[key] = output
+        return compiled
+
+    # Thread-safe requests: each becomes one record for the engine thread
+
+    def post(self, function, *args):
+        """Run function(*args) on the engine thread, in order with input events"""
+        self.queue.push(self.backend.monotonic_ns(), EV_CONTROL, CTRL_CALL, 0, (function, args))
+
+    def set_enabled(self, enabled):
+        """Enable or disable the macro, pressing/releasing outputs immediately"""
+        self.queue.push(self.backend.monotonic_ns(), EV_CONTROL, CTRL_ENABLE, 1 if enabled else 0)
+
+    def toggle(self):
+        self.queue.push(self.backend.monotonic_ns(), EV_CONTROL, CTRL_TOGGLE, 0)
+
+    def set_engine_mode(self, mode):
+        """Switch between the hook-driven engine and the polling fallback"""
+        self.post(self.change_engine_mode, mode)
+
+    def set_aim_button(self, button):
+        """Update the aim button key"""
+        button = button.lower()
+        with self.request_lock:
+            rules = self.requested[1]
+            compiled = self.compile(rules, button)
+            self.requested = (button, rules)
+            self.post(self.change_aim_button, button, compiled)
+
+    def set_hotkey(self, text):
+        """Set the toggle hotkey; raises HotkeyError if it does not parse"""
+        self.post(self.change_hotkey, HotkeyMatcher(text))
+
+    def set_bindings(self, rules):
+        """Replace the binding rules; raises BindingError if they do not compile"""
+        with self.request_lock:
+            button = self.requested[0]
+            compiled = self.compile(rules, button)
+            self.requested = (button, rules)
+            self.post(self.change_bindings, rules, compiled)
+
+    def apply_profile(self, aim_button, bindings, scope_tap_ms=DEFAULT_TAP_THRESHOLD_MS,
+                      scope_reset_seconds=DEFAULT_RESET_TIMEOUT_S):
+        """Rebind to another profile in one step, without restarting the engine"""
+        aim_button = aim_button.lower()
+        with self.request_lock:
+            compiled = self.compile(bindings, aim_button)
+            self.requested = (aim_button, bindings)
+            self.post(self.change_profile, aim_button, bindings, compiled, scope_tap_ms, scope_reset_seconds)
+
+    def shutdown(self):
+        """Ask run() to return; it releases held outputs on the way out"""
+        self.queue.push(self.backend.monotonic_ns(), EV_CONTROL, CTRL_SHUTDOWN, 0)
+
+    # Engine-thread handlers
+
+    def change_aim_button(self, button, compiled):
+        self.aim_button = button
+        self.apply_bindings(compiled)
+
+    def change_hotkey(self, matcher):
+        self.hotkey = matcher
+        self.update_key_filter()
+
+    def change_bindings(self, rules, compiled):
+        self.binding_rules = rules
+        self.apply_bindings(compiled)
+
+    def change_profile(self, aim_button, bindings, compiled, scope_tap_ms, scope_reset_seconds):
+        self.aim_button = aim_button
+        self.binding_rules = bindings
+        self.scope.configure(scope_tap_ms, scope_reset_seconds)
+        self.arm_scope_reset()
+        self.apply_bindings(compiled)
+
+    def apply_bindings(self, compiled):
+        """Swap in new binding tables without dropping outputs that stay held"""
+        old = self.bindings
+        for index in list(self.timelines):
+            self.stop_timeline(index)
+        self.step_jitter = {}
+        pressed_mask = 0
+        for key, bit in old.key_bits.items():
+            if self.pressed_mask & bit and key in compiled.key_bits:
+                pressed_mask |= compiled.key_bits[key]
+
+        rule_active = [False] * compiled.rule_count
+        # Sequences were stopped above, so only rule references are left
+        old_refs = self.output_refs
+        output_refs = {}
+        for index in range(compiled.rule_count):
+            if (self.enabled and pressed_mask & compiled.trigger_masks[index]
+                    and not self.conditions & compiled.inhibit_masks[index]):
+                rule_active[index] = True
+                output = compiled.outputs[index]
+                if output is not None:
+                    output_refs[output] = output_refs.get(output, 0) + 1
+
+        self.bindings = compiled
+        self.pressed_mask = pressed_mask
+        self.rule_active = rule_active
+        self.output_refs = output_refs
+        for output in old_refs:
+            if output not in output_refs:
+                self.release_output(output)
+        for output in output_refs:
+            if output not in old_refs:
+                self.press_output(output)
+        for index in range(compiled.rule_count):
+            if rule_active[index] and compiled.sequences[index]:
+                self.start_timeline(index)
+
+        if old.trigger_keys != compiled.trigger_keys:
+            self.update_key_filter()
+        self.publish_status()
+
+    def change_enabled(self, enabled):
+        self.enabled = enabled
+        self.pressed_mask = 0
+        if enabled and self.engine_mode == 'Event':
+            for key, bit in self.bindings.key_bits.items():
+                if self.key_state(key):
+                    self.pressed_mask |= bit
+        self.evaluate_all()
+        self.schedule_poll()
+
+    def change_engine_mode(self, mode):
+        self.engine_mode = mode
+        self.update_key_filter()
+        self.schedule_poll()
+
+    def publish_status(self):
+        """Send (active, scope open, aim held) to the status bus if it changed"""
+        scope_open = self.scope.active if self.enabled else self.scope.toggled
+        self.status.publish((self.enabled, scope_open, self.aim_held))
+
+    def key_state(self, key):
+        """Physical state of a key, as read by the polling engine and hold guard"""
+        pressed = self.backend.is_pressed(key)
+        if self.trace is not None:
+            self.trace.key(self.backend.monotonic_ns(), 0, DEV_SAMPLE, key, 1 if pressed else 0)
+        return pressed
+
+    def emit(self, key, pressed):
+        """Press or release a key on the backend; False if it has no output or the backend refused"""
+        output = self.outputs.get(key)
+        if output is None:
+            return False
+        try:
+            if pressed:
+                self.backend.press(output)
+            else:
+                self.backend.release(output)
+        except Exception as e:
+            EVENT_LOG.error('engine', 'output_failed', {'key': key, 'pressed': pressed}, e)
+            return False
+        button = MOUSE_OUTPUTS.get(key)
+        if button is not None:
+            if pressed:
+                self.held_buttons.add(button)
+            else:
+                self.held_buttons.discard(button)
+        if self.trace is not None:
+            self.trace.key(self.backend.monotonic_ns(), 0, DEV_OUTPUT, key, 1 if pressed else 0)
+        return True
+
+    def arm_hold_guard(self):
+        if not self.deadlines.armed('hold_guard'):
+            self.arm('hold_guard', self.backend.monotonic_ns() + HOLD_GUARD_MS * 1_000_000, self.on_hold_guard)
+
+    def disarm_hold_guard(self):
+        if not self.holding:
+            self.deadlines.cancel('hold_guard')
+            self.hold_guard_ms = HOLD_GUARD_MS
+
+    def press_output(self, output, edge_ns=None):
+        if not self.emit(output, True):
+            return
+        if not self.held_outputs:
+            self.stats.count(PEEKS)
+            self.hold_started_ns = self.backend.monotonic_ns()
+        self.held_outputs.add(output)
+        if edge_ns is not None:
+            self.latency.press.record(self.backend.monotonic_ns() - edge_ns)
+        self.arm_hold_guard()
+
+    def release_output(self, output, edge_ns=None):
+        self.emit(output, False)
+        self.held_outputs.discard(output)
+        if not self.held_outputs and self.hold_started_ns is not None:
+            self.stats.hold(self.backend.monotonic_ns() - self.hold_started_ns)
+            self.hold_started_ns = None
+        if edge_ns is not None:
+            self.latency.release.record(self.backend.monotonic_ns() - edge_ns)
+        self.disarm_hold_guard()
+
+    def claim_output(self, output, edge_ns=None):
+        """Add a reference to an output key, pressing it if it was the first"""
+        refs = self.output_refs.get(output, 0)
+        self.output_refs[output] = refs + 1
+        if refs == 0:
+            self.press_output(output, edge_ns)
+
+    def drop_output(self, output, edge_ns=None):
+        """Remove a reference to an output key, releasing it with the last one"""
+        refs = self.output_refs.get(output, 0)
+        if refs > 1:
+            self.output_refs[output] = refs - 1
+        elif refs == 1:
+            del self.output_refs[output]
+            self.release_output(output, edge_ns)
+
+    def start_timeline(self, index):
+        """Begin a rule's sequence; offset-0 steps run before this returns"""
+        now_ns = self.backend.monotonic_ns()
+        self.timelines[index] = TimelineRun(index, self.bindings.sequences[index], now_ns)
+        self.stats.count(SEQUENCES)
+        self.timer_resolution.raise_()
+        self.arm_hold_guard()
+        self.on_timeline(now_ns)
+
+    def stop_timeline(self, index):
+        """Skip a sequence's remaining steps and let go of what it still holds"""
+        run = self.timelines.pop(index, None)
+        if run is None:
+            return
+        for key in reversed(run.pressed):
+            self.drop_output(key)
+        if self.timelines:
+            self.arm_timeline()
+        else:
+            self.deadlines.cancel('timeline')
+            self.timer_resolution.restore()
+        self.disarm_hold_guard()
+
+    def arm_timeline(self):
+        due = [run.next_due() for run in self.timelines.values() if not run.finished]
+        if due:
+            self.arm('timeline', min(due), self.on_timeline)
+        else:
+            self.deadlines.cancel('timeline')
+
+    def on_timeline(self, now_ns):
+        """Run every due sequence step and record how late each one landed"""
+        for run in list(self.timelines.values()):
+            while not run.finished and run.next_due() <= now_ns:
+                offset_ns, action, key = run.steps[run.next_step]
+                # A sequence holds one reference per key, like a rule; it
+                # cannot release a key only another rule or sequence holds
+                if action == STEP_PRESS:
+                    if key not in run.pressed:
+                        run.pressed.append(key)
+                        self.claim_output(key)
+                elif key in run.pressed:
+                    run.pressed.remove(key)
+                    self.drop_output(key)
+                jitter_ns = self.backend.monotonic_ns() - (run.start_ns + offset_ns)
+                self.latency.timeline.record(jitter_ns)
+                histogram = self.step_jitter.get((run.rule, run.next_step))
+                if histogram is None:
+                    histogram = self.step_jitter[(run.rule, run.next_step)] = LatencyHistogram()
+                histogram.record(jitter_ns)
+                run.next_step += 1
+        self.arm_timeline()
+        self.publish_status()
+
+    def timeline_report(self):
+        """Jitter of every sequence step that has run with the current bindings"""
+        # Called from other threads: work on snapshots of the engine's tables
+        bindings = self.bindings
+        report = []
+        for (rule, step), histogram in sorted(dict(self.step_jitter).items()):
+            if rule >= bindings.rule_count or step >= len(bindings.sequences[rule]):
+                continue
+            offset_ns, action, key = bindings.sequences[rule][step]
+            entry = {
+                'binding': bindings.names[rule],
+                'step': step,
+                'action': 'press' if action == STEP_PRESS else 'release',
+                'key': key,
+                'at_ms': offset_ns / 1_000_000,
+            }
+            entry.update(histogram.summary())
+            report.append(entry)
+        return report
+
+    def evaluate_rule(self, index, edge_ns=None):
+        """Hold or release one rule's output; edge_ns, when given, is recorded as latency"""
+        bindings = self.bindings
+        active = (self.enabled and self.pressed_mask & bindings.trigger_masks[index] != 0
+                  and not self.conditions & bindings.inhibit_masks[index])
+        if active == self.rule_active[index]:
+            return
+        self.rule_active[index] = active
+
+        if bindings.sequences[index]:
+            if active:
+                self.start_timeline(index)
+            else:
+                self.stop_timeline(index)
+        output = bindings.outputs[index]
+        if output is None:
+            return
+        if active:
+            self.claim_output(output, edge_ns)
+        else:
+            self.drop_output(output, edge_ns)
+
+    def evaluate_all(self):
+        for index in range(self.bindings.rule_count):
+            self.evaluate_rule(index)
+        self.publish_status()
+
+    def set_condition(self, bit, value, edge_ns=None):
+        """Set or clear an inhibit condition and re-evaluate the rules it affects"""
+        conditions = self.conditions | bit if value else self.conditions & ~bit
+        if conditions == self.conditions:
+            return
+        self.conditions = conditions
+        for index in self.bindings.condition_rules[bit]:
+            self.evaluate_rule(index, edge_ns)
+
+    def set_key(self, key, pressed, edge_ns=None):
+        """Apply one trigger key edge to the rules that use that key"""
+        bit = self.bindings.key_bits.get(key)
+        if bit is None:
+            return
+        mask = self.pressed_mask | bit if pressed else self.pressed_mask & ~bit
+        if mask == self.pressed_mask:
+            return
+        self.pressed_mask = mask
+        for index in self.bindings.key_rules[key]:
+            self.evaluate_rule(index, edge_ns)
+        if self.holding and self.hold_guard_ms != HOLD_GUARD_MS:
+            # A fresh edge is when a lost key-up is most likely; check soon again
+            self.hold_guard_ms = HOLD_GUARD_MS
+            self.arm('hold_guard', self.backend.monotonic_ns() + HOLD_GUARD_MS * 1_000_000, self.on_hold_guard)
+        self.publish_status()
+
+    def on_mouse_button(self, button, pressed):
+        """Mouse listener callback: queue the edge and return"""
+        code = MOUSE_BUTTON_CODES.get(button)
+        if code is not None:
+            self.queue.push(self.backend.monotonic_ns(), EV_MOUSE, code, 1 if pressed else 0)
+
+    def handle_mouse_button(self, button, pressed, edge_ns):
+        """Mouse edge from any source, stamped with the event's own timestamp"""
+        if button in self.held_buttons:
+            # The listener also sees the engine's own synthetic press; a right
+            # click output must not open the scope and inhibit itself. Its
+            # release arrives after held_buttons lets go, and the scope
+            # ignores an up without a down.
+            return
+        hotkey_key = MOUSE_HOTKEY_NAMES.get(button)
+        if hotkey_key is not None and self.hotkey.key_event(hotkey_key, pressed):
+            self.apply_toggle(edge_ns)
+        if button != 'right':
+            return
+        if pressed:
+            result = self.scope.press(edge_ns)
+        else:
+            result = self.scope.release(edge_ns)
+        if result == IGNORED:
+            return
+        if result == TAP:
+            self.stats.count(SCOPE_TOGGLES)
+        elif result == HOLD:
+            self.stats.count(SCOPE_HOLDS)
+
+        self.set_condition(COND_SCOPE, self.scope.active)
+        self.publish_status()
+        self.arm_scope_reset()
+
+        if not pressed:
+            self.latency.scope.record(self.backend.monotonic_ns() - edge_ns)
+
+    def arm_scope_reset(self):
+        """Keep the auto-reset deadline in step with the scope state machine"""
+        deadline = self.scope.reset_deadline()
+        if deadline is None:
+            self.deadlines.cancel('scope_reset')
+        else:
+            self.arm('scope_reset', deadline, self.on_scope_reset)
+
+    def key_code(self, key):
+        """Stable small integer for a key name, used in queued records"""
+        code = self.key_codes.get(key)
+        if code is None:
+            code = len(self.key_names)
+            self.key_codes[key] = code
+            self.key_names.append(key)
+        return code
+
+    def hook_codes(self, key):
+        codes = self.hook_code_cache.get(key)
+        if codes is None:
+            codes = self.hook_code_cache[key] = self.backend.hook_codes(key)
+        return codes
+
+    def update_key_filter(self):
+        """Choose the keys the keyboard hook forwards: triggers in event mode, and the hotkey"""
+        keys = list(self.hotkey.keyboard_keys)
+        if self.engine_mode == 'Event':
+            keys += self.bindings.trigger_keys
+        hook_map = {}
+        for key in keys:
+            code = self.key_code(key)
+            for hook_code in self.hook_codes(key):
+                hook_map[hook_code] = code
+        self.hook_map = hook_map
+
+    def install_hooks(self):
+        """Queue down/up events of the filtered keys for the engine thread"""
+        if self.keyboard_hook is not None:
+            return
+        push = self.queue.push
+        now = self.backend.monotonic_ns
+
+        def callback(hook_code, pressed):
+            code = self.hook_map.get(hook_code)
+            if code is not None:
+                push(now(), EV_KEY, code, 1 if pressed else 0)
+        try:
+            self.keyboard_hook = self.backend.hook_keyboard(callback)
+        except Exception as e:
+            EVENT_LOG.error('engine', 'keyboard_hook_failed', None, e)
+
+    def remove_hooks(self):
+        if self.keyboard_hook is None:
+            return
+        try:
+            self.backend.unhook_keyboard(self.keyboard_hook)
+        except Exception as e:
+            EVENT_LOG.warning('engine', 'keyboard_unhook_failed', None, e)
+        self.keyboard_hook = None
+
+    def start(self):
+        """Attach the mouse listener and the keyboard hook"""
+        if self.trace is not None:
+            self.trace.meta(self.backend.monotonic_ns(), {'config': engine_config(self)})
+        self.mouse_listener = self.backend.add_mouse_listener(self.on_mouse_button)
+        self.update_key_filter()
+        self.install_hooks()
+        self.schedule_poll()
+
+    def schedule_poll(self):
+        """Keep the polling deadline armed only while the polling engine is enabled"""
+        if self.enabled and self.engine_mode == 'Polling' and self.mouse_listener is not None:
+            if not self.deadlines.armed('poll'):
+                self.arm('poll', self.backend.monotonic_ns() + POLL_INTERVAL_MS * 1_000_000, self.on_poll)
+        else:
+            self.deadlines.cancel('poll')
+
+    def on_poll(self, now_ns):
+        for key in self.bindings.trigger_keys:
+            self.set_key(key, self.key_state(key), now_ns)
+        self.schedule_poll()
+
+    def on_scope_reset(self, now_ns):
+        """Auto-reset scope after the profile's reset timeout of inactivity"""
+        if self.scope.expire(now_ns):
+            self.stats.count(AUTO_RESETS)
+            self.set_condition(COND_SCOPE, self.scope.active)
+            self.publish_status()
+        self.arm_scope_reset()
+
+    def on_hold_guard(self, now_ns):
+        self.watchdog_check()
+        if self.holding:
+            self.hold_guard_ms = min(self.hold_guard_ms * 2, HOLD_GUARD_MAX_MS)
+            self.arm('hold_guard', now_ns + self.hold_guard_ms * 1_000_000, self.on_hold_guard)
+
+    def watchdog_check(self):
+        """Release outputs whose trigger keys are no longer physically down"""
+        if not self.holding:
+            return
+        for key, bit in self.bindings.key_bits.items():
+            # A key-up was missed; resync the hook state with reality
+            if self.pressed_mask & bit and not self.key_state(key):
+                self.stats.count(FORCED_RELEASES)
+                EVENT_LOG.warning('engine', 'forced_release', {'key': key})
+                self.set_key(key, False)
+
+    def apply_toggle(self, t_ns, enabled=None):
+        """Enable, disable or (enabled=None) flip the macro, recording it in the trace"""
+        if enabled is None:
+            enabled = not self.enabled
+        if self.trace is not None:
+            self.trace.record(t_ns, self.backend.monotonic_ns() - t_ns, DEV_CONTROL,
+                              1 if enabled else 0, CONTROL_ENABLE)
+        self.change_enabled(enabled)
+
+    def dispatch(self, record):
+        t_ns, kind, code, value, payload = record
+        if kind == EV_KEY:
+            key = self.key_names[code]
+            if self.trace is not None:
+                self.trace.key(t_ns, self.backend.monotonic_ns() - t_ns, DEV_KEY, key, value)
+            if self.hotkey.key_event(key, value == 1):
+                self.apply_toggle(t_ns)
+            if self.enabled:
+                self.set_key(key, value == 1, t_ns)
+        elif kind == EV_MOUSE:
+            if self.trace is not None:
+                self.trace.record(t_ns, self.backend.monotonic_ns() - t_ns, DEV_MOUSE, value, code)
+            self.handle_mouse_button(MOUSE_BUTTON_NAMES[code], value == 1, t_ns)
+        elif code == CTRL_ENABLE:
+            self.apply_toggle(t_ns, value == 1)
+        elif code == CTRL_TOGGLE:
+            self.apply_toggle(t_ns)
+        elif code == CTRL_CALL:
+            function, args = payload
+            function(*args)
+            if self.trace is not None:
+                # The handler's name lets replay repeat exactly this change
+                self.trace.meta(self.backend.monotonic_ns(),
+                                {'config': engine_config(self), 'call': function.__name__})
+        elif code == CTRL_SHUTDOWN:
+            self.running = False
+
+    def pump(self):
+        """Process every queued record and due deadline on the calling thread"""
+        for record in self.queue.drain():
+            try:
+                self.dispatch(record)
+            except Exception as e:
+                EVENT_LOG.error('engine', 'dispatch_failed', {'kind': record[1], 'code': record[2]}, e)
+                self.release_all()
+        now_ns = self.backend.monotonic_ns()
+        if self.trace is not None:
+            deadline = self.deadlines.next_deadline()
+            if deadline is not None and deadline <= now_ns:
+                self.trace.record(now_ns, 0, DEV_TIMER, TIMER_RUN, 0)
+        self.deadlines.run_due(now_ns, self.deadline_failed)
+
+    def deadline_failed(self, name, e):
+        """A deadline callback raised: let go of everything rather than leave a key stuck"""
+        EVENT_LOG.error('engine', 'deadline_failed', {'deadline': name}, e)
+        self.release_all()
+
+    def run(self):
+        """Engine thread body: sleep until an event arrives or a deadline is due"""
+        self.running = True
+        try:
+            self.start()
+            while self.running:
+                self.pump()
+                if not self.running:
+                    break
+                deadline = self.deadlines.next_deadline()
+                spin_until = None
+                if deadline is None:
+                    timeout = None
+                else:
+                    if self.timelines and deadline == self.deadlines.deadline('timeline'):
+                        # Sleep until just before a sequence step, then spin onto it
+                        spin_until = deadline
+                        deadline -= SPIN_MARGIN_NS
+                    timeout = max(0, deadline - self.backend.monotonic_ns()) / 1_000_000_000
+                if self.trace is not None:
+                    self.trace.flush()
+                self.queue.wait(timeout)
+                if spin_until is not None:
+                    while self.backend.monotonic_ns() < spin_until and not self.queue.pending():
+                        pass
+                self.wakeups.record(self.backend.monotonic_ns(), 'input' if self.queue.pending() else 'deadline')
+        finally:
+            # Whatever ended the loop, unhook and release held outputs
+            self.running = False
+            self.stop()
+
+    def release_all(self):
+        for index in list(self.timelines):
+            self.stop_timeline(index)
+        for index in range(self.bindings.rule_count):
+            self.rule_active[index] = False
+        self.output_refs = {}
+        for output in list(self.held_outputs):
+            self.release_output(output)
+        self.publish_status()
+
+    def stop(self):
+        if self.trace is not None:
+            self.trace.record(self.backend.monotonic_ns(), 0, DEV_CONTROL, 0, CONTROL_STOP)
+        self.enabled = False
+        self.pressed_mask = 0
+        self.deadlines.cancel('poll')
+        self.deadlines.cancel('scope_reset')
+        self.remove_hooks()
+        if self.mouse_listener is not None:
+            try:
+                self.backend.remove_mouse_listener(self.mouse_listener)
+            except Exception as e:
+                EVENT_LOG.warning('engine', 'mouse_listener_removal_failed', None, e)
+            self.mouse_listener = None
+        self.release_all()
+        if self.trace is not None:
+            self.trace.flush()
@@ -0,0 +1,9 @@
+"""Peak & Aim Assistant entry point; imports no Qt so the spawned engine process does not either"""
+import multiprocessing
+
+if __name__ == '__main__':
+    # A spawned engine process re-runs this script (or the frozen executable)
+    # first; freeze_support() runs the engine there and exits
+    multiprocessing.freeze_support()
+    from peak_aim_gui import main
+    main()
@@ -0,0 +1,1468 @@
+"""Qt GUI of Peak & Aim Assistant; started through the Qt-free peak_aim.py"""
+from startup_timing import StartupTimer
+
+# Created before the Qt imports so their cost shows up in the breakdown
+STARTUP = StartupTimer()
+
+import sys
+import os
+import copy
+import hashlib
+import json
+import time
+import webbrowser
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                             QHBoxLayout, QPushButton, QLabel, QLineEdit, 
+                             QCheckBox, QSystemTrayIcon, QMenu, QAction, QMessageBox, QComboBox, QDialog,
+                             QFileDialog, QActionGroup, QInputDialog)
+from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal
+from PyQt5.QtGui import QIcon, QFont, QFontMetrics, QPalette, QColor, QPixmap, QCursor, QPainter
+from input_backend import SystemInputBackend
+from macro_engine import MacroEngine, ENGINE_MODES
+from latency import LatencyStats, latency_level
+from app_paths import user_cache_dir
+from event_log import EVENT_LOG
+from settings_store import SettingsStore, changed_settings
+from settings_watcher import SettingsWatcher
+from instance_lock import InstanceLock
+from control_socket import (ControlError, ControlServer, NotRunningError, engine_stats, engine_status,
+                            send_command)
+from input_trace import TraceWriter, new_trace_path
+from engine_process import EngineProcess, EngineProcessError, RemoteProfiling
+from session_stats import COUNTER_LABELS, COUNTER_NAMES, StatsWriter, all_time_totals
+from hotkeys import MODIFIERS, HotkeyError, parse_hotkey
+from bindings import DEFAULT_BINDINGS, BindingError, compile_bindings
+from profiles import (ENGINE_FIELDS, ProfileSwitcher, changed_fields, default_foreground_provider,
+                      find_profile, new_profile, normalize_profile)
+from profiling import profiling_session
+
+STARTUP.mark('imports')
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+def load_scaled_pixmap(relative_path, width, height, cache_dir=None):
+    """Load an image at display size, reusing a cached pre-scaled copy.
+    
+    The cache key includes a hash of the source file, so a replaced image
+    is rescaled once instead of the full-size original being decoded on
+    every start.
+    """
+    source = resource_path(relative_path)
+    try:
+        with open(source, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    except OSError:
+        return None
+    
+    stem = os.path.splitext(os.path.basename(relative_path))[0]
+    cache_path = os.path.join(cache_dir or user_cache_dir(), f"{stem}-{width}x{height}-{digest}.png")
+    if os.path.exists(cache_path):
+        pixmap = QPixmap(cache_path)
+        if not pixmap.isNull():
+            return pixmap
+    
+    pixmap = QPixmap(source).scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        pixmap.save(cache_path, "PNG")
+    except OSError:
+        pass
+    return pixmap
+
+# Complete keyboard keys list
+MACRO_HOTKEYS = [
+    # Function Keys
+    'F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7', 'F8', 'F9', 'F10', 'F11', 'F12',
+    # Numbers
+    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0',
+    # Letters
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
+    # Modifiers
+    'Shift', 'Ctrl', 'Alt', 'CapsLock', 'Tab', 'Esc', 'Backspace', 'Enter',
+    # Navigation
+    'Up', 'Down', 'Left', 'Right', 'Home', 'End', 'PageUp', 'PageDown',
+    # Editing
+    'Insert', 'Delete', 'Space', 'Pause',
+    # Numpad
+    'Num0', 'Num1', 'Num2', 'Num3', 'Num4', 'Num5', 'Num6', 'Num7', 'Num8', 'Num9',
+    'NumLock', 'Num/', 'Num*', 'Num-', 'Num+', 'NumEnter', 'NumDel',
+    # Special Characters
+    '-', '=', '[', ']', ';', "'", '`', ',', '.', '/', '\\', 'ScrollLock',
+    # Mouse side buttons
+    'Mouse4', 'Mouse5'
+]
+
+# Modifiers the settings dialog can add to the macro hotkey
+HOTKEY_MODIFIERS = ['Ctrl', 'Shift', 'Alt']
+
+AIM_BUTTONS = [
+    # Letters
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
+    # Numbers
+    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0',
+    # Common Keys
+    'Space', 'Shift', 'Ctrl', 'Alt', 'Tab', 'Enter', 'CapsLock',
+    # Navigation
+    'Up', 'Down', 'Left', 'Right',
+    # Numpad
+    'Num0', 'Num1', 'Num2', 'Num3', 'Num4', 'Num5', 'Num6', 'Num7', 'Num8', 'Num9',
+    # Special
+    '-', '=', '[', ']', ';', "'", '`', ',', '.', '/', '\\',
+    # Mouse Buttons
+    'Left Click', 'Right Click', 'Middle Click'
+]
+
+# Main window status dot/text style, keyed by active
+MAIN_STATUS_STYLES = {True: "color: #00FF00;", False: "color: #FF0000;"}
+
+class OverlayWindow(QWidget):
+    """Status line over the game, blitted from pre-rendered pixmaps.
+
+    Each (active, scope open, background, aim held, latency level) variant
+    is painted into a pixmap once and reused, and the window keeps one fixed
+    size, so a status change is a dictionary lookup and a single blit with
+    no stylesheet, layout or resize work.
+    """
+    PADDING = 5
+    INDICATOR_WIDTH = 16
+    BACKGROUND = QColor(0, 0, 0, 180)
+    STATUS_COLORS = {True: QColor("#00FF00"), False: QColor("#FF0000")}
+    # Indicator dot while the aim key is held, by latency level (fast/ok/slow)
+    LATENCY_COLORS = (QColor("#00FF00"), QColor("#FFD000"), QColor("#FF4000"))
+    IDLE_COLOR = QColor(128, 128, 128)
+    
+    def __init__(self, show_indicator=False):
+        super().__init__()
+        self.setWindowFlags(
+            Qt.WindowStaysOnTopHint | 
+            Qt.FramelessWindowHint | 
+            Qt.Tool |
+            Qt.WindowTransparentForInput
+        )
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        
+        self.text_font = QFont("Consolas", 10, QFont.Bold)
+        metrics = QFontMetrics(self.text_font)
+        self.text_width = max(metrics.horizontalAdvance(self.status_text(active, scope_open))
+                              for active in (True, False) for scope_open in (True, False))
+        self.text_height = metrics.height()
+        self.text_ascent = metrics.ascent()
+        self.pixmaps = {}
+        self.current_state = None
+        self.show_indicator = False
+        self.set_indicator(show_indicator)
+        self.update_status(False, False, True)
+    
+    @staticmethod
+    def status_text(active, scope_open):
+        status = "ACTIVE" if active else "INACTIVE"
+        scope = "OPEN" if scope_open else "CLOSED"
+        return f"● {status} | Scope: {scope}"
+    
+    def set_indicator(self, enabled):
+        """Show or hide the hold/latency dot; the only time the size changes"""
+        self.show_indicator = enabled
+        width = self.text_width + 2 * self.PADDING + (self.INDICATOR_WIDTH if enabled else 0)
+        self.setFixedSize(width, self.text_height + 2 * self.PADDING)
+        self.pixmaps.clear()
+        if self.current_state is not None:
+            state, self.current_state = self.current_state, None
+            self.update_status(*state)
+    
+    def render_state(self, state):
+        active, scope_open, show_bg, held, latency_level = state
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        if show_bg:
+            painter.fillRect(0, 0, self.width(), self.height(), self.BACKGROUND)
+        painter.setFont(self.text_font)
+        painter.setPen(self.STATUS_COLORS[active])
+        painter.drawText(self.PADDING, self.PADDING + self.text_ascent, self.status_text(active, scope_open))
+        
+        if self.show_indicator:
+            diameter = 8
+            x = self.PADDING + self.text_width + (self.INDICATOR_WIDTH - diameter) // 2
+            y = (self.height() - diameter) // 2
+            if held:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self.LATENCY_COLORS[latency_level])
+            else:
+                painter.setPen(self.IDLE_COLOR)
+                painter.setBrush(Qt.NoBrush)
+            painter.drawEllipse(x, y, diameter, diameter)
+        painter.end()
+        return pixmap
+    
+    def update_status(self, active, scope_open, show_bg, held=False, latency_level=0):
+        if not self.show_indicator:
+            held, latency_level = False, 0
+        state = (active, scope_open, show_bg, held, latency_level)
+        if state == self.current_state:
+            return
+        
+        if state not in self.pixmaps:
+            self.pixmaps[state] = self.render_state(state)
+        self.current_state = state
+        self.update()
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.drawPixmap(0, 0, self.pixmaps[self.current_state])
+        painter.end()
+
+class MacroThread(QThread):
+    # Emitted only when the engine's status changes; read it with take_status()
+    status_changed = pyqtSignal()
+    
+    def __init__(self, backend, aim_button='o', engine_mode='Event', bindings=None, trace=None):
+        super().__init__()
+        self.engine = MacroEngine(backend, aim_button, engine_mode, bindings, trace)
+        self.engine.status.notify = self.status_changed.emit
+    
+    def take_status(self):
+        """Latest (active, scope open, aim held) state"""
+        return self.engine.status.take()
+    
+    @property
+    def enabled(self):
+        return self.engine.enabled
+    
+    @property
+    def aim_button(self):
+        return self.engine.aim_button
+        
+    def set_aim_button(self, button):
+        """Update the aim button key"""
+        self.engine.set_aim_button(button)
+    
+    def set_bindings(self, bindings):
+        self.engine.set_bindings(bindings)
+    
+    def set_enabled(self, enabled):
+        self.engine.set_enabled(enabled)
+    
+    def toggle(self):
+        self.engine.toggle()
+    
+    def set_hotkey(self, hotkey):
+        """Match a new toggle hotkey inside the engine's input hook"""
+        self.engine.set_hotkey(hotkey)
+    
+    def set_engine_mode(self, mode):
+        self.engine.set_engine_mode(mode)
+    
+    def apply_profile(self, profile):
+        """Rebind the running engine to a profile without restarting the thread"""
+        self.engine.apply_profile(profile['aim_button'], profile['bindings'],
+                                  profile['scope_tap_ms'], profile['scope_reset_seconds'])
+    
+    def unresolved_keys(self):
+        return self.engine.unresolved
+    
+    def latency_report(self):
+        """({latency name: text}, engine wakeups per minute)"""
+        engine = self.engine
+        texts = {name: engine.latency.describe(name) for name in LatencyStats.NAMES}
+        return texts, engine.wakeups.per_minute(engine.backend.monotonic_ns())
+    
+    def export_latency(self, path):
+        self.engine.latency.export_json(path, {'timeline_steps': self.engine.timeline_report()})
+    
+    def reset_latency(self):
+        self.engine.latency.reset()
+    
+    def last_press_ns(self):
+        return self.engine.latency.press.last
+    
+    def session_summary(self):
+        return self.engine.stats.summary()
+    
+    def status_payload(self, profile_name):
+        return engine_status(self.engine, profile_name)
+    
+    def stats_payload(self):
+        return engine_stats(self.engine)
+    
+    def run(self):
+        self.engine.run()
+    
+    def stop(self):
+        self.engine.shutdown()
+
+class MacroProcess(QObject):
+    """MacroThread's interface for an engine running in its own process.
+
+    Hotkeys and bindings are checked here first, so errors surface in the
+    GUI just as with the in-process engine. Status comes from the shared
+    block; everything else is a command or query over the control pipe.
+    """
+    status_changed = pyqtSignal()
+    # New output keys the engine process could not resolve
+    unresolved_changed = pyqtSignal()
+    # The engine process ended without being stopped
+    exited = pyqtSignal()
+    
+    def __init__(self, aim_button, engine_mode, bindings, record_traces, record_stats,
+                 backend_factory=SystemInputBackend, stats_path=None, trace_dir=None):
+        super().__init__()
+        self.current_aim = aim_button.lower()
+        self.engine_mode = engine_mode
+        self.process = EngineProcess({
+            'aim_button': aim_button,
+            'engine_mode': engine_mode,
+            'bindings': bindings,
+            'record_traces': record_traces,
+            'record_stats': record_stats,
+            'stats_path': stats_path,
+            'trace_dir': trace_dir,
+        }, self.status_changed.emit, self.unresolved_changed.emit, self.exited.emit, backend_factory)
+    
+    def send(self, name, *args):
+        try:
+            self.process.send(name, *args)
+        except EngineProcessError as e:
+            # The exited signal reports the lost engine to the user
+            EVENT_LOG.warning('engine_process', 'send_failed', {'command': name}, e)
+    
+    def take_status(self):
+        return self.process.take_status()
+    
+    @property
+    def enabled(self):
+        return bool(self.process.read_status()[0])
+    
+    @property
+    def aim_button(self):
+        return self.current_aim
+    
+    def set_aim_button(self, button):
+        self.current_aim = button.lower()
+        self.send('set_aim_button', button)
+    
+    def set_bindings(self, bindings):
+        compile_bindings(bindings, self.current_aim)
+        self.send('set_bindings', bindings)
+    
+    def set_enabled(self, enabled):
+        self.send('set_enabled', enabled)
+    
+    def toggle(self):
+        self.send('toggle')
+    
+    def set_hotkey(self, hotkey):
+        parse_hotkey(hotkey)
+        self.send('set_hotkey', hotkey)
+    
+    def set_engine_mode(self, mode):
+        self.engine_mode = mode
+        self.send('set_engine_mode', mode)
+    
+    def apply_profile(self, profile):
+        compile_bindings(profile['bindings'], profile['aim_button'])
+        self.current_aim = profile['aim_button'].lower()
+        self.send('apply_profile', profile['aim_button'], profile['bindings'],
+                  profile['scope_tap_ms'], profile['scope_reset_seconds'])
+    
+    def unresolved_keys(self):
+        return self.process.unresolved
+    
+    def latency_report(self):
+        try:
+            return self.process.query('latency')
+        except EngineProcessError:
+            return {}, 0
+    
+    def export_latency(self, path):
+        self.process.query('export_latency', path)
+    
+    def reset_latency(self):
+        self.send('reset_latency')
+    
+    def last_press_ns(self):
+        return self.process.read_status()[3]
+    
+    def session_summary(self):
+        try:
+            return self.process.query('summary')
+        except EngineProcessError as e:
+            return [str(e)]
+    
+    def status_payload(self, profile_name):
+        enabled, scope_open, aim_held, _, _ = self.process.read_status()
+        return {
+            'enabled': bool(enabled),
+            'scope_open': bool(scope_open),
+            'aim_held': bool(aim_held),
+            'profile': profile_name,
+            'engine_mode': self.engine_mode,
+        }
+    
+    def stats_payload(self):
+        return self.process.query('stats')
+    
+    def start(self):
+        self.process.start()
+    
+    def stop(self):
+        self.process.stop()
+    
+    def wait(self):
+        return True
+
+class SettingsDialog(QDialog):
+    def __init__(self, parent, current_hotkey, current_aim, current_mode, current_processes):
+        super().__init__(parent)
+        self.setWindowTitle("Settings")
+        self.setFixedSize(400, 320)
+        
+        palette = QPalette()
+        palette.setColor(QPalette.Window, QColor(30, 30, 30))
+        palette.setColor(QPalette.WindowText, Qt.white)
+        self.setPalette(palette)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        
+        # Title
+        title = QLabel("⚙ Settings")
+        title.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        title.setStyleSheet("color: white;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Macro Hotkey
+        hotkey_layout = QHBoxLayout()
+        hotkey_label = QLabel("Macro Hotkey:")
+        hotkey_label.setStyleSheet("color: #CCCCCC;")
+        hotkey_label.setFixedWidth(120)
+        hotkey_layout.addWidget(hotkey_label)
+        
+        hotkey_modifiers, hotkey_key = self.split_hotkey(current_hotkey)
+        self.hotkey_combo = QComboBox()
+        self.hotkey_combo.addItems(MACRO_HOTKEYS)
+        self.hotkey_combo.setCurrentText(hotkey_key)
+        self.hotkey_combo.setMaxVisibleItems(10)
+        hotkey_layout.addWidget(self.hotkey_combo)
+        layout.addLayout(hotkey_layout)
+        
+        # Modifiers held with the hotkey, e.g. Ctrl+Shift+F8
+        modifier_layout = QHBoxLayout()
+        modifier_label = QLabel("Hold With:")
+        modifier_label.setStyleSheet("color: #CCCCCC;")
+        modifier_label.setFixedWidth(120)
+        modifier_layout.addWidget(modifier_label)
+        
+        self.modifier_checks = {}
+        for modifier in HOTKEY_MODIFIERS:
+            check = QCheckBox(modifier)
+            check.setStyleSheet("color: #CCCCCC;")
+            check.setChecked(modifier in hotkey_modifiers)
+            modifier_layout.addWidget(check)
+            self.modifier_checks[modifier] = check
+        layout.addLayout(modifier_layout)
+        
+        # Aim Button
+        aim_layout = QHBoxLayout()
+        aim_label = QLabel("Aim Button:")
+        aim_label.setStyleSheet("color: #CCCCCC;")
+        aim_label.setFixedWidth(120)
+        aim_layout.addWidget(aim_label)
+        
+        self.aim_combo = QComboBox()
+        self.aim_combo.addItems(AIM_BUTTONS)
+        self.aim_combo.setCurrentText(current_aim)
+        self.aim_combo.setMaxVisibleItems(10)
+        aim_layout.addWidget(self.aim_combo)
+        layout.addLayout(aim_layout)
+        
+        # Input Engine
+        mode_layout = QHBoxLayout()
+        mode_label = QLabel("Input Engine:")
+        mode_label.setStyleSheet("color: #CCCCCC;")
+        mode_label.setFixedWidth(120)
+        mode_layout.addWidget(mode_label)
+        
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(ENGINE_MODES)
+        self.mode_combo.setCurrentText(current_mode)
+        mode_layout.addWidget(self.mode_combo)
+        layout.addLayout(mode_layout)
+        
+        # Game processes that select this profile automatically
+        process_layout = QHBoxLayout()
+        process_label = QLabel("Game Processes:")
+        process_label.setStyleSheet("color: #CCCCCC;")
+        process_label.setFixedWidth(120)
+        process_layout.addWidget(process_label)
+        
+        self.process_input = QLineEdit(", ".join(current_processes))
+        self.process_input.setPlaceholderText("e.g. AndroidEmulatorEn.exe")
+        process_layout.addWidget(self.process_input)
+        layout.addLayout(process_layout)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        save_btn = QPushButton("Apply & Save")
+        save_btn.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        save_btn.clicked.connect(self.accept)
+        button_layout.addWidget(save_btn)
+        
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.reject)
+        button_layout.addWidget(close_btn)
+        
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+    
+    @staticmethod
+    def split_hotkey(hotkey):
+        """Dialog modifiers and key of a hotkey string such as Ctrl+Shift+F8"""
+        try:
+            keys = parse_hotkey(hotkey)
+        except HotkeyError:
+            return [], hotkey
+        names = {name.lower(): name for name in MACRO_HOTKEYS}
+        modifiers = [name for name in HOTKEY_MODIFIERS if name.lower() in keys]
+        rest = [key for key in keys if key not in MODIFIERS]
+        if len(rest) != 1:
+            # A modifier on its own, or a chord the dialog cannot show
+            return [], hotkey
+        return modifiers, names.get(rest[0], rest[0])
+    
+    def get_hotkey(self):
+        key = self.hotkey_combo.currentText()
+        modifiers = [name for name, check in self.modifier_checks.items()
+                     if check.isChecked() and name != key]
+        return "+".join(modifiers + [key])
+    
+    def get_values(self):
+        processes = [name.strip() for name in self.process_input.text().split(",") if name.strip()]
+        return (self.get_hotkey(), self.aim_combo.currentText(),
+                self.mode_combo.currentText(), processes)
+
+class ClickableLabel(QLabel):
+    """Custom clickable label for links"""
+    def __init__(self, text, url, parent=None):
+        super().__init__(text, parent)
+        self.url = url
+        self.setCursor(QCursor(Qt.PointingHandCursor))
+        
+    def mousePressEvent(self, event):
+        webbrowser.open(self.url)
+
+class MainWindow(QMainWindow):
+    # Raised from the settings writer thread
+    settings_error = pyqtSignal(str)
+    # Raised from the foreground watcher thread and the control socket
+    profile_requested = pyqtSignal(str)
+    # Raised from the control socket when another launch asks for the window
+    show_requested = pyqtSignal()
+    # Raised from the settings file watcher after settings.json changed on disk
+    settings_file_changed = pyqtSignal()
+    
+    def __init__(self, backend=None, settings_store=None, foreground_provider=None, profiling=False,
+                 engine_process=False, backend_factory=SystemInputBackend, control_transport=None,
+                 data_dir=None):
+        super().__init__()
+        self.engine_process = engine_process
+        # data_dir keeps the stats database, traces and image cache out of the
+        # user's directories (benchmarks); None uses the usual locations
+        self.data_dir = data_dir
+        self.stats_path = os.path.join(data_dir, "stats.sqlite3") if data_dir else None
+        self.trace_dir = os.path.join(data_dir, "traces") if data_dir else None
+        # With engine_process the input backend is created in the engine process instead
+        self.backend = None if engine_process else backend or SystemInputBackend()
+        self.settings_store = settings_store or SettingsStore()
+        self.settings_store.on_error = lambda e: self.settings_error.emit(str(e))
+        self.settings_error.connect(self.show_settings_error)
+        self.status_active = False
+        self.status_scope_open = False
+        self.status_held = False
+        self.shown_active = None
+        self.ui_built = False
+        self.load_settings()
+        
+        self.trace_writer = None
+        if self.record_traces and not engine_process:
+            try:
+                self.trace_writer = TraceWriter(new_trace_path(self.trace_dir))
+            except OSError as e:
+                EVENT_LOG.warning('trace', 'open_failed', {'directory': self.trace_dir}, e)
+        
+        with STARTUP.measure('engine'):
+            if engine_process:
+                # The engine process records its own traces and stats
+                self.macro_thread = MacroProcess(self.aim_button, self.engine_mode, self.bindings,
+                                                 self.record_traces, self.record_stats, backend_factory,
+                                                 self.stats_path, self.trace_dir)
+                self.macro_thread.unresolved_changed.connect(self.report_unresolved_keys)
+                self.macro_thread.exited.connect(self.engine_process_exited)
+            else:
+                self.macro_thread = MacroThread(self.backend, self.aim_button, self.engine_mode, self.bindings,
+                                                self.trace_writer)
+            self.macro_thread.apply_profile(self.current_profile)
+            self.macro_thread.status_changed.connect(self.on_status_changed)
+            self.macro_thread.start()
+        
+        self.stats_writer = None
+        if self.record_stats and not engine_process:
+            self.stats_writer = StatsWriter(self.macro_thread.engine.stats, self.stats_path)
+            self.stats_writer.start()
+        
+        if foreground_provider is None:
+            foreground_provider = default_foreground_provider()
+        self.profile_switcher = ProfileSwitcher(foreground_provider, self.profile_requested.emit)
+        self.profile_switcher.set_profiles(self.profiles)
+        self.profile_requested.connect(self.switch_profile)
+        if self.auto_switch_profiles:
+            self.profile_switcher.start()
+        
+        with STARTUP.measure('tray'):
+            self.set_window_icon()
+            self.setup_tray()
+        STARTUP.milestone('time_to_tray')
+        
+        if self.binding_error:
+            self.tray_icon.showMessage("Peak & Aim Assistant",
+                                       f"Invalid bindings in settings, using defaults: {self.binding_error}",
+                                       QSystemTrayIcon.Warning)
+        self.reported_keys = 0
+        self.report_unresolved_keys()
+        
+        with STARTUP.measure('overlay'):
+            self.setup_overlay()
+        
+        with STARTUP.measure('hooks'):
+            self.register_hotkey(self.macro_hotkey)
+        STARTUP.milestone('time_to_first_hook')
+        
+        # Created when profiling is first switched on
+        self.profiling = None
+        if profiling:
+            self.profiling_action.setChecked(True)
+        
+        self.show_requested.connect(self.show_from_control)
+        self.control_server = ControlServer(self.control_commands(), control_transport)
+        self.control_server.start()
+        
+        self.settings_file_changed.connect(self.reload_settings)
+        self.settings_watcher = SettingsWatcher(self.settings_store.path, self.settings_file_changed.emit)
+        self.settings_watcher.start()
+        
+        # The window itself is only built the first time it is shown
+        if self.is_first_run or not self.start_minimized:
+            self.show()
+    
+    def setVisible(self, visible):
+        if visible and not self.ui_built:
+            with STARTUP.measure('window'):
+                self.init_ui()
+        super().setVisible(visible)
+        
+    def set_window_icon(self):
+        """Set window icon"""
+        icon_path = resource_path("icon.ico")
+        if os.path.exists(icon_path):
+            icon = QIcon(icon_path)
+            self.setWindowIcon(icon)
+        else:
+            pixmap = QPixmap(32, 32)
+            pixmap.fill(QColor(0, 255, 0))
+            self.setWindowIcon(QIcon(pixmap))
+    
+    def load_settings(self):
+        settings, self.is_first_run = self.settings_store.load()
+        self.overlay_x = settings['overlay_x']
+        self.overlay_y = settings['overlay_y']
+        self.overlay_bg = settings['overlay_bg']
+        self.overlay_indicator = settings['overlay_indicator']
+        self.start_minimized = settings['start_minimized']
+        self.engine_mode = settings['engine_mode']
+        self.auto_switch_profiles = settings['auto_switch_profiles']
+        self.record_traces = settings['record_traces']
+        self.record_stats = settings['record_stats']
+        self.profiles = [normalize_profile(profile) for profile in settings['profiles']] or [new_profile("Default")]
+        self.binding_error = None
+        
+        profile = find_profile(self.profiles, settings['active_profile']) or self.profiles[0]
+        self.load_profile(profile)
+    
+    def load_profile(self, profile):
+        """Make a profile the active one for hotkey, aim button and bindings"""
+        self.current_profile = profile
+        self.active_profile = profile['name']
+        self.macro_hotkey = profile['macro_hotkey']
+        self.aim_button = profile['aim_button']
+        self.bindings = profile['bindings']
+        try:
+            compile_bindings(self.bindings, self.aim_button)
+        except BindingError as e:
+            self.binding_error = str(e)
+            self.bindings = copy.deepcopy(DEFAULT_BINDINGS)
+            profile['bindings'] = self.bindings
+        if self.ui_built:
+            self.tip_label.setText(self.scope_tip_text())
+    
+    def scope_tip_text(self):
+        return f"Tip: Scope auto-resets after {self.current_profile['scope_reset_seconds']:g}s inactivity"
+    
+    def store_profile(self):
+        """Copy the live hotkey/aim/bindings back into the active profile"""
+        self.current_profile['macro_hotkey'] = self.macro_hotkey
+        self.current_profile['aim_button'] = self.aim_button
+        self.current_profile['bindings'] = self.bindings
+    
+    def save_settings(self):
+        """Queue the current settings; the store writes them off the GUI thread"""
+        self.store_profile()
+        self.settings_store.save({
+            'overlay_x': self.overlay_x,
+            'overlay_y': self.overlay_y,
+            'overlay_bg': self.overlay_bg,
+            'overlay_indicator': self.overlay_indicator,
+            'start_minimized': self.start_minimized,
+            'engine_mode': self.engine_mode,
+            'profiles': self.profiles,
+            'active_profile': self.active_profile,
+            'auto_switch_profiles': self.auto_switch_profiles,
+            'record_traces': self.record_traces,
+            'record_stats': self.record_stats
+        })
+    
+    def reload_settings(self):
+        """Apply an outside edit of settings.json, touching only what changed.
+
+        Engine changes go through the same in-place rebinds as the dialogs,
+        so keys held while the file is saved stay held.
+        """
+        try:
+            change = self.settings_store.reload()
+        except (OSError, ValueError, KeyError) as e:
+            EVENT_LOG.warning('settings', 'reload_failed', {'path': self.settings_store.path}, e)
+            self.tray_icon.showMessage("Peak & Aim Assistant", f"Ignored unreadable settings.json: {e}",
+                                       QSystemTrayIcon.Warning)
+            return
+        if change is None:
+            return
+        previous, settings = change
+        changed = changed_settings(previous, settings)
+        
+        if changed & {'overlay_x', 'overlay_y'}:
+            try:
+                self.overlay_x = int(settings['overlay_x'])
+                self.overlay_y = int(settings['overlay_y'])
+            except (TypeError, ValueError):
+                pass
+            self.overlay.move(self.overlay_x, self.overlay_y)
+        if 'overlay_bg' in changed:
+            self.overlay_bg = bool(settings['overlay_bg'])
+        if 'overlay_indicator' in changed:
+            self.overlay_indicator = bool(settings['overlay_indicator'])
+            self.overlay.set_indicator(self.overlay_indicator)
+        if changed & {'overlay_bg', 'overlay_indicator'}:
+            self.refresh_overlay()
+        if 'start_minimized' in changed:
+            self.start_minimized = bool(settings['start_minimized'])
+        # Both are attached when the engine starts and apply from the next launch
+        if 'record_traces' in changed:
+            self.record_traces = bool(settings['record_traces'])
+        if 'record_stats' in changed:
+            self.record_stats = bool(settings['record_stats'])
+        if 'engine_mode' in changed and settings['engine_mode'] in ENGINE_MODES:
+            self.engine_mode = settings['engine_mode']
+            self.macro_thread.set_engine_mode(self.engine_mode)
+        if changed & {'profiles', 'active_profile'}:
+            self.reload_profiles(settings)
+        if 'auto_switch_profiles' in changed:
+            self.auto_switch_profiles = bool(settings['auto_switch_profiles'])
+            if self.auto_switch_profiles:
+                self.profile_switcher.start()
+            else:
+                self.profile_switcher.stop()
+        self.sync_widgets()
+    
+    def reload_profiles(self, settings):
+        """Take the profile list from reloaded settings and rebind only what the active profile changed"""
+        self.store_profile()
+        old = self.current_profile
+        profiles = [normalize_profile(profile) for profile in settings['profiles']] or [new_profile("Default")]
+        profile = find_profile(profiles, settings['active_profile']) or profiles[0]
+        try:
+            compile_bindings(profile['bindings'], profile['aim_button'])
+        except BindingError as e:
+            profile['bindings'] = old['bindings']
+            self.tray_icon.showMessage("Peak & Aim Assistant",
+                                       f"Invalid bindings in settings.json, keeping the current ones: {e}",
+                                       QSystemTrayIcon.Warning)
+        self.profiles = profiles
+        self.load_profile(profile)
+        
+        changed = changed_fields(old, profile)
+        engine_changes = changed & ENGINE_FIELDS
+        if engine_changes == {'aim_button'}:
+            self.macro_thread.set_aim_button(self.aim_button)
+        elif engine_changes == {'bindings'}:
+            self.macro_thread.set_bindings(self.bindings)
+        elif engine_changes:
+            self.macro_thread.apply_profile(profile)
+        if 'macro_hotkey' in changed:
+            self.register_hotkey(self.macro_hotkey)
+            self.update_hotkey_texts()
+        self.profile_switcher.set_profiles(self.profiles)
+        self.report_unresolved_keys()
+    
+    def sync_widgets(self):
+        """Show reloaded values in the tray menu and window without re-running their handlers"""
+        checks = [(self.trace_action, self.record_traces)]
+        if self.ui_built:
+            self.x_input.setText(str(self.overlay_x))
+            self.y_input.setText(str(self.overlay_y))
+            checks += [(self.bg_check, self.overlay_bg), (self.indicator_check, self.overlay_indicator),
+                       (self.minimize_check, self.start_minimized)]
+        for widget, checked in checks:
+            widget.blockSignals(True)
+            widget.setChecked(checked)
+            widget.blockSignals(False)
+    
+    def show_settings_error(self, message):
+        self.tray_icon.showMessage("Peak & Aim Assistant", f"Could not save settings: {message}",
+                                   QSystemTrayIcon.Warning)
+    
+    def register_hotkey(self, key):
+        """Register the macro toggle hotkey"""
+        try:
+            self.macro_thread.set_hotkey(key)
+        except HotkeyError as e:
+            EVENT_LOG.warning('ui', 'hotkey_rejected', {'hotkey': key}, e)
+            self.tray_icon.showMessage("Peak & Aim Assistant", f"Could not use hotkey {key}: {e}",
+                                       QSystemTrayIcon.Warning)
+    
+    def report_unresolved_keys(self):
+        """Warn once about each output key the input backend cannot press"""
+        unresolved = self.macro_thread.unresolved_keys()
+        if len(unresolved) <= self.reported_keys:
+            return
+        names = ", ".join(unresolved[self.reported_keys:])
+        self.reported_keys = len(unresolved)
+        self.tray_icon.showMessage("Peak & Aim Assistant", f"These keys cannot be pressed and are ignored: {names}",
+                                   QSystemTrayIcon.Warning)
+    
+    def show_settings(self):
+        """Show settings dialog"""
+        dialog = SettingsDialog(self, self.macro_hotkey, self.aim_button, self.engine_mode,
+                                self.current_profile['processes'])
+        
+        if dialog.exec_() == QDialog.Accepted:
+            new_hotkey, new_aim, new_mode, new_processes = dialog.get_values()
+            
+            # Update macro hotkey
+            if new_hotkey != self.macro_hotkey:
+                self.macro_hotkey = new_hotkey
+                self.register_hotkey(new_hotkey)
+                self.update_hotkey_texts()
+            
+            # Update aim button
+            if new_aim != self.aim_button:
+                self.aim_button = new_aim
+                self.macro_thread.set_aim_button(new_aim)
+                self.report_unresolved_keys()
+            
+            # Update input engine
+            if new_mode != self.engine_mode:
+                self.engine_mode = new_mode
+                self.macro_thread.set_engine_mode(new_mode)
+            
+            # Update game processes of this profile
+            if new_processes != self.current_profile['processes']:
+                self.current_profile['processes'] = new_processes
+                self.profile_switcher.set_profiles(self.profiles)
+            
+            self.save_settings()
+            QMessageBox.information(self, "Success", "Settings saved successfully!")
+    
+    def init_ui(self):
+        self.setWindowTitle("Peak & Aim Assistant v1.0")
+        self.setFixedSize(400, 680)
+        
+        palette = QPalette()
+        palette.setColor(QPalette.Window, QColor(30, 30, 30))
+        palette.setColor(QPalette.WindowText, Qt.white)
+        self.setPalette(palette)
+        
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(8)
+        
+        # Title section with logo beside
+        title_container = QHBoxLayout()
+        title_container.addStretch()
+        
+        logo_pixmap = load_scaled_pixmap("logo.png", 64, 64, self.data_dir)
+        if logo_pixmap is not None:
+            logo_label = QLabel()
+            logo_label.setPixmap(logo_pixmap)
+            title_container.addWidget(logo_label)
+        
+        title_text_layout = QVBoxLayout()
+        title_text_layout.setSpacing(0)
+        
+        title = QLabel("Peak & Aim Assistant")
+        title.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        title.setStyleSheet("color: white;")
+        title_text_layout.addWidget(title)
+        
+        title_container.addLayout(title_text_layout)
+        title_container.addStretch()
+        
+        layout.addLayout(title_container)
+        
+        # Creator centered
+        creator = QLabel("Created by MAAKTHUNDER")
+        creator.setFont(QFont("Segoe UI", 9))
+        creator.setStyleSheet("color: #AAAAAA;")
+        creator.setAlignment(Qt.AlignCenter)
+        layout.addWidget(creator)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Status
+        status_layout = QHBoxLayout()
+        self.status_dot = QLabel("●")
+        self.status_dot.setFont(QFont("Segoe UI", 14))
+        self.status_dot.setStyleSheet("color: #FF0000;")
+        self.status_text = QLabel("INACTIVE")
+        self.status_text.setFont(QFont("Segoe UI", 10))
+        self.status_text.setStyleSheet("color: #FF0000;")
+        status_layout.addStretch()
+        status_layout.addWidget(self.status_dot)
+        status_layout.addWidget(self.status_text)
+        status_layout.addStretch()
+        layout.addLayout(status_layout)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Toggle button
+        self.toggle_btn = QPushButton(f"Toggle Macro ({self.macro_hotkey})")
+        self.toggle_btn.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        self.toggle_btn.setFixedHeight(40)
+        self.toggle_btn.clicked.connect(self.toggle_macro)
+        layout.addWidget(self.toggle_btn)
+        
+        # Settings button
+        settings_btn = QPushButton("⚙ Settings")
+        settings_btn.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        settings_btn.setFixedHeight(40)
+        settings_btn.clicked.connect(self.show_settings)
+        layout.addWidget(settings_btn)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Overlay position
+        pos_label = QLabel("Overlay Position:")
+        pos_label.setStyleSheet("color: #AAAAAA;")
+        layout.addWidget(pos_label)
+        
+        pos_layout = QHBoxLayout()
+        x_label = QLabel("X:")
+        x_label.setStyleSheet("color: white;")
+        pos_layout.addWidget(x_label)
+        self.x_input = QLineEdit(str(self.overlay_x))
+        self.x_input.setFixedWidth(80)
+        pos_layout.addWidget(self.x_input)
+        
+        y_label = QLabel("Y:")
+        y_label.setStyleSheet("color: white;")
+        pos_layout.addWidget(y_label)
+        self.y_input = QLineEdit(str(self.overlay_y))
+        self.y_input.setFixedWidth(80)
+        pos_layout.addWidget(self.y_input)
+        
+        apply_btn = QPushButton("Apply & Save")
+        apply_btn.clicked.connect(self.apply_position)
+        pos_layout.addWidget(apply_btn)
+        layout.addLayout(pos_layout)
+        
+        # Checkboxes
+        self.bg_check = QCheckBox("Show Background (Semi-transparent)")
+        self.bg_check.setStyleSheet("color: white;")
+        self.bg_check.setChecked(self.overlay_bg)
+        self.bg_check.stateChanged.connect(self.toggle_background)
+        layout.addWidget(self.bg_check)
+        
+        self.indicator_check = QCheckBox("Show Hold/Latency Indicator")
+        self.indicator_check.setStyleSheet("color: white;")
+        self.indicator_check.setChecked(self.overlay_indicator)
+        self.indicator_check.stateChanged.connect(self.toggle_indicator)
+        layout.addWidget(self.indicator_check)
+        
+        self.minimize_check = QCheckBox("Start Minimized to Tray")
+        self.minimize_check.setStyleSheet("color: white;")
+        self.minimize_check.setChecked(self.start_minimized)
+        self.minimize_check.stateChanged.connect(self.toggle_minimize)
+        layout.addWidget(self.minimize_check)
+        
+        self.tip_label = QLabel(self.scope_tip_text())
+        self.tip_label.setStyleSheet("color: #00FF00; font-size: 8pt;")
+        layout.addWidget(self.tip_label)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # How it Works section
+        how_label = QLabel("How it Works:")
+        how_label.setStyleSheet("color: white; font-weight: bold;")
+        layout.addWidget(how_label)
+        
+        self.hotkey_text = QLabel(f"{self.macro_hotkey} - Toggle Macro ON/OFF (Default)")
+        self.hotkey_text.setStyleSheet("color: #CCCCCC;")
+        layout.addWidget(self.hotkey_text)
+        
+        peak_text = QLabel("Q/E - Peak with Auto-Aim")
+        peak_text.setStyleSheet("color: #CCCCCC;")
+        layout.addWidget(peak_text)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Social links with larger icons
+        youtube_layout = QHBoxLayout()
+        youtube_layout.setSpacing(10)
+        
+        yt_pixmap = load_scaled_pixmap("youtube.png", 32, 32, self.data_dir)
+        if yt_pixmap is not None:
+            yt_icon = QLabel()
+            yt_icon.setPixmap(yt_pixmap)
+            youtube_layout.addWidget(yt_icon)
+        
+        yt_link = ClickableLabel("WWW.YOUTUBE.COM/@MAAKTHUNDER", "https://www.youtube.com/@MAAKTHUNDER")
+        yt_link.setFont(QFont("Segoe UI", 10))
+        yt_link.setStyleSheet("color: #00BFFF; text-decoration: underline;")
+        youtube_layout.addWidget(yt_link)
+        youtube_layout.addStretch()
+        layout.addLayout(youtube_layout)
+        
+        tiktok_layout = QHBoxLayout()
+        tiktok_layout.setSpacing(10)
+        
+        tt_pixmap = load_scaled_pixmap("tiktok.png", 32, 32, self.data_dir)
+        if tt_pixmap is not None:
+            tt_icon = QLabel()
+            tt_icon.setPixmap(tt_pixmap)
+            tiktok_layout.addWidget(tt_icon)
+        
+        tt_link = ClickableLabel("WWW.TIKTOK.COM/@MAAKTHUNDER", "https://www.tiktok.com/@maakthunder")
+        tt_link.setFont(QFont("Segoe UI", 10))
+        tt_link.setStyleSheet("color: #00BFFF; text-decoration: underline;")
+        tiktok_layout.addWidget(tt_link)
+        tiktok_layout.addStretch()
+        layout.addLayout(tiktok_layout)
+        
+        layout.addWidget(QLabel("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", self))
+        
+        # Footer
+        footer = QLabel("Made for GameLoop | v1.0")
+        footer.setStyleSheet("color: #888888;")
+        footer.setAlignment(Qt.AlignCenter)
+        layout.addWidget(footer)
+        
+        central_widget.setLayout(layout)
+        
+        self.ui_built = True
+        self.update_overlay_status(self.status_active, self.status_scope_open, self.status_held)
+    
+    def setup_tray(self):
+        self.tray_icon = QSystemTrayIcon(self)
+        self.tray_icon.setToolTip("Peak & Aim Assistant - MAAKTHUNDER")
+        
+        icon_path = resource_path("icon.ico")
+        if os.path.exists(icon_path):
+            icon = QIcon(icon_path)
+            self.tray_icon.setIcon(icon)
+        else:
+            pixmap = QPixmap(16, 16)
+            pixmap.fill(QColor(0, 255, 0))
+            self.tray_icon.setIcon(QIcon(pixmap))
+        
+        tray_menu = QMenu()
+        
+        show_action = QAction("Show GUI", self)
+        show_action.triggered.connect(self.show)
+        tray_menu.addAction(show_action)
+        
+        self.toggle_action = QAction(f"Toggle Macro ({self.macro_hotkey})", self)
+        self.toggle_action.triggered.connect(self.toggle_macro)
+        tray_menu.addAction(self.toggle_action)
+        
+        tray_menu.addSeparator()
+        
+        self.profile_menu = tray_menu.addMenu("Profiles")
+        self.profile_menu.aboutToShow.connect(self.refresh_profile_menu)
+        
+        latency_menu = tray_menu.addMenu("Latency")
+        self.latency_actions = {}
+        for name in LatencyStats.NAMES:
+            action = QAction(self)
+            action.setEnabled(False)
+            latency_menu.addAction(action)
+            self.latency_actions[name] = action
+        self.wakeup_action = QAction(self)
+        self.wakeup_action.setEnabled(False)
+        latency_menu.addAction(self.wakeup_action)
+        latency_menu.addSeparator()
+        
+        export_action = QAction("Export Latency JSON...", self)
+        export_action.triggered.connect(self.export_latency)
+        latency_menu.addAction(export_action)
+        
+        reset_action = QAction("Reset Latency Stats", self)
+        reset_action.triggered.connect(self.macro_thread.reset_latency)
+        latency_menu.addAction(reset_action)
+        tray_menu.aboutToShow.connect(self.refresh_latency_menu)
+        
+        stats_action = QAction("Session Stats...", self)
+        stats_action.triggered.connect(self.show_session_stats)
+        tray_menu.addAction(stats_action)
+        
+        startup_action = QAction("Startup Timing...", self)
+        startup_action.triggered.connect(self.show_startup_timing)
+        tray_menu.addAction(startup_action)
+        
+        self.trace_action = QAction("Record Input Traces", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(self.record_traces)
+        self.trace_action.toggled.connect(self.set_record_traces)
+        tray_menu.addAction(self.trace_action)
+        
+        self.profiling_action = QAction("Profiling Mode", self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.toggled.connect(self.set_profiling)
+        tray_menu.addAction(self.profiling_action)
+        
+        tray_menu.addSeparator()
+        
+        exit_action = QAction("Exit", self)
+        exit_action.triggered.connect(self.quit_app)
+        tray_menu.addAction(exit_action)
+        
+        self.tray_icon.setContextMenu(tray_menu)
+        self.tray_icon.activated.connect(self.tray_clicked)
+        self.tray_icon.show()
+    
+    def refresh_profile_menu(self):
+        """Rebuild the profile list with the active profile checked"""
+        self.profile_menu.clear()
+        group = QActionGroup(self.profile_menu)
+        for profile in self.profiles:
+            action = QAction(profile['name'], self.profile_menu)
+            action.setCheckable(True)
+            action.setChecked(profile['name'] == self.active_profile)
+            action.triggered.connect(lambda checked, name=profile['name']: self.switch_profile(name))
+            group.addAction(action)
+            self.profile_menu.addAction(action)
+        self.profile_menu.addSeparator()
+        
+        new_action = QAction("New Profile...", self.profile_menu)
+        new_action.triggered.connect(self.create_profile)
+        self.profile_menu.addAction(new_action)
+        
+        auto_action = QAction("Auto-Switch by Game", self.profile_menu)
+        auto_action.setCheckable(True)
+        auto_action.setChecked(self.auto_switch_profiles)
+        auto_action.setEnabled(self.profile_switcher.provider is not None)
+        auto_action.toggled.connect(self.set_auto_switch)
+        self.profile_menu.addAction(auto_action)
+    
+    def create_profile(self):
+        """Copy the active profile under a new name and switch to it"""
+        name, ok = QInputDialog.getText(self, "New Profile", "Profile name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if find_profile(self.profiles, name) is not None:
+            QMessageBox.warning(self, "Error", f"A profile named '{name}' already exists!")
+            return
+        self.store_profile()
+        profile = copy.deepcopy(self.current_profile)
+        profile['name'] = name
+        profile['processes'] = []
+        self.profiles.append(profile)
+        self.switch_profile(name)
+    
+    def switch_profile(self, name):
+        """Activate a profile; the engine is rebound in place, keeping held keys"""
+        profile = find_profile(self.profiles, name)
+        if profile is None or profile is self.current_profile:
+            return
+        self.store_profile()
+        old_hotkey = self.macro_hotkey
+        self.load_profile(profile)
+        self.macro_thread.apply_profile(profile)
+        if self.macro_hotkey != old_hotkey:
+            self.register_hotkey(self.macro_hotkey)
+        self.update_hotkey_texts()
+        self.save_settings()
+        self.tray_icon.showMessage("Peak & Aim Assistant", f"Profile: {name}",
+                                   QSystemTrayIcon.Information, 1500)
+        self.report_unresolved_keys()
+    
+    def set_auto_switch(self, enabled):
+        self.auto_switch_profiles = enabled
+        if enabled:
+            self.profile_switcher.start()
+        else:
+            self.profile_switcher.stop()
+        self.save_settings()
+    
+    def update_hotkey_texts(self):
+        self.toggle_action.setText(f"Toggle Macro ({self.macro_hotkey})")
+        if self.ui_built:
+            self.toggle_btn.setText(f"Toggle Macro ({self.macro_hotkey})")
+            self.hotkey_text.setText(f"{self.macro_hotkey} - Toggle Macro ON/OFF (Default)")
+    
+    def refresh_latency_menu(self):
+        """Fill the latency entries with current p50/p99/max and the wakeup rate"""
+        texts, per_minute = self.macro_thread.latency_report()
+        for name, action in self.latency_actions.items():
+            action.setText(texts.get(name, action.text()))
+        self.wakeup_action.setText(f"Engine Wakeups: {per_minute}/min")
+    
+    def export_latency(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Latency", "latency.json", "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            self.macro_thread.export_latency(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not export latency: {e}")
+    
+    def show_session_stats(self):
+        lines = self.macro_thread.session_summary()
+        totals = all_time_totals(self.stats_path) if self.record_stats else None
+        if totals:
+            since = time.strftime("%Y-%m-%d", time.localtime(totals['since']))
+            lines.append("")
+            lines.append(f"All time (since {since}):")
+            lines += [f"{label}: {totals[name] or 0}" for label, name in zip(COUNTER_LABELS, COUNTER_NAMES)]
+        if EVENT_LOG.dropped:
+            lines.append(f"Log records dropped: {EVENT_LOG.dropped}")
+        QMessageBox.information(self, "Session Stats", "\n".join(lines))
+    
+    def show_startup_timing(self):
+        QMessageBox.information(self, "Startup Timing", STARTUP.report())
+    
+    def set_record_traces(self, enabled):
+        """Recording is attached when the engine starts, so this applies next launch"""
+        self.record_traces = enabled
+        self.save_settings()
+        self.tray_icon.showMessage("Peak & Aim Assistant",
+                                   f"Input tracing will be {'on' if enabled else 'off'} from the next start",
+                                   QSystemTrayIcon.Information, 2000)
+    
+    def control_commands(self):
+        """Control socket commands; they run on its thread and post to this one"""
+        macro = self.macro_thread
+        
+        def toggle(argument):
+            macro.toggle()
+        
+        def status(argument):
+            return macro.status_payload(self.current_profile['name'])
+        
+        def profile(argument):
+            if not argument:
+                return {'profile': self.current_profile['name']}
+            found = find_profile(self.profiles, argument)
+            if found is None:
+                raise ControlError(f"unknown profile '{argument}'")
+            self.profile_requested.emit(found['name'])
+            return {'profile': found['name']}
+        
+        def stats(argument):
+            return macro.stats_payload()
+        
+        def show(argument):
+            self.show_requested.emit()
+        
+        return {'toggle': toggle, 'status': status, 'profile': profile, 'stats': stats, 'show': show}
+    
+    def show_from_control(self):
+        self.show()
+        self.raise_()
+        self.activateWindow()
+    
+    def set_profiling(self, enabled):
+        """Profile the engine and Qt threads until switched off, then write the reports"""
+        if enabled:
+            if self.profiling is None:
+                self.profiling = self.new_profiling_session()
+            try:
+                self.profiling.start()
+            except OSError as e:
+                self.profiling_action.setChecked(False)
+                QMessageBox.warning(self, "Error", f"Could not start profiling: {e}")
+            return
+        try:
+            paths = self.profiling.stop()
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not write profiling reports: {e}")
+            return
+        if paths:
+            self.tray_icon.showMessage("Peak & Aim Assistant",
+                                       f"Profiling reports saved to {os.path.dirname(paths[0])}",
+                                       QSystemTrayIcon.Information, 3000)
+    
+    def new_profiling_session(self):
+        if self.engine_process:
+            return RemoteProfiling(self.macro_thread.process)
+        return profiling_session(self.macro_thread.engine, 'qt')
+    
+    def engine_process_exited(self):
+        self.update_overlay_status(False, False)
+        self.tray_icon.showMessage("Peak & Aim Assistant", "The engine process stopped unexpectedly; restart the app",
+                                   QSystemTrayIcon.Critical)
+    
+    def tray_clicked(self, reason):
+        if reason == QSystemTrayIcon.DoubleClick:
+            self.show()
+    
+    def setup_overlay(self):
+        self.overlay = OverlayWindow(self.overlay_indicator)
+        self.overlay.move(self.overlay_x, self.overlay_y)
+        self.overlay.update_status(False, False, self.overlay_bg)
+        self.overlay.show()
+    
+    def on_status_changed(self):
+        active, scope_open, aim_held = self.macro_thread.take_status()
+        self.update_overlay_status(active, scope_open, aim_held)
+    
+    def update_overlay_status(self, active, scope_open, aim_held=False):
+        self.status_active = active
+        self.status_scope_open = scope_open
+        self.status_held = aim_held
+        self.refresh_overlay()
+        
+        if not self.ui_built or active == self.shown_active:
+            return
+        self.shown_active = active
+        style = MAIN_STATUS_STYLES[active]
+        self.status_dot.setStyleSheet(style)
+        self.status_text.setStyleSheet(style)
+        self.status_text.setText("ACTIVE" if active else "INACTIVE")
+    
+    def toggle_macro(self):
+        self.macro_thread.toggle()
+    
+    def apply_position(self):
+        try:
+            self.overlay_x = int(self.x_input.text())
+            self.overlay_y = int(self.y_input.text())
+            self.overlay.move(self.overlay_x, self.overlay_y)
+            self.save_settings()
+            QMessageBox.information(self, "Success", f"Position saved: X={self.overlay_x}, Y={self.overlay_y}")
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Invalid position values!")
+    
+    def refresh_overlay(self):
+        level = 0
+        if self.status_held and self.overlay.show_indicator:
+            level = latency_level(self.macro_thread.last_press_ns())
+        self.overlay.update_status(self.status_active, self.status_scope_open, self.overlay_bg,
+                                   self.status_held, level)
+    
+    def toggle_background(self):
+        self.overlay_bg = self.bg_check.isChecked()
+        self.refresh_overlay()
+        self.save_settings()
+    
+    def toggle_indicator(self):
+        self.overlay_indicator = self.indicator_check.isChecked()
+        self.overlay.set_indicator(self.overlay_indicator)
+        self.refresh_overlay()
+        self.save_settings()
+    
+    def toggle_minimize(self):
+        self.start_minimized = self.minimize_check.isChecked()
+        self.save_settings()
+    
+    def closeEvent(self, event):
+        event.ignore()
+        self.hide()
+    
+    def quit_app(self):
+        if self.profiling is not None and self.profiling.active:
+            self.profiling_action.setChecked(False)
+        self.settings_watcher.stop()
+        self.control_server.stop()
+        self.profile_switcher.stop()
+        self.macro_thread.stop()
+        self.macro_thread.wait()
+        if self.stats_writer is not None:
+            self.stats_writer.stop()
+        if self.trace_writer is not None:
+            self.trace_writer.close()
+        self.settings_store.flush()
+        QApplication.quit()
+
+def main():
+    # Shared with the headless entry point so only one of them hooks input
+    instance_lock = InstanceLock()
+    already_running = not instance_lock.acquire()
+    
+    if already_running:
+        # Hand the command (or a request for the window) to the running
+        # instance; the dialog is only for one that does not answer
+        command = " ".join(arg for arg in sys.argv[1:] if not arg.startswith('-')) or "show"
+        try:
+            payload = send_command(command)
+        except NotRunningError:
+            pass
+        except ControlError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        else:
+            if payload is not None:
+                print(json.dumps(payload))
+            sys.exit(0)
+    
+    with STARTUP.measure('qt_init'):
+        app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)
+    
+    if already_running:
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Warning)
+        msg.setWindowTitle("Already Running")
+        msg.setText("Peak & Aim Assistant is already running!")
+        msg.setInformativeText("Check your system tray.")
+        msg.exec_()
+        sys.exit(0)
+    
+    EVENT_LOG.start()
+    EVENT_LOG.info('app', 'started', {'entry': 'gui'})
+    window = MainWindow(profiling='--profiling' in sys.argv[1:], engine_process='--engine-process' in sys.argv[1:])
+    code = app.exec_()
+    EVENT_LOG.info('app', 'stopped', {'dropped_records': EVENT_LOG.dropped})
+    EVENT_LOG.stop()
+    sys.exit(code)
@@ -0,0 +1,319 @@
+"""Console entry point that runs the macro engine without any Qt modules.
+
+Uses the same settings and profiles as the GUI, toggles with the profile's
+macro hotkey and prints status changes. Stop it with Ctrl+C. Given a
+command (toggle, status, profile NAME, stats) it sends that to the running
+instance instead.
+"""
+import argparse
+import copy
+import json
+import signal
+import sys
+import threading
+
+from startup_timing import StartupTimer
+
+STARTUP = StartupTimer()
+
+from bindings import DEFAULT_BINDINGS, BindingError, compile_bindings
+from control_socket import ControlError, ControlServer, engine_stats, engine_status, send_command
+from event_log import EVENT_LOG
+from hotkeys import HotkeyError
+from input_backend import SystemInputBackend
+from input_trace import TraceWriter, new_trace_path
+from instance_lock import InstanceLock
+from macro_engine import ENGINE_MODES, MacroEngine
+from profiles import (ENGINE_FIELDS, ProfileSwitcher, changed_fields, default_foreground_provider,
+                      find_profile, new_profile, normalize_profile)
+from profiling import profiling_session
+from session_stats import StatsWriter
+from settings_store import SettingsStore, changed_settings
+from settings_watcher import SettingsWatcher
+
+STARTUP.mark('imports')
+
+
+class HeadlessAssistant:
+    """Engine, toggle hotkey and profile switching, minus the GUI"""
+
+    def __init__(self, backend=None, settings_store=None, foreground_provider=None, profile_name=None,
+                 engine_mode=None, trace=None, out=None):
+        self.backend = backend or SystemInputBackend()
+        self.settings_store = settings_store or SettingsStore()
+        self.out = out or sys.stdout
+        self.thread = None
+        self.shown_status = None
+        # The switcher, control server and settings watcher threads all change
+        # the profile; reentrant because a settings reload can switch profiles
+        self.profile_lock = threading.RLock()
+
+        settings, _ = self.settings_store.load()
+        self.profiles = [normalize_profile(profile) for profile in settings['profiles']] or [new_profile("Default")]
+        # A mode given on the command line wins over later edits of the file
+        self.engine_mode_override = engine_mode
+        self.engine_mode = engine_mode or settings['engine_mode']
+        profile = find_profile(self.profiles, profile_name or settings['active_profile'])
+        if profile is None:
+            if profile_name:
+                self.log(f"Unknown profile '{profile_name}', using '{self.profiles[0]['name']}'")
+            profile = self.profiles[0]
+        self.current_profile = profile
+        self.check_bindings(profile)
+
+        with STARTUP.measure('engine'):
+            self.engine = MacroEngine(self.backend, profile['aim_button'], self.engine_mode, profile['bindings'],
+                                      trace)
+            self.engine.apply_profile(profile['aim_button'], profile['bindings'],
+                                      profile['scope_tap_ms'], profile['scope_reset_seconds'])
+            self.engine.status.notify = self.on_status_changed
+        self.reported_keys = 0
+        self.report_unresolved_keys()
+
+        if foreground_provider is None:
+            foreground_provider = default_foreground_provider()
+        self.profile_switcher = ProfileSwitcher(foreground_provider, self.switch_profile)
+        self.profile_switcher.set_profiles(self.profiles)
+        if settings['auto_switch_profiles']:
+            self.profile_switcher.start()
+
+        self.stats_writer = None
+        if settings['record_stats']:
+            self.stats_writer = StatsWriter(self.engine.stats)
+        self.control_server = ControlServer(self.control_commands())
+        self.settings_watcher = SettingsWatcher(self.settings_store.path, self.reload_settings)
+        # Created by start_profiling()
+        self.profiling = None
+
+    def start_profiling(self):
+        self.profiling = profiling_session(self.engine, 'main')
+        self.profiling.start()
+
+    def log(self, message):
+        print(message, file=self.out, flush=True)
+
+    def check_bindings(self, profile):
+        """Fall back to the default bindings if the profile's do not compile"""
+        try:
+            compile_bindings(profile['bindings'], profile['aim_button'])
+        except BindingError as e:
+            self.log(f"Invalid bindings in profile '{profile['name']}', using defaults: {e}")
+            profile['bindings'] = copy.deepcopy(DEFAULT_BINDINGS)
+
+    def register_hotkey(self, key):
+        try:
+            self.engine.set_hotkey(key)
+        except HotkeyError as e:
+            EVENT_LOG.warning('headless', 'hotkey_rejected', {'hotkey': key}, e)
+            self.log(f"Could not use hotkey {key}: {e}")
+
+    def switch_profile(self, name):
+        """Called from the foreground watcher and control server; the engine rebinds in place"""
+        with self.profile_lock:
+            profile = find_profile(self.profiles, name)
+            if profile is None or profile is self.current_profile:
+                return
+            old_hotkey = self.current_profile['macro_hotkey']
+            self.current_profile = profile
+            self.check_bindings(profile)
+            self.engine.apply_profile(profile['aim_button'], profile['bindings'],
+                                      profile['scope_tap_ms'], profile['scope_reset_seconds'])
+            if profile['macro_hotkey'] != old_hotkey:
+                self.register_hotkey(profile['macro_hotkey'])
+            self.log(f"Profile: {name} (toggle with {profile['macro_hotkey']})")
+            self.report_unresolved_keys()
+
+    def reload_settings(self):
+        """Called from the settings watcher; applies only the engine-related changes"""
+        try:
+            change = self.settings_store.reload()
+        except (OSError, ValueError, KeyError) as e:
+            EVENT_LOG.warning('settings', 'reload_failed', {'path': self.settings_store.path}, e)
+            self.log(f"Ignored unreadable settings.json: {e}")
+            return
+        if change is None:
+            return
+        previous, settings = change
+        changed = changed_settings(previous, settings)
+        with self.profile_lock:
+            if ('engine_mode' in changed and not self.engine_mode_override
+                    and settings['engine_mode'] in ENGINE_MODES):
+                self.engine_mode = settings['engine_mode']
+                self.engine.set_engine_mode(self.engine_mode)
+                self.log(f"Engine mode: {self.engine_mode}")
+            if changed & {'profiles', 'active_profile'}:
+                self.reload_profiles(settings, 'active_profile' in changed)
+            if 'auto_switch_profiles' in changed:
+                if settings['auto_switch_profiles']:
+                    self.profile_switcher.start()
+                else:
+                    self.profile_switcher.stop()
+
+    def reload_profiles(self, settings, follow_active):
+        """Take profile edits from settings.json; called with profile_lock held"""
+        old = self.current_profile
+        profiles = [normalize_profile(profile) for profile in settings['profiles']] or [new_profile("Default")]
+        name = settings['active_profile'] if follow_active else old['name']
+        profile = find_profile(profiles, name) or profiles[0]
+        try:
+            compile_bindings(profile['bindings'], profile['aim_button'])
+        except BindingError as e:
+            self.log(f"Invalid bindings in settings.json, keeping the current ones: {e}")
+            profile['bindings'] = old['bindings']
+        self.profiles = profiles
+        self.current_profile = profile
+
+        changed = changed_fields(old, profile)
+        engine_changes = changed & ENGINE_FIELDS
+        if engine_changes == {'aim_button'}:
+            self.engine.set_aim_button(profile['aim_button'])
+        elif engine_changes == {'bindings'}:
+            self.engine.set_bindings(profile['bindings'])
+        elif engine_changes:
+            self.engine.apply_profile(profile['aim_button'], profile['bindings'],
+                                      profile['scope_tap_ms'], profile['scope_reset_seconds'])
+        if 'macro_hotkey' in changed:
+            self.register_hotkey(profile['macro_hotkey'])
+        self.profile_switcher.set_profiles(self.profiles)
+        if changed - {'processes'}:
+            self.log(f"Profile: {profile['name']} reloaded (toggle with {profile['macro_hotkey']})")
+        self.report_unresolved_keys()
+
+    def report_unresolved_keys(self):
+        unresolved = self.engine.unresolved
+        if len(unresolved) > self.reported_keys:
+            self.log(f"These keys cannot be pressed and are ignored: {', '.join(unresolved[self.reported_keys:])}")
+            self.reported_keys = len(unresolved)
+
+    def control_commands(self):
+        engine = self.engine
+
+        def toggle(argument):
+            engine.toggle()
+
+        def status(argument):
+            return engine_status(engine, self.current_profile['name'])
+
+        def profile(argument):
+            if not argument:
+                return {'profile': self.current_profile['name']}
+            found = find_profile(self.profiles, argument)
+            if found is None:
+                raise ControlError(f"unknown profile '{argument}'")
+            self.switch_profile(found['name'])
+            return {'profile': found['name']}
+
+        def stats(argument):
+            return engine_stats(engine)
+
+        return {'toggle': toggle, 'status': status, 'profile': profile, 'stats': stats}
+
+    def on_status_changed(self):
+        active, scope_open, aim_held = self.engine.status.take()
+        if (active, scope_open) == self.shown_status:
+            return
+        self.shown_status = (active, scope_open)
+        self.log(f"Macro {'ACTIVE' if active else 'INACTIVE'}" + (" | scope open" if scope_open else ""))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.engine.run, name="MacroEngine", daemon=True)
+        self.thread.start()
+        if self.stats_writer is not None:
+            self.stats_writer.start()
+        self.control_server.start()
+        self.settings_watcher.start()
+        with STARTUP.measure('hooks'):
+            self.register_hotkey(self.current_profile['macro_hotkey'])
+        STARTUP.milestone('time_to_first_hook')
+        self.log(f"Peak & Aim Assistant running headless, profile '{self.current_profile['name']}', "
+                 f"toggle with {self.current_profile['macro_hotkey']}. Ctrl+C to exit.")
+
+    def wait(self):
+        # Short joins keep the main thread responsive to Ctrl+C on Windows
+        while self.thread.is_alive():
+            self.thread.join(0.5)
+
+    def stop(self):
+        if self.profiling is not None and self.profiling.active:
+            for path in self.profiling.stop():
+                self.log(f"Profiling report: {path}")
+        self.settings_watcher.stop()
+        self.control_server.stop()
+        self.profile_switcher.stop()
+        self.engine.shutdown()
+        if self.thread is not None:
+            self.thread.join(2.0)
+        if self.stats_writer is not None:
+            self.stats_writer.stop()
+        for line in self.engine.stats.summary():
+            self.log(line)
+        wakeups = self.engine.wakeups
+        self.log(f"Engine wakeups: {wakeups.total} ({wakeups.by_cause['input']} input, "
+                 f"{wakeups.by_cause['deadline']} deadline)")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run Peak & Aim Assistant without the GUI.")
+    parser.add_argument('command', nargs='*', help="send this command to the running instance and exit")
+    parser.add_argument('--profile', help="profile to start with instead of the last active one")
+    parser.add_argument('--engine-mode', choices=ENGINE_MODES, help="override the engine mode from settings")
+    parser.add_argument('--enable', action='store_true', help="start with the macro enabled")
+    parser.add_argument('--trace', nargs='?', const='', metavar='PATH',
+                        help="record an input trace (default: a new file in the traces folder)")
+    parser.add_argument('--profiling', action='store_true',
+                        help="profile the engine and main threads and write reports on exit")
+    parser.add_argument('--startup-timing', action='store_true', help="print the startup phase breakdown")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command:
+        try:
+            payload = send_command(" ".join(args.command))
+        except ControlError as e:
+            print(e, file=sys.stderr)
+            return 1
+        if payload is not None:
+            print(json.dumps(payload, indent=2))
+        return 0
+
+    lock = InstanceLock()
+    if not lock.acquire():
+        print("Peak & Aim Assistant is already running.", file=sys.stderr)
+        return 1
+
+    EVENT_LOG.start()
+    EVENT_LOG.info('app', 'started', {'entry': 'headless'})
+    trace = None
+    try:
+        if args.trace is not None:
+            trace = TraceWriter(args.trace or new_trace_path())
+            print(f"Recording input trace to {trace.path}")
+        assistant = HeadlessAssistant(profile_name=args.profile, engine_mode=args.engine_mode, trace=trace)
+        # SIGTERM from a service manager or taskkill shuts down like Ctrl+C
+        signal.signal(signal.SIGTERM, lambda signum, frame: assistant.engine.shutdown())
+        assistant.start()
+        if args.profiling:
+            assistant.start_profiling()
+        if args.enable:
+            assistant.engine.set_enabled(True)
+        if args.startup_timing:
+            assistant.log(STARTUP.report())
+        try:
+            assistant.wait()
+        except KeyboardInterrupt:
+            pass
+        assistant.stop()
+    finally:
+        if trace is not None:
+            trace.close()
+        lock.release()
+        EVENT_LOG.info('app', 'stopped', {'dropped_records': EVENT_LOG.dropped})
+        EVENT_LOG.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Per-game profiles and foreground-process driven profile switching."""
+import copy
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from bindings import DEFAULT_BINDINGS
+
+DEFAULT_PROFILE = {
+    'name': "GameLoop",
+    'macro_hotkey': 'F8',
+    'aim_button': 'O',
+    'scope_tap_ms': 300,
+    'scope_reset_seconds': 30.0,
+    'bindings': DEFAULT_BINDINGS,
+    # Executable names (e.g. "AndroidEmulatorEn.exe") that select this profile
+    'processes': [],
+}
+
+
+# Profile fields the engine is bound with; the rest are read by the UI and switcher
+ENGINE_FIELDS = frozenset(('aim_button', 'bindings', 'scope_tap_ms', 'scope_reset_seconds'))
+
+
+def new_profile(name, **values):
+    profile = copy.deepcopy(DEFAULT_PROFILE)
+    profile.update(values)
+    profile['name'] = name
+    return profile
+
+
+def check_profile(profile):
+    """Raise ValueError unless profile is an object whose known fields have the default's type"""
+    if not isinstance(profile, dict):
+        raise ValueError(f"profile {profile!r} is not an object")
+    for field, default in DEFAULT_PROFILE.items():
+        if field not in profile:
+            continue
+        value = profile[field]
+        # Numbers may be written either way; a bool is not a number here
+        expected = (int, float) if type(default) in (int, float) else type(default)
+        if not isinstance(value, expected) or isinstance(value, bool) != isinstance(default, bool):
+            raise ValueError(f"profile field '{field}' has the wrong type: {value!r}")
+
+
+def normalize_profile(profile):
+    """Fill in fields missing from a hand-edited or older profile"""
+    normalized = copy.deepcopy(DEFAULT_PROFILE)
+    normalized.update(profile)
+    return normalized
+
+
+def changed_fields(old, new):
+    """Profile fields whose values differ between two profiles"""
+    return {field for field in old.keys() | new.keys() if old.get(field) != new.get(field)}
+
+
+def find_profile(profiles, name):
+    for profile in profiles:
+        if profile['name'] == name:
+            return profile
+    return None
+
+
+class ProcessNameCache:
+    """Small LRU of pid -> lowercase executable name"""
+
+    def __init__(self, lookup, size=64):
+        self.lookup = lookup
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pid):
+        name = self.entries.get(pid)
+        if name is not None:
+            self.entries.move_to_end(pid)
+            self.hits += 1
+            return name
+        self.misses += 1
+        name = self.lookup(pid)
+        if name:
+            self.entries[pid] = name
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return name
+
+    def forget(self, pid):
+        self.entries.pop(pid, None)
+
+
+class ForegroundProvider:
+    """Reports the executable name of the foreground window as it changes"""
+
+    def start(self, callback):
+        """Begin calling callback(process_name) on each foreground change"""
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+
+class FakeForegroundProvider(ForegroundProvider):
+    """Foreground provider driven by set_foreground(), for tests on any OS"""
+
+    def __init__(self):
+        self.callback = None
+
+    def start(self, callback):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def set_foreground(self, process_name):
+        if self.callback is not None:
+            self.callback(process_name.lower())
+
+
+def windows_process_name(pid):
+    import ctypes
+    from ctypes import wintypes
+    kernel32 = ctypes.windll.kernel32
+    process_query_limited_information = 0x1000
+    handle = kernel32.OpenProcess(process_query_limited_information, False, pid)
+    if not handle:
+        return None
+    try:
+        buffer = ctypes.create_unicode_buffer(260)
+        size = wintypes.DWORD(len(buffer))
+        if kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+            return os.path.basename(buffer.value).lower()
+        return None
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class WindowsForegroundProvider(ForegroundProvider):
+    """EVENT_SYSTEM_FOREGROUND WinEvent hook on its own message-loop thread.
+
+    Nothing runs between foreground changes; each change costs one cached
+    pid -> name lookup.
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        self.names = ProcessNameCache(windows_process_name)
+        self.callback = None
+        self.thread = None
+        self.thread_id = None
+        self.ready = threading.Event()
+
+    def start(self, callback):
+        self.callback = callback
+        self.thread = threading.Thread(target=self.run, name="ForegroundWatcher", daemon=True)
+        self.thread.start()
+        self.ready.wait(1.0)
+
+    def run(self):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+
+        win_event_proc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [wintypes.UINT, wintypes.UINT, wintypes.HMODULE, win_event_proc,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.UINT]
+
+        def on_event(hook, event, hwnd, id_object, id_child, event_thread, event_time):
+            self.report(hwnd)
+
+        # Keep a reference so the callback is not garbage collected
+        self.proc = win_event_proc(on_event)
+        self.thread_id = kernel32.GetCurrentThreadId()
+        hook = user32.SetWinEventHook(self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND, None,
+                                      self.proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+        self.ready.set()
+        self.report(user32.GetForegroundWindow())
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        if hook:
+            user32.UnhookWinEvent(hook)
+
+    def report(self, hwnd):
+        import ctypes
+        from ctypes import wintypes
+        if not hwnd or self.callback is None:
+            return
+        pid = wintypes.DWORD()
+        ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        name = self.names.get(pid.value)
+        if name:
+            self.callback(name)
+
+    def stop(self):
+        import ctypes
+        if self.thread_id is not None:
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, self.WM_QUIT, 0, 0)
+        self.callback = None
+
+
+def default_foreground_provider():
+    """Foreground watcher for this platform, or None where there is none"""
+    if sys.platform == 'win32':
+        return WindowsForegroundProvider()
+    return None
+
+
+class ProfileSwitcher:
+    """Asks for a profile switch when a mapped game comes to the foreground"""
+
+    def __init__(self, provider, on_switch):
+        self.provider = provider
+        self.on_switch = on_switch
+        self.process_map = {}
+        self.last_process = None
+        self.running = False
+
+    def set_profiles(self, profiles):
+        process_map = {}
+        for profile in profiles:
+            for process in profile.get('processes') or []:
+                process_map[process.lower()] = profile['name']
+        self.process_map = process_map
+
+    def start(self):
+        if self.provider is not None and not self.running:
+            self.provider.start(self.on_foreground)
+            self.running = True
+
+    def stop(self):
+        if self.running:
+            self.provider.stop()
+            self.running = False
+            self.last_process = None
+
+    def on_foreground(self, process_name):
+        if process_name == self.last_process:
+            return
+        self.last_process = process_name
+        profile_name = self.process_map.get(process_name)
+        if profile_name is not None:
+            self.on_switch(profile_name)
@@ -0,0 +1,8 @@
+"""Creates profiling sessions without importing diagnostics at startup"""
+
+
+def profiling_session(engine, main_name):
+    """ProfilingSession for engine; main_name labels the calling thread's report"""
+    # Imported only now: diagnostics loads cProfile, pstats and tracemalloc
+    from diagnostics import ProfilingSession
+    return ProfilingSession(engine, main_name)
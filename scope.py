@@ -0,0 +1,72 @@
+"""Right-click scope tracking as a deterministic state machine."""
+
+# Result of a button edge, for callers that want to react or log
+IGNORED = 0
+PRESSED = 1
+TAP = 2
+HOLD = 3
+
+DEFAULT_TAP_THRESHOLD_MS = 300
+DEFAULT_RESET_TIMEOUT_S = 30.0
+
+
+class ScopeTracker:
+    """Tracks whether the in-game scope is open from right-button edges.
+
+    A short press toggles the scope, a longer one holds it open while down.
+    Methods take the event's timestamp and read no clock, so a recorded
+    edge sequence always classifies the same.
+    """
+
+    def __init__(self, tap_threshold_ms=DEFAULT_TAP_THRESHOLD_MS, reset_timeout_s=DEFAULT_RESET_TIMEOUT_S):
+        self.toggled = False
+        self.button_down = False
+        self.down_ns = 0
+        self.last_activity_ns = 0
+        self.configure(tap_threshold_ms, reset_timeout_s)
+
+    def configure(self, tap_threshold_ms, reset_timeout_s):
+        self.tap_threshold_ns = int(tap_threshold_ms * 1_000_000)
+        self.reset_timeout_ns = int(reset_timeout_s * 1_000_000_000)
+
+    @property
+    def active(self):
+        """Scope counts as open while toggled or while the button is held"""
+        return self.toggled or self.button_down
+
+    def press(self, t_ns):
+        if self.button_down:
+            return IGNORED
+        self.button_down = True
+        self.down_ns = t_ns
+        self.last_activity_ns = t_ns
+        return PRESSED
+
+    def release(self, t_ns):
+        if not self.button_down:
+            # Up without a matching down (listener started mid-press)
+            return IGNORED
+        self.button_down = False
+        if t_ns - self.down_ns < self.tap_threshold_ns:
+            self.toggled = not self.toggled
+            self.last_activity_ns = t_ns
+            return TAP
+        return HOLD
+
+    def reset_deadline(self):
+        """When an open scope auto-closes, or None if nothing is pending"""
+        if not self.toggled:
+            return None
+        return self.last_activity_ns + self.reset_timeout_ns
+
+    def expire(self, t_ns):
+        """Close the scope if its reset deadline has passed; True if it closed"""
+        deadline = self.reset_deadline()
+        if deadline is None or t_ns < deadline:
+            return False
+        self.toggled = False
+        return True
+
+    def reset(self):
+        self.toggled = False
+        self.button_down = False
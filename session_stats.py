@@ -0,0 +1,211 @@
+"""Usage counters and hold durations, aggregated into windows and saved to SQLite."""
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from app_paths import user_config_dir
+from event_log import EVENT_LOG
+from latency import LatencyHistogram, format_ns
+
+# Counter slots
+PEEKS = 0              # output held from nothing held
+SCOPE_TOGGLES = 1      # right-click taps
+SCOPE_HOLDS = 2        # right-button holds
+AUTO_RESETS = 3        # scope closed by the inactivity timeout
+FORCED_RELEASES = 4    # keys released by the hold guard after a lost key-up
+SEQUENCES = 5          # timed sequences started
+
+COUNTER_NAMES = ('peeks', 'scope_toggles', 'scope_holds', 'auto_resets', 'forced_releases', 'sequences')
+COUNTER_LABELS = ("Peeks", "Scope toggles", "Scope holds", "Scope auto-resets",
+                  "Forced releases", "Sequences")
+
+HOLD_RING_SIZE = 4096
+WINDOW_SECONDS = 60.0
+
+
+class SessionStats:
+    """Counters and a ring of hold durations written by the engine thread.
+
+    `counters` may be a caller-supplied zeroed buffer of len(COUNTER_NAMES)
+    unsigned 64-bit slots, such as a shared memory array.
+    """
+
+    def __init__(self, ring_size=HOLD_RING_SIZE, counters=None):
+        if ring_size & (ring_size - 1):
+            raise ValueError("ring_size must be a power of two")
+        self.counters = counters if counters is not None else array('Q', [0]) * len(COUNTER_NAMES)
+        self.holds = array('q', [0]) * ring_size
+        self.mask = ring_size - 1
+        self.hold_head = 0
+        self.started = time.time()
+        # Consumer side, shared by the writer thread and summary()
+        self.lock = threading.Lock()
+        self.hold_tail = 0
+        self.lost = 0
+        self.hold_histogram = LatencyHistogram()
+        self.idle = True
+        self.activity = threading.Event()
+
+    def count(self, slot):
+        self.counters[slot] += 1
+        if self.idle:
+            self.idle = False
+            self.activity.set()
+
+    def hold(self, duration_ns):
+        head = self.hold_head
+        self.holds[head & self.mask] = duration_ns
+        self.hold_head = head + 1
+
+    def aggregate(self, histogram=None):
+        """Fold hold samples written since the last call into the histograms"""
+        with self.lock:
+            head = self.hold_head
+            tail = self.hold_tail
+            # The engine lapped the ring; count the overwritten samples rather than block it
+            if head - tail > self.mask + 1:
+                self.lost += head - tail - (self.mask + 1)
+                tail = head - (self.mask + 1)
+            while tail < head:
+                value = self.holds[tail & self.mask]
+                self.hold_histogram.record(value)
+                if histogram is not None:
+                    histogram.record(value)
+                tail += 1
+            self.hold_tail = tail
+
+    def snapshot(self):
+        return dict(zip(COUNTER_NAMES, self.counters))
+
+    def summary(self):
+        """Lines for the tray summary: counters and hold durations this session"""
+        self.aggregate()
+        minutes = (time.time() - self.started) / 60
+        lines = [f"Session: {minutes:.0f} min"]
+        lines += [f"{label}: {count}" for label, count in zip(COUNTER_LABELS, self.counters)]
+        holds = self.hold_histogram
+        if holds.count:
+            lines.append(f"Hold duration: p50 {format_ns(holds.percentile(50))} | "
+                         f"p90 {format_ns(holds.percentile(90))} | max {format_ns(holds.max)}")
+        if self.lost:
+            lines.append(f"Hold samples lost: {self.lost}")
+        return lines
+
+
+def default_stats_path():
+    return os.path.join(user_config_dir(), "stats.sqlite3")
+
+
+class StatsWriter:
+    """Background thread that appends one SQLite row per active window"""
+
+    COLUMNS = COUNTER_NAMES + ('holds', 'hold_p50_ms', 'hold_p90_ms', 'hold_max_ms')
+
+    def __init__(self, stats, path=None, window=WINDOW_SECONDS):
+        self.stats = stats
+        self.path = path or default_stats_path()
+        self.window = window
+        self.thread = None
+        self.stopping = False
+        self.stop_event = threading.Event()
+        self.last_counters = stats.snapshot()
+        self.window_start = time.time()
+        self.rows = 0
+        self.last_error = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="StatsWriter", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Write the current partial window and end the thread"""
+        self.stopping = True
+        self.stop_event.set()
+        self.stats.activity.set()
+        if self.thread is not None:
+            self.thread.join(2.0)
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        columns = ", ".join(f"{name} INTEGER" if not name.endswith('_ms') else f"{name} REAL"
+                            for name in self.COLUMNS)
+        connection.execute(f"CREATE TABLE IF NOT EXISTS windows (start REAL, end REAL, {columns})")
+        return connection
+
+    def run(self):
+        try:
+            connection = self.connect()
+        except (OSError, sqlite3.Error) as e:
+            self.last_error = e
+            EVENT_LOG.error('stats', 'open_failed', {'path': self.path}, e)
+            return
+        try:
+            while not self.stopping:
+                if self.stats.idle:
+                    # Nothing to write until the engine counts something
+                    self.stats.activity.wait()
+                    self.stats.activity.clear()
+                    self.window_start = time.time()
+                    continue
+                self.stop_event.wait(self.window)
+                if not self.stopping and not self.flush(connection):
+                    self.stats.idle = True
+                    # A count that raced the flag did not set activity;
+                    # keep the window open for it instead of sleeping
+                    if self.pending():
+                        self.stats.idle = False
+            self.flush(connection)
+        finally:
+            connection.close()
+
+    def pending(self):
+        """True if the engine has counted or held anything since the last flush"""
+        return self.stats.hold_head != self.stats.hold_tail or self.stats.snapshot() != self.last_counters
+
+    def flush(self, connection):
+        """Write the window since the last flush; False if nothing happened"""
+        histogram = LatencyHistogram()
+        self.stats.aggregate(histogram)
+        counters = self.stats.snapshot()
+        deltas = {name: counters[name] - self.last_counters[name] for name in COUNTER_NAMES}
+        self.last_counters = counters
+        end = time.time()
+        start, self.window_start = self.window_start, end
+        if not histogram.count and not any(deltas.values()):
+            return False
+        row = [start, end] + [deltas[name] for name in COUNTER_NAMES] + [
+            histogram.count,
+            histogram.percentile(50) / 1_000_000,
+            histogram.percentile(90) / 1_000_000,
+            histogram.max / 1_000_000,
+        ]
+        try:
+            connection.execute(f"INSERT INTO windows VALUES ({', '.join('?' * len(row))})", row)
+            connection.commit()
+            self.rows += 1
+        except sqlite3.Error as e:
+            self.last_error = e
+            EVENT_LOG.error('stats', 'write_failed', {'path': self.path}, e)
+        return True
+
+
+def all_time_totals(path=None):
+    """Counter totals over every saved window, or None if there is no data"""
+    path = path or default_stats_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        connection = sqlite3.connect(path)
+        try:
+            sums = ", ".join(f"SUM({name})" for name in COUNTER_NAMES + ('holds',))
+            row = connection.execute(f"SELECT MIN(start), {sums} FROM windows").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    if row is None or row[0] is None:
+        return None
+    return {'since': row[0], **dict(zip(COUNTER_NAMES + ('holds',), row[1:]))}
@@ -0,0 +1,258 @@
+"""Settings persistence: versioned, atomic and written off the caller's thread."""
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+from app_paths import user_config_dir
+from bindings import DEFAULT_BINDINGS
+from event_log import EVENT_LOG
+from profiles import DEFAULT_PROFILE, check_profile, new_profile
+
+SCHEMA_VERSION = 3
+
+DEFAULT_SETTINGS = {
+    'schema_version': SCHEMA_VERSION,
+    'overlay_x': 1600,
+    'overlay_y': 50,
+    'overlay_bg': True,
+    'overlay_indicator': False,
+    'start_minimized': False,
+    'engine_mode': 'Event',
+    'profiles': [DEFAULT_PROFILE],
+    'active_profile': DEFAULT_PROFILE['name'],
+    'auto_switch_profiles': False,
+    # Write an input trace (see input_trace.py) for every session
+    'record_traces': False,
+    # Save per-minute usage statistics (see session_stats.py)
+    'record_stats': True,
+}
+
+# Older releases wrote settings.json next to the executable
+LEGACY_SETTINGS_FILE = "settings.json"
+
+
+def migrate_v0(settings):
+    """Unversioned settings.json from v1.0: same keys, no schema_version"""
+    settings['schema_version'] = 1
+    return settings
+
+
+def migrate_v1(settings):
+    """v2 made the Q/E -> aim rule a configurable binding list"""
+    settings.setdefault('bindings', copy.deepcopy(DEFAULT_BINDINGS))
+    settings['schema_version'] = 2
+    return settings
+
+
+def migrate_v2(settings):
+    """v3 moved hotkey, aim button and bindings into named per-game profiles"""
+    profile = new_profile(
+        DEFAULT_PROFILE['name'],
+        macro_hotkey=settings.pop('macro_hotkey', DEFAULT_PROFILE['macro_hotkey']),
+        aim_button=settings.pop('aim_button', DEFAULT_PROFILE['aim_button']),
+        bindings=settings.pop('bindings', DEFAULT_PROFILE['bindings']),
+    )
+    settings['profiles'] = [profile]
+    settings['active_profile'] = profile['name']
+    settings['schema_version'] = 3
+    return settings
+
+
+# from-version -> function upgrading a settings dict by one version
+MIGRATIONS = {
+    0: migrate_v0,
+    1: migrate_v1,
+    2: migrate_v2,
+}
+
+
+def migrate(settings):
+    version = settings.get('schema_version', 0)
+    # type(): a bool is an int too
+    if type(version) is not int or version < 0:
+        raise ValueError(f"schema_version {version!r} is not a version number")
+    while version < SCHEMA_VERSION:
+        settings = MIGRATIONS[version](settings)
+        version = settings['schema_version']
+    return settings
+
+
+def changed_settings(old, new):
+    """Top-level settings keys whose values differ between two settings dicts"""
+    return {key for key in DEFAULT_SETTINGS if old.get(key) != new.get(key)}
+
+
+def write_atomic(path, data):
+    """Write through a temp file in the same directory, then rename over path"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsStore:
+    """Loads settings once and saves them debounced on a background worker.
+
+    Write failures are reported through on_error(exception).
+    """
+
+    def __init__(self, path=None, debounce=0.5, legacy_path=LEGACY_SETTINGS_FILE, on_error=None):
+        self.path = path or os.path.join(user_config_dir(), "settings.json")
+        self.legacy_path = legacy_path
+        self.debounce = debounce
+        self.on_error = on_error
+        self.last_error = None
+        self.writes = 0
+        self.pending = None
+        self.condition = threading.Condition()
+        self.worker = None
+        self.closed = False
+        self.last_text = None
+        self.last_settings = copy.deepcopy(DEFAULT_SETTINGS)
+
+    def read(self, path):
+        with open(path, 'r') as f:
+            text = f.read()
+        settings = json.loads(text)
+        if not isinstance(settings, dict):
+            raise ValueError(f"{path} does not contain a settings object")
+        if path == self.path:
+            self.last_text = text
+        return settings
+
+    def complete(self, stored):
+        """Migrated settings with defaults for every missing key"""
+        settings = copy.deepcopy(DEFAULT_SETTINGS)
+        settings.update(migrate(stored))
+        settings['schema_version'] = SCHEMA_VERSION
+        if not isinstance(settings['profiles'], list):
+            raise ValueError("'profiles' is not a list")
+        for profile in settings['profiles']:
+            check_profile(profile)
+        return settings
+
+    def load(self):
+        """Return (settings, is_first_run), falling back to defaults"""
+        source = self.path
+        if not os.path.exists(source):
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                source = self.legacy_path
+            else:
+                return copy.deepcopy(DEFAULT_SETTINGS), True
+
+        try:
+            settings = self.complete(self.read(source))
+        except (OSError, ValueError, KeyError) as e:
+            # Keep the unreadable file for inspection instead of overwriting it
+            self.last_error = e
+            EVENT_LOG.error('settings', 'load_failed', {'path': source}, e)
+            try:
+                os.replace(source, f"{source}.corrupt-{int(time.time())}")
+            except OSError:
+                pass
+            return copy.deepcopy(DEFAULT_SETTINGS), True
+
+        self.last_settings = copy.deepcopy(settings)
+        if source != self.path:
+            self.save(settings)
+        return settings, False
+
+    def reload(self):
+        """Re-read the file after an outside change.
+
+        Returns (previous, settings), or None if the file is gone or holds
+        what the store last read or wrote. A file that does not parse raises
+        the errors load() catches.
+        """
+        try:
+            with open(self.path, 'r') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        with self.condition:
+            if text == self.last_text:
+                return None
+            self.last_text = text
+            previous = self.last_settings
+        stored = json.loads(text)
+        if not isinstance(stored, dict):
+            raise ValueError(f"{self.path} does not contain a settings object")
+        settings = self.complete(stored)
+        with self.condition:
+            self.last_settings = copy.deepcopy(settings)
+        return previous, settings
+
+    def save(self, settings):
+        """Queue settings for writing; never blocks on disk I/O"""
+        settings = copy.deepcopy(settings)
+        settings['schema_version'] = SCHEMA_VERSION
+        with self.condition:
+            if not self.closed:
+                self.pending = settings
+                if self.worker is None:
+                    self.worker = threading.Thread(target=self.run, name="SettingsWriter", daemon=True)
+                    self.worker.start()
+                self.condition.notify()
+                return
+        # After flush() there is no worker left; write straight away
+        self.write(settings)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                # Let a burst of toggles settle into one write
+                deadline = time.monotonic() + self.debounce
+                while not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                settings, self.pending = self.pending, None
+            self.write(settings)
+
+    def write(self, settings):
+        try:
+            text = json.dumps(settings, indent=2)
+            # Recorded before the rename so the watcher never sees it as new
+            with self.condition:
+                self.last_text = text
+                self.last_settings = settings
+            write_atomic(self.path, text)
+            self.writes += 1
+            self.last_error = None
+        except (OSError, TypeError, ValueError) as e:
+            self.last_error = e
+            EVENT_LOG.error('settings', 'write_failed', {'path': self.path}, e)
+            if self.on_error is not None:
+                self.on_error(e)
+
+    def flush(self):
+        """Write any pending settings now and stop the worker (used on exit)"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+            worker = self.worker
+        if worker is not None:
+            worker.join()
+        with self.condition:
+            settings, self.pending = self.pending, None
+        if settings is not None:
+            self.write(settings)
@@ -0,0 +1,248 @@
+"""Notices edits to settings.json made outside the app.
+
+Blocks on inotify (Linux) or a change notification (Windows) where it can
+and polls the file's stat elsewhere; on_change() runs on the watcher thread
+once a burst of writes has settled.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from event_log import EVENT_LOG
+
+POLL_INTERVAL_S = 1.0
+# Editors and atomic writers produce several events per save
+SETTLE_S = 0.1
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_EVENT = struct.Struct('iIII')
+
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+FILE_NOTIFY_CHANGE_SIZE = 0x00000008
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+INFINITE = 0xFFFFFFFF
+# WaitForMultipleObjects results for the two handles ChangeNotification waits on
+CHANGED = 0
+STOPPED = 1
+
+
+def open_inotify(directory):
+    """inotify fd watching directory, or None where inotify is not available"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def event_names(data):
+    """File names in a buffer of inotify events"""
+    names = []
+    offset = 0
+    while offset + INOTIFY_EVENT.size <= len(data):
+        _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+        offset += INOTIFY_EVENT.size
+        names.append(os.fsdecode(data[offset:offset + length].rstrip(b'\x00')))
+        offset += length
+    return names
+
+
+class ChangeNotification:
+    """Windows change notification for a directory, plus an event that ends the wait"""
+
+    def __init__(self, kernel32, change, stop):
+        self.kernel32 = kernel32
+        self.handles = (ctypes.c_void_p * 2)(change, stop)
+
+    def wait(self, timeout=None):
+        """CHANGED, STOPPED, or None once timeout seconds pass without either"""
+        milliseconds = INFINITE if timeout is None else int(timeout * 1000)
+        result = self.kernel32.WaitForMultipleObjects(2, self.handles, False, milliseconds)
+        return result if result in (CHANGED, STOPPED) else None
+
+    def rearm(self):
+        """Ask for the next change; a notification fires once per request"""
+        self.kernel32.FindNextChangeNotification(self.handles[0])
+
+    def wake(self):
+        self.kernel32.SetEvent(self.handles[1])
+
+    def close(self):
+        self.kernel32.FindCloseChangeNotification(self.handles[0])
+        self.kernel32.CloseHandle(self.handles[1])
+
+
+def open_change_notification(directory):
+    """ChangeNotification for directory, or None where it is not available"""
+    if sys.platform != 'win32':
+        return None
+    try:
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    except OSError:
+        return None
+    handle = ctypes.c_void_p
+    kernel32.FindFirstChangeNotificationW.argtypes = (ctypes.c_wchar_p, ctypes.c_int, ctypes.c_uint32)
+    kernel32.FindFirstChangeNotificationW.restype = handle
+    kernel32.FindNextChangeNotification.argtypes = (handle,)
+    kernel32.FindCloseChangeNotification.argtypes = (handle,)
+    kernel32.CreateEventW.argtypes = (ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_wchar_p)
+    kernel32.CreateEventW.restype = handle
+    kernel32.SetEvent.argtypes = (handle,)
+    kernel32.CloseHandle.argtypes = (handle,)
+    kernel32.WaitForMultipleObjects.argtypes = (ctypes.c_uint32, ctypes.POINTER(handle), ctypes.c_int,
+                                                ctypes.c_uint32)
+    kernel32.WaitForMultipleObjects.restype = ctypes.c_uint32
+    mask = FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_SIZE | FILE_NOTIFY_CHANGE_LAST_WRITE
+    change = kernel32.FindFirstChangeNotificationW(directory, False, mask)
+    if change is None or change == INVALID_HANDLE_VALUE:
+        return None
+    stop = kernel32.CreateEventW(None, True, False, None)
+    if not stop:
+        kernel32.FindCloseChangeNotification(change)
+        return None
+    return ChangeNotification(kernel32, change, stop)
+
+
+class SettingsWatcher:
+    def __init__(self, path, on_change, interval=POLL_INTERVAL_S):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.interval = interval
+        self.thread = None
+        self.inotify_fd = None
+        self.wake_pipe = None
+        self.notification = None
+        self.stopping = threading.Event()
+        self.changes = 0
+        self.last_stat = None
+
+    @property
+    def mode(self):
+        if self.inotify_fd is not None:
+            return 'inotify'
+        return 'notification' if self.notification is not None else 'polling'
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            pass
+        self.inotify_fd = open_inotify(directory)
+        if self.inotify_fd is not None:
+            self.wake_pipe = os.pipe()
+            target = self.watch_inotify
+        else:
+            # Taken here, not on the thread, so an edit right after start() is seen
+            self.last_stat = self.stat()
+            self.notification = open_change_notification(directory)
+            target = self.watch_notification if self.notification is not None else self.watch_polling
+        self.stopping.clear()
+        self.thread = threading.Thread(target=target, name="SettingsWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stopping.set()
+        if self.wake_pipe is not None:
+            os.write(self.wake_pipe[1], b'x')
+        if self.notification is not None:
+            self.notification.wake()
+        self.thread.join(2.0)
+        self.thread = None
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+        if self.wake_pipe is not None:
+            for fd in self.wake_pipe:
+                os.close(fd)
+            self.wake_pipe = None
+        if self.notification is not None:
+            self.notification.close()
+            self.notification = None
+
+    def changed(self):
+        self.changes += 1
+        try:
+            self.on_change()
+        except Exception as e:
+            # Raising here would end the watcher thread and every later reload
+            EVENT_LOG.error('settings_watcher', 'callback_failed', {'path': self.path}, e)
+
+    def watch_inotify(self):
+        name = os.path.basename(self.path)
+        fd, wake = self.inotify_fd, self.wake_pipe[0]
+        while not self.stopping.is_set():
+            readable, _, _ = select.select([fd, wake], [], [])
+            if wake in readable:
+                break
+            if name not in event_names(self.drain(fd)):
+                continue
+            # Wait for the rest of the burst before reading the file
+            while select.select([fd], [], [], SETTLE_S)[0]:
+                self.drain(fd)
+            if not self.stopping.is_set():
+                self.changed()
+
+    @staticmethod
+    def drain(fd):
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(fd, 4096)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def watch_notification(self):
+        notification = self.notification
+        while notification.wait() == CHANGED:
+            notification.rearm()
+            # Wait for the rest of the burst before reading the file
+            while notification.wait(SETTLE_S) == CHANGED:
+                notification.rearm()
+            if self.stopping.is_set():
+                break
+            # The notification covers the whole directory
+            self.check_stat()
+        if not self.stopping.is_set():
+            EVENT_LOG.error('settings_watcher', 'wait_failed', {'path': self.path},
+                            ctypes.WinError(ctypes.get_last_error()))
+
+    def stat(self):
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def watch_polling(self):
+        while not self.stopping.wait(self.interval):
+            self.check_stat()
+
+    def check_stat(self):
+        current = self.stat()
+        if current != self.last_stat:
+            self.last_stat = current
+            self.changed()
@@ -0,0 +1,44 @@
+"""Startup phase timing for the GUI."""
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Records how long each startup phase took and when milestones were hit"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+        self.milestones = []
+
+    def mark(self, phase):
+        """Close a phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    @contextmanager
+    def measure(self, phase):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.phases.append((phase, now - began))
+            self.last = now
+
+    def milestone(self, name):
+        """Time since the timer was created, e.g. time-to-tray"""
+        self.milestones.append((name, time.perf_counter() - self.start))
+
+    def to_dict(self):
+        return {
+            'phases_ms': {phase: round(seconds * 1000, 2) for phase, seconds in self.phases},
+            'milestones_ms': {name: round(seconds * 1000, 2) for name, seconds in self.milestones},
+        }
+
+    def report(self):
+        lines = [f"{phase}: {seconds * 1000:.1f} ms" for phase, seconds in self.phases]
+        lines += [f"{name}: {seconds * 1000:.1f} ms" for name, seconds in self.milestones]
+        return "\n".join(lines)
@@ -0,0 +1,39 @@
+"""Change-only, coalescing status channel from the engine to the UI."""
+import threading
+
+
+class StatusBus:
+    """Publishes engine state only when it changes.
+
+    publish() may be called from any thread as often as it likes; repeated
+    states are dropped, and while one notification is still waiting to be
+    consumed further changes only overwrite the pending state. The consumer
+    calls take() from its own thread to get the latest state.
+    """
+
+    def __init__(self, initial=None, notify=None):
+        self.lock = threading.Lock()
+        self.state = initial
+        self.notify = notify
+        self.notify_pending = False
+        self.published = 0
+        self.coalesced = 0
+
+    def publish(self, state):
+        with self.lock:
+            if state == self.state:
+                return
+            self.state = state
+            if self.notify_pending:
+                self.coalesced += 1
+                return
+            self.notify_pending = True
+            self.published += 1
+        if self.notify is not None:
+            self.notify()
+
+    def take(self):
+        """Latest published state; re-arms notification for the next change"""
+        with self.lock:
+            self.notify_pending = False
+            return self.state
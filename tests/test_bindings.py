@@ -0,0 +1,56 @@
+import pytest
+
+from bindings import AIM_OUTPUT, COND_SCOPE, BindingError, compile_bindings
+from timeline import STEP_PRESS, STEP_RELEASE
+
+
+def test_default_bindings_hold_the_aim_button():
+    compiled = compile_bindings(None, 'o')
+    assert compiled.trigger_keys == ('e', 'q')
+    assert compiled.key_bits == {'e': 1, 'q': 2}
+    assert compiled.trigger_masks == [3]
+    assert compiled.inhibit_masks == [COND_SCOPE]
+    assert compiled.outputs == ['o']
+    assert compiled.output_keys == ('o',)
+
+
+def test_shared_trigger_keys_get_one_bit():
+    rules = [
+        {'triggers': ['E', 'Q'], 'output': AIM_OUTPUT},
+        {'triggers': ['Q', 'Shift'], 'inhibit': ['scope'], 'output': 'Ctrl'},
+    ]
+    compiled = compile_bindings(rules, 'o')
+    assert compiled.key_bits == {'e': 1, 'q': 2, 'shift': 4}
+    assert compiled.trigger_masks == [3, 6]
+    assert compiled.inhibit_masks == [0, COND_SCOPE]
+    assert compiled.key_rules == {'e': (0,), 'q': (0, 1), 'shift': (1,)}
+    assert compiled.condition_rules[COND_SCOPE] == (1,)
+    assert compiled.outputs == ['o', 'ctrl']
+
+
+def test_sequence_steps_are_sorted_and_resolve_the_aim_button():
+    rules = [{'triggers': ['E'], 'sequence': [
+        {'at_ms': 15, 'press': AIM_OUTPUT},
+        {'at_ms': 0, 'press': 'Q'},
+        {'at_ms': 15, 'release': 'Q'},
+    ]}]
+    compiled = compile_bindings(rules, 'p')
+    assert compiled.outputs == [None]
+    assert compiled.sequences[0] == (
+        (0, STEP_PRESS, 'q'),
+        (15_000_000, STEP_PRESS, 'p'),
+        (15_000_000, STEP_RELEASE, 'q'),
+    )
+    assert compiled.output_keys == ('q', 'p')
+
+
+@pytest.mark.parametrize('rules', [
+    [{'triggers': []}],
+    [{'triggers': ['E'], 'inhibit': ['crouch']}],
+    [{'triggers': ['E'], 'sequence': [{'at_ms': 0}]}],
+    [{'triggers': ['E'], 'sequence': [{'at_ms': -5, 'press': 'Q'}]}],
+    [{'triggers': ['E'], 'sequence': [{'at_ms': 'soon', 'press': 'Q'}]}],
+])
+def test_invalid_rules_raise_binding_error(rules):
+    with pytest.raises(BindingError):
+        compile_bindings(rules, 'o')
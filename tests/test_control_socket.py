@@ -0,0 +1,87 @@
+import os
+import socket
+import stat
+
+import pytest
+
+from control_socket import (ControlClient, ControlError, ControlServer, NotRunningError, UnixSocketTransport,
+                            send_command)
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix domain sockets")
+
+
+class Failure(ControlError):
+    pass
+
+
+def reject(argument):
+    raise Failure(f"no profile '{argument}'")
+
+
+def crash(argument):
+    raise RuntimeError("engine gone")
+
+
+@pytest.fixture
+def server(tmp_path):
+    toggled = []
+    commands = {
+        'toggle': lambda argument: toggled.append(argument),
+        'status': lambda argument: {'enabled': bool(len(toggled) % 2), 'argument': argument},
+        'profile': reject,
+        'crash': crash,
+    }
+    server = ControlServer(commands, UnixSocketTransport(str(tmp_path / 'c.sock')))
+    assert server.start()
+    yield server
+    server.stop()
+
+
+def test_one_reply_line_per_command(server):
+    with ControlClient(server.transport) as client:
+        assert client.send("toggle") is None
+        assert client.send("STATUS  fast ") == {'enabled': True, 'argument': 'fast'}
+        with pytest.raises(ControlError, match="no profile 'Sniper'"):
+            client.send("profile Sniper")
+        # The connection stays usable after an error reply
+        assert client.send("status") == {'enabled': True, 'argument': ''}
+    assert server.handled == 3
+
+
+def test_unknown_and_failing_commands_reply_with_an_error(server):
+    with pytest.raises(ControlError, match="unknown command 'jump'"):
+        send_command("jump", server.transport)
+    with pytest.raises(ControlError, match="crash failed: engine gone"):
+        send_command("crash", server.transport)
+
+
+def test_blank_lines_get_no_reply(server):
+    channel = server.transport.connect()
+    try:
+        channel.write_line("")
+        channel.write_line("toggle")
+        assert channel.read_line() == "ok"
+    finally:
+        channel.close()
+
+
+def test_socket_is_private_and_removed_on_stop(tmp_path):
+    transport = UnixSocketTransport(str(tmp_path / 'c.sock'))
+    server = ControlServer({}, transport)
+    assert server.start()
+    assert stat.S_IMODE(os.stat(transport.path).st_mode) & 0o077 == 0
+    server.stop()
+    assert not os.path.exists(transport.path)
+    with pytest.raises(NotRunningError):
+        send_command("status", transport)
+
+
+def test_a_stale_socket_file_is_replaced(tmp_path):
+    path = tmp_path / 'c.sock'
+    path.write_text('')
+    server = ControlServer({'toggle': lambda argument: None}, UnixSocketTransport(str(path)))
+    assert server.start()
+    try:
+        assert send_command("toggle", server.transport) is None
+    finally:
+        server.stop()
@@ -0,0 +1,81 @@
+import pytest
+
+from deadlines import DeadlineScheduler, WakeupCounter
+
+
+def record_into(fired, name):
+    return lambda now_ns: fired.append((name, now_ns))
+
+
+def test_due_callbacks_fire_in_deadline_order_then_arming_order():
+    scheduler = DeadlineScheduler()
+    fired = []
+    scheduler.arm('late', 300, record_into(fired, 'late'))
+    scheduler.arm('first', 100, record_into(fired, 'first'))
+    scheduler.arm('tied', 100, record_into(fired, 'tied'))
+    assert scheduler.next_deadline() == 100
+    scheduler.run_due(200)
+    assert fired == [('first', 200), ('tied', 200)]
+    assert scheduler.next_deadline() == 300
+    assert not scheduler.armed('first')
+    scheduler.run_due(300)
+    assert [name for name, _ in fired] == ['first', 'tied', 'late']
+    assert scheduler.next_deadline() is None
+    assert scheduler.fired == 3
+
+
+def test_rearming_replaces_the_previous_deadline():
+    scheduler = DeadlineScheduler()
+    fired = []
+    scheduler.arm('step', 100, record_into(fired, 'old'))
+    scheduler.arm('step', 500, record_into(fired, 'new'))
+    assert scheduler.deadline('step') == 500
+    assert scheduler.next_deadline() == 500
+    scheduler.run_due(400)
+    assert fired == []
+    scheduler.run_due(500)
+    assert fired == [('new', 500)]
+
+
+def test_cancelled_deadlines_never_fire():
+    scheduler = DeadlineScheduler()
+    fired = []
+    scheduler.arm('a', 100, record_into(fired, 'a'))
+    scheduler.arm('b', 200, record_into(fired, 'b'))
+    scheduler.cancel('a')
+    scheduler.cancel('missing')
+    assert not scheduler.armed('a')
+    assert scheduler.deadline('a') is None
+    assert scheduler.next_deadline() == 200
+    scheduler.run_due(1000)
+    assert fired == [('b', 1000)]
+
+
+def test_a_failing_callback_is_reported_and_the_rest_still_run():
+    scheduler = DeadlineScheduler()
+    fired = []
+    errors = []
+
+    def fail(now_ns):
+        raise RuntimeError("boom")
+    scheduler.arm('bad', 100, fail)
+    scheduler.arm('good', 200, record_into(fired, 'good'))
+    scheduler.run_due(300, on_error=lambda name, e: errors.append((name, str(e))))
+    assert errors == [('bad', "boom")]
+    assert fired == [('good', 300)]
+
+
+def test_without_on_error_a_failing_callback_raises():
+    scheduler = DeadlineScheduler()
+    scheduler.arm('bad', 100, lambda now_ns: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        scheduler.run_due(100)
+
+
+def test_wakeup_rate_covers_the_last_minute():
+    counter = WakeupCounter()
+    for second in range(90):
+        counter.record(second * 1_000_000_000, 'input' if second % 2 else 'deadline')
+    assert counter.total == 90
+    assert counter.per_minute(89 * 1_000_000_000) == 60
+    assert counter.to_dict(89 * 1_000_000_000) == {'total': 90, 'per_minute': 60, 'input': 45, 'deadline': 45}
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from engine_process import EngineProcess
+from input_backend import MemoryInputBackend
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    # The child writes its event log under the user's cache directory
+    for name in ('HOME', 'XDG_CACHE_HOME', 'XDG_CONFIG_HOME', 'LOCALAPPDATA', 'APPDATA'):
+        monkeypatch.setenv(name, str(tmp_path))
+    return {
+        'aim_button': 'o',
+        'engine_mode': 'Event',
+        'bindings': None,
+        'record_traces': False,
+        'record_stats': True,
+        'stats_path': str(tmp_path / 'stats.sqlite3'),
+        'trace_dir': str(tmp_path / 'traces'),
+    }
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_engine_process_starts_reports_status_and_stops(config):
+    notified = threading.Event()
+    process = EngineProcess(config, on_status=notified.set, backend_factory=MemoryInputBackend)
+    process.start()
+    child = process.process
+    try:
+        process.send('set_enabled', True)
+        assert notified.wait(10.0)
+        assert wait_for(lambda: process.take_status() == (True, False, False))
+        assert process.query('unresolved') == []
+        assert process.query('stats')['peeks'] == 0
+
+        notified.clear()
+        process.send('toggle')
+        assert notified.wait(10.0)
+        assert wait_for(lambda: process.take_status() == (False, False, False))
+    finally:
+        process.stop()
+    assert process.process is None
+    assert child.exitcode == 0
+
+
+def test_engine_process_exits_when_the_parent_goes_away(config):
+    exited = threading.Event()
+    process = EngineProcess(config, on_exit=exited.set, backend_factory=MemoryInputBackend)
+    process.start()
+    child = process.process
+    assert process.query('unresolved') == []
+    # What the child sees when the parent dies: its control pipe reaches EOF
+    process.control.close()
+    child.join(10.0)
+    assert child.exitcode == 0
+    assert exited.wait(10.0)
+    process.events.close()
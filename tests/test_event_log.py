@@ -0,0 +1,63 @@
+import json
+
+from event_log import DEBUG, INFO, EventLog, RotatingFile
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_full_ring_drops_the_oldest_records_and_reports_how_many(tmp_path):
+    log = EventLog(size=4)
+    for index in range(6):
+        log.info('test', 'tick', {'index': index})
+    assert log.dropped == 2
+    assert [record[4]['index'] for record in log.records] == [2, 3, 4, 5]
+
+    log.start(directory=str(tmp_path))
+    log.stop()
+    lines = read_lines(tmp_path / 'events.log')
+    assert lines[0]['event'] == 'records_dropped' and lines[0]['count'] == 2
+    assert [line['index'] for line in lines[1:]] == [2, 3, 4, 5]
+
+    # Drops are reported once, then only new ones
+    log.info('test', 'tick', {'index': 6})
+    assert log.flush()
+    assert [line['event'] for line in read_lines(tmp_path / 'events.log')[5:]] == ['tick']
+
+
+def test_records_below_min_level_are_not_kept():
+    log = EventLog(min_level=INFO)
+    log.record(DEBUG, 'test', 'noise')
+    log.warning('test', 'kept')
+    assert [record[3] for record in log.records] == ['kept']
+
+
+def test_exceptions_are_written_with_their_traceback(tmp_path):
+    log = EventLog()
+    log.output = RotatingFile(str(tmp_path / 'events.log'))
+    try:
+        raise ValueError("bad value")
+    except ValueError as e:
+        log.error('test', 'failed', {'key': 'q'}, e)
+    log.flush()
+    [line] = read_lines(tmp_path / 'events.log')
+    assert line['level'] == 'error' and line['key'] == 'q'
+    assert line['error'] == "ValueError: bad value"
+    assert 'raise ValueError' in line['traceback']
+
+
+def test_rotating_file_keeps_the_configured_number_of_backups(tmp_path):
+    path = tmp_path / 'events.log'
+    output = RotatingFile(str(path), max_bytes=100, backups=2)
+    for index in range(10):
+        output.write(f"{index:039d}\n")
+    # 40 bytes a line, so two lines per file
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ['events.log', 'events.log.1', 'events.log.2']
+    assert path.read_text() == f"{8:039d}\n{9:039d}\n"
+    assert (tmp_path / 'events.log.2').read_text() == f"{4:039d}\n{5:039d}\n"
+
+    # The size survives reopening, so an existing file still rotates on time
+    reopened = RotatingFile(str(path), max_bytes=100, backups=2)
+    reopened.write(f"{10:039d}\n")
+    assert path.read_text() == f"{10:039d}\n"
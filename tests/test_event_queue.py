@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from event_queue import EV_CONTROL, EV_KEY, EventQueue, SpscRing
+
+
+def drained(ring):
+    out = []
+    ring.drain(out)
+    return out
+
+
+def test_ring_drains_in_push_order():
+    ring = SpscRing(4)
+    for t in range(3):
+        ring.push(t, EV_KEY, t, 1)
+    assert [record[0] for record in drained(ring)] == [0, 1, 2]
+    assert len(ring) == 0
+
+
+def test_ring_wraps_around():
+    ring = SpscRing(4)
+    for t in range(3):
+        ring.push(t, EV_KEY, 0)
+    drained(ring)
+    for t in range(3, 7):
+        ring.push(t, EV_KEY, 0)
+    assert [record[0] for record in drained(ring)] == [3, 4, 5, 6]
+
+
+def test_full_ring_spills_into_overflow_without_reordering():
+    ring = SpscRing(4)
+    for t in range(6):
+        ring.push(t, EV_KEY, 0)
+    assert ring.overflowed == 2
+    assert len(ring) == 6
+    # Records pushed while the overflow is still in use follow it
+    ring.push(6, EV_KEY, 0)
+    assert [record[0] for record in drained(ring)] == list(range(7))
+    ring.push(7, EV_KEY, 0)
+    assert ring.overflowed == 3
+    assert [record[0] for record in drained(ring)] == [7]
+
+
+def test_ring_drops_payload_references_once_drained():
+    ring = SpscRing(4)
+    ring.push(0, EV_CONTROL, 3, 0, ('payload',))
+    assert drained(ring)[0][4] == ('payload',)
+    assert ring.payloads == [None] * 4
+
+
+def test_capacity_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        SpscRing(1000)
+
+
+def test_queue_merges_producers_by_timestamp():
+    queue = EventQueue(capacity=8)
+    queue.push(10, EV_KEY, 0)
+
+    def other():
+        queue.push(5, EV_KEY, 1)
+        queue.push(20, EV_KEY, 1)
+    thread = threading.Thread(target=other)
+    thread.start()
+    thread.join()
+    queue.push(15, EV_KEY, 0)
+    assert [(record[0], record[2]) for record in queue.drain()] == [(5, 1), (10, 0), (15, 0), (20, 1)]
+
+
+def test_queue_forgets_rings_of_exited_threads():
+    queue = EventQueue(capacity=8)
+    for t in range(5):
+        thread = threading.Thread(target=queue.push, args=(t, EV_KEY, 0))
+        thread.start()
+        thread.join()
+    assert len(queue.drain()) == 5
+    assert queue.rings == ()
+    assert not queue.pending()
@@ -0,0 +1,54 @@
+import pytest
+
+from hotkeys import HotkeyError, HotkeyMatcher, parse_hotkey
+
+
+def test_parse_puts_modifiers_first_and_applies_aliases():
+    assert parse_hotkey('F8') == ('f8',)
+    assert parse_hotkey('F8+Control') == ('ctrl', 'f8')
+    assert parse_hotkey('Middle Click') == ('mouse3',)
+    # A trailing plus is the plus key itself
+    assert parse_hotkey('Ctrl++') == ('ctrl', '+')
+
+
+@pytest.mark.parametrize('text', ['', '   ', 'f8+F8', 'Control+Ctrl'])
+def test_parse_rejects_malformed_hotkeys(text):
+    with pytest.raises(HotkeyError):
+        parse_hotkey(text)
+
+
+def test_plain_key_fires_on_press_only():
+    matcher = HotkeyMatcher('F8')
+    assert matcher.key_event('f8', True)
+    # A key repeat changes nothing and must not toggle again
+    assert not matcher.key_event('f8', True)
+    assert not matcher.key_event('f8', False)
+    assert matcher.key_event('f8', True)
+
+
+def test_plain_key_ignores_modifiers_held_for_the_game():
+    matcher = HotkeyMatcher('F8')
+    assert not matcher.key_event('shift', True)
+    assert matcher.key_event('f8', True)
+
+
+def test_chord_fires_when_completed_in_any_order():
+    matcher = HotkeyMatcher('Ctrl+F8')
+    assert not matcher.key_event('f8', True)
+    assert matcher.key_event('ctrl', True)
+    matcher.key_event('ctrl', False)
+    matcher.key_event('f8', False)
+    assert not matcher.key_event('ctrl', True)
+    assert matcher.key_event('f8', True)
+
+
+def test_chord_does_not_fire_with_an_extra_modifier():
+    matcher = HotkeyMatcher('Ctrl+F8')
+    matcher.key_event('ctrl', True)
+    matcher.key_event('shift', True)
+    assert not matcher.key_event('f8', True)
+
+
+def test_keyboard_keys_leave_out_mouse_buttons():
+    assert 'mouse4' not in HotkeyMatcher('Ctrl+Mouse4').keyboard_keys
+    assert HotkeyMatcher().keyboard_keys == ()
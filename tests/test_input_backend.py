@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from input_backend import (NUMPAD_SCAN_CODES, OUTPUT_KEY, OUTPUT_MOUSE, MemoryInputBackend, OutputDescriptor,
+                           SystemInputBackend)
+
+# What keyboard.key_to_scan_codes() returns on a US layout
+SCAN_CODES = {'e': (18,), 'f': (33,), '8': (9,), 'up': (72,), '/': (53,), 'enter': (28,), 'scroll lock': (70,)}
+
+
+class FakeKeyboard:
+    KEY_DOWN = 'down'
+
+    def __init__(self):
+        self.pressed = []
+
+    def key_to_scan_codes(self, name):
+        if name not in SCAN_CODES:
+            raise ValueError(f"Key {name!r} is not mapped to any known key.")
+        return SCAN_CODES[name]
+
+    def press(self, code):
+        self.pressed.append(code)
+
+
+class FakeMouse:
+    def __init__(self):
+        self.pressed = []
+
+    def press(self, button):
+        self.pressed.append(button)
+
+
+def system_backend(buttons=('left', 'right', 'middle', 'x1', 'x2')):
+    # __init__ would import keyboard and pynput, which need a desktop session
+    backend = SystemInputBackend.__new__(SystemInputBackend)
+    backend.keyboard = FakeKeyboard()
+    backend.mouse = FakeMouse()
+    backend.mouse_buttons = SimpleNamespace(**{name: f"Button.{name}" for name in buttons})
+    return backend
+
+
+def test_keys_resolve_to_their_first_scan_code():
+    backend = system_backend()
+    assert backend.resolve_output('f') == OutputDescriptor('f', OUTPUT_KEY, 33)
+    assert backend.resolve_output('scrolllock') == OutputDescriptor('scrolllock', OUTPUT_KEY, 70)
+    assert backend.resolve_output('no such key') is None
+
+
+def test_numpad_keys_resolve_by_scan_code_not_by_name():
+    backend = system_backend()
+    assert backend.resolve_output('num8') == OutputDescriptor('num8', OUTPUT_KEY, NUMPAD_SCAN_CODES['num8'])
+    assert backend.resolve_output('num/').code == 53
+    # Num8 and Up share a scan code; only the keypad flag of the hook tells them apart
+    assert backend.hook_codes('num8') == ((0x48, True),)
+    assert backend.hook_codes('up') == ((0x48, False),)
+    assert backend.hook_codes('numenter') == ((28, True),)
+    assert backend.hook_codes('8') == ((9, False),)
+
+
+def test_mouse_outputs_resolve_to_pynput_buttons():
+    backend = system_backend()
+    assert backend.resolve_output('right click') == OutputDescriptor('right click', OUTPUT_MOUSE, "Button.right")
+    assert backend.resolve_output('mouse5').code == "Button.x2"
+    backend.press(backend.resolve_output('mouse4'))
+    backend.press(backend.resolve_output('e'))
+    assert backend.mouse.pressed == ["Button.x1"]
+    assert backend.keyboard.pressed == [18]
+
+
+def test_side_buttons_missing_from_pynput_do_not_resolve():
+    backend = system_backend(buttons=('left', 'right', 'middle'))
+    assert backend.resolve_output('mouse4') is None
+    assert backend.resolve_output('middle click').code == "Button.middle"
+
+
+def test_memory_backend_resolves_mouse_outputs_by_name():
+    backend = MemoryInputBackend()
+    assert backend.resolve_output('left click') == OutputDescriptor('left click', OUTPUT_MOUSE, 'left')
+    assert backend.resolve_output('q').device == OUTPUT_KEY
@@ -0,0 +1,125 @@
+from bindings import AIM_OUTPUT
+from input_backend import ManualClock, MemoryInputBackend
+from input_trace import DEV_KEY, DEV_META, DEV_OUTPUT, DEV_TIMER, TIMER_ARM, TraceReader, TraceWriter, replay
+from macro_engine import MacroEngine
+
+
+class TickingClock(ManualClock):
+    """Manual clock that also moves a little on every read, like a real one"""
+
+    def monotonic_ns(self):
+        self.now_ns += 1_000
+        return self.now_ns
+
+
+def start_recording(path, bindings=None, clock=None):
+    """Engine on a manual clock tracing into path, and a step(ms, action, *args) driver"""
+    clock = clock or ManualClock(1_000_000_000)
+    backend = MemoryInputBackend(clock)
+    trace = TraceWriter(str(path))
+    engine = MacroEngine(backend, 'O', bindings=bindings, trace=trace)
+    engine.start()
+
+    def step(ms, action=None, *args):
+        clock.advance(ms=ms)
+        if action is not None:
+            action(*args)
+        engine.pump()
+    return engine, backend, trace, step
+
+
+def read_records(path):
+    reader = TraceReader(str(path))
+    try:
+        return list(reader)
+    finally:
+        reader.close()
+
+
+def record_session(path, clock=None):
+    """Drive an engine by hand, tracing everything it sees and does"""
+    engine, backend, trace, step = start_recording(path, clock=clock)
+    step(0, engine.set_enabled, True)
+    step(10, backend.key_down, 'e')
+    step(40, backend.key_down, 'q')
+    step(30, backend.key_up, 'e')
+    step(20, backend.key_up, 'q')
+    # A right-click tap opens the scope, which inhibits the aim output
+    step(50, backend.mouse_down, 'right')
+    step(100, backend.mouse_up, 'right')
+    step(20, backend.key_down, 'e')
+    step(20, backend.key_up, 'e')
+    step(50, backend.click, 'right', 100)
+    step(20, backend.key_down, 'q')
+    # The key-up is lost; the hold guard samples the key and lets go
+    backend.pressed.discard('q')
+    step(300)
+    step(20, engine.set_aim_button, 'P')
+    step(10, backend.key_down, 'e')
+    step(10, engine.toggle)
+    engine.stop()
+    trace.close()
+    return backend.output
+
+
+def test_trace_records_keys_outputs_and_configuration(tmp_path):
+    path = tmp_path / 'session.patrace'
+    record_session(path)
+    records = read_records(path)
+    assert records[0].device == DEV_META and records[0].meta['config']['aim_button'] == 'o'
+    assert [record.name for record in records if record.device == DEV_KEY][:2] == ['e', 'q']
+    outputs = [(record.name, record.action) for record in records if record.device == DEV_OUTPUT]
+    assert outputs[:2] == [('o', 1), ('o', 0)]
+
+
+def test_replay_reproduces_the_recorded_outputs(tmp_path):
+    path = tmp_path / 'session.patrace'
+    output = record_session(path)
+    assert [(action, key) for _, action, key in output] == [
+        ('press', 'o'), ('release', 'o'),
+        ('press', 'o'), ('release', 'o'),
+        ('press', 'p'), ('release', 'p'),
+    ]
+
+    result = replay(str(path))
+    assert result.matches, result.report()
+    assert result.actual == output
+
+
+def test_replay_arms_deadlines_for_the_recorded_times(tmp_path):
+    path = tmp_path / 'session.patrace'
+    output = record_session(path, TickingClock(1_000_000_000))
+    arms = [record for record in read_records(path) if record.device == DEV_TIMER and record.action == TIMER_ARM]
+    assert {record.name for record in arms} >= {'hold_guard', 'scope_reset'}
+
+    result = replay(str(path))
+    assert result.matches, result.report()
+    assert [entry[1:] for entry in result.actual] == [entry[1:] for entry in output]
+
+
+def test_replay_applies_only_the_recorded_configuration_change(tmp_path):
+    path = tmp_path / 'session.patrace'
+    bindings = [{'name': "Burst", 'triggers': ['E'],
+                 'sequence': [{'at_ms': 0, 'press': AIM_OUTPUT}, {'at_ms': 40, 'release': AIM_OUTPUT}]}]
+    engine, backend, trace, step = start_recording(path, bindings)
+    step(0, engine.set_enabled, True)
+    step(0, backend.key_down, 'e')
+    # Neither call rebinds, so the running sequence must not restart
+    step(10, engine.set_hotkey, 'F9')
+    step(10, engine.set_engine_mode, 'Event')
+    step(30)
+    step(10, backend.key_up, 'e')
+    step(10, engine.set_aim_button, 'P')
+    step(10, backend.key_down, 'e')
+    step(40)
+    engine.stop()
+    trace.close()
+    assert [(action, key) for _, action, key in backend.output] == [
+        ('press', 'o'), ('release', 'o'), ('press', 'p'), ('release', 'p'),
+    ]
+
+    calls = [record.meta.get('call') for record in read_records(path)
+             if record.device == DEV_META and 'config' in record.meta]
+    assert calls == [None, 'change_hotkey', 'change_engine_mode', 'change_aim_button']
+    result = replay(str(path))
+    assert result.matches, result.report()
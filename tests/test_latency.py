@@ -0,0 +1,68 @@
+import pytest
+
+from latency import (BUCKET_COUNT, MAX_TRACKABLE_NS, SUB_BUCKET_HALF, LatencyHistogram, bucket_bounds, bucket_index,
+                     latency_level)
+
+
+@pytest.mark.parametrize('value', [0, 1, 63, 64, 65, 127, 128, 1000, 999_999, 1_000_000, 123_456_789,
+                                   MAX_TRACKABLE_NS])
+def test_every_value_lies_within_its_bucket(value):
+    low, high = bucket_bounds(bucket_index(value))
+    assert low <= value <= high
+    # Within ~3% of the bucket, per SUB_BUCKET_BITS
+    assert high - low <= max(0, value // SUB_BUCKET_HALF)
+
+
+def test_buckets_are_contiguous():
+    previous_high = -1
+    for index in range(BUCKET_COUNT):
+        low, high = bucket_bounds(index)
+        assert low == previous_high + 1
+        assert bucket_index(low) == bucket_index(high) == index
+        previous_high = high
+    assert previous_high == MAX_TRACKABLE_NS
+
+
+def test_out_of_range_values_are_clamped():
+    histogram = LatencyHistogram()
+    histogram.record(-5)
+    histogram.record(MAX_TRACKABLE_NS * 2)
+    assert histogram.counts[0] == 1
+    assert histogram.counts[BUCKET_COUNT - 1] == 1
+    assert histogram.max == MAX_TRACKABLE_NS
+
+
+def test_percentiles_come_from_bucket_midpoints_capped_at_max():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value * 1000)
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(50_000, rel=0.03)
+    assert histogram.percentile(99) == pytest.approx(99_000, rel=0.03)
+    assert histogram.percentile(100) == pytest.approx(100_000, rel=0.03)
+    summary = histogram.summary()
+    assert summary['mean_ns'] == 50_500
+    assert summary['max_ns'] == 100_000
+    assert sum(bucket for _, _, bucket in histogram.to_dict()['buckets']) == 100
+
+
+def test_a_percentile_never_exceeds_the_max():
+    histogram = LatencyHistogram()
+    # Lowest value of the 992..1007 bucket, below its midpoint
+    histogram.record(992)
+    assert bucket_bounds(bucket_index(992)) == (992, 1007)
+    assert histogram.percentile(50) == 992
+
+
+def test_empty_and_reset_histograms_report_zero():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0
+    histogram.record(5000)
+    histogram.reset()
+    assert histogram.summary() == {'count': 0, 'mean_ns': 0, 'p50_ns': 0, 'p90_ns': 0, 'p99_ns': 0, 'max_ns': 0}
+
+
+def test_latency_levels():
+    assert latency_level(1_000_000) == 0
+    assert latency_level(1_000_001) == 1
+    assert latency_level(5_000_001) == 2
@@ -0,0 +1,68 @@
+from bindings import AIM_OUTPUT
+from input_backend import ManualClock, MemoryInputBackend
+from macro_engine import MacroEngine
+
+BINDINGS = [
+    {'name': "Sequence", 'triggers': ['E'],
+     'sequence': [{'at_ms': 0, 'press': 'Q'}, {'at_ms': 15, 'press': AIM_OUTPUT}, {'at_ms': 30, 'release': 'Q'}]},
+    {'name': "Aim", 'triggers': ['R'], 'output': AIM_OUTPUT},
+]
+
+
+def start_engine():
+    clock = ManualClock(1_000_000_000)
+    backend = MemoryInputBackend(clock)
+    engine = MacroEngine(backend, 'O', bindings=BINDINGS)
+    engine.start()
+    engine.set_enabled(True)
+    engine.pump()
+
+    def step(ms, action=None, *args):
+        clock.advance(ms=ms)
+        if action is not None:
+            action(*args)
+        engine.pump()
+    return engine, backend, step
+
+
+def actions(backend, key):
+    return [action for _, action, name in backend.output if name == key]
+
+
+def test_rule_tap_keeps_an_output_the_sequence_holds():
+    engine, backend, step = start_engine()
+    step(0, backend.key_down, 'e')
+    step(15)
+    step(15)
+    assert backend.held == {'o'}
+    step(10, backend.tap, 'r', 20)
+    assert backend.held == {'o'}
+    step(10, backend.key_up, 'e')
+    assert backend.held == set()
+    assert actions(backend, 'o') == ['press', 'release']
+    assert actions(backend, 'q') == ['press', 'release']
+
+
+def test_sequence_keeps_an_output_a_rule_holds():
+    engine, backend, step = start_engine()
+    step(0, backend.key_down, 'r')
+    step(10, backend.key_down, 'e')
+    step(15)
+    step(15)
+    step(10, backend.key_up, 'e')
+    assert backend.held == {'o'}
+    assert engine.aim_held
+    step(10, backend.key_up, 'r')
+    assert backend.held == set()
+    assert actions(backend, 'o') == ['press', 'release']
+
+
+def test_release_all_lets_go_of_shared_outputs_once():
+    engine, backend, step = start_engine()
+    step(0, backend.key_down, 'e')
+    step(15)
+    step(0, backend.key_down, 'r')
+    engine.release_all()
+    assert backend.held == set()
+    assert actions(backend, 'o') == ['press', 'release']
+    assert engine.output_refs == {}
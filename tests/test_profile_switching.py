@@ -0,0 +1,64 @@
+import copy
+import io
+import json
+import threading
+
+from input_backend import MemoryInputBackend, MonotonicClock
+from peak_aim_headless import HeadlessAssistant
+from profiles import FakeForegroundProvider, new_profile
+from settings_store import DEFAULT_SETTINGS, SettingsStore
+
+PROFILES = [
+    new_profile("Desktop"),
+    new_profile("Game A", aim_button='P', macro_hotkey='F9', processes=['GameA.exe']),
+    new_profile("Game B", aim_button='L', processes=['gameb.exe']),
+]
+
+
+def start_assistant(tmp_path):
+    path = tmp_path / 'settings.json'
+    settings = dict(DEFAULT_SETTINGS, profiles=PROFILES, active_profile="Desktop", auto_switch_profiles=True)
+    path.write_text(json.dumps(settings))
+    provider = FakeForegroundProvider()
+    # A real clock, so requests from different threads queue in the order they were made
+    backend = MemoryInputBackend(MonotonicClock())
+    assistant = HeadlessAssistant(backend, SettingsStore(str(path), legacy_path=None), provider, out=io.StringIO())
+    return assistant, provider, path, settings
+
+
+def test_foreground_process_selects_its_profile(tmp_path):
+    assistant, provider, _, _ = start_assistant(tmp_path)
+    provider.set_foreground('GAMEA.EXE')
+    assert assistant.current_profile['name'] == "Game A"
+    assistant.engine.pump()
+    assert assistant.engine.aim_button == 'p'
+    assert assistant.engine.hotkey.text == 'F9'
+
+    provider.set_foreground('explorer.exe')
+    assert assistant.current_profile['name'] == "Game A"
+    provider.set_foreground('gameb.exe')
+    assistant.engine.pump()
+    assert assistant.engine.aim_button == 'l'
+
+
+def test_a_switch_waits_for_a_reload_in_progress(tmp_path):
+    assistant, provider, path, settings = start_assistant(tmp_path)
+    engine = assistant.engine
+    set_aim_button = engine.set_aim_button
+    switcher = threading.Thread(target=provider.set_foreground, args=('gamea.exe',))
+
+    def set_aim_button_during_a_switch(button):
+        # The game comes to the foreground while the reload is half applied
+        switcher.start()
+        switcher.join(0.2)
+        set_aim_button(button)
+    engine.set_aim_button = set_aim_button_during_a_switch
+
+    edited = copy.deepcopy(settings)
+    edited['profiles'][0]['aim_button'] = 'K'
+    path.write_text(json.dumps(edited))
+    assistant.reload_settings()
+    switcher.join()
+    engine.pump()
+    assert assistant.current_profile['name'] == "Game A"
+    assert engine.aim_button == 'p'
@@ -0,0 +1,51 @@
+from scope import HOLD, IGNORED, PRESSED, TAP, ScopeTracker
+
+MS = 1_000_000
+S = 1_000_000_000
+
+
+def test_short_press_toggles_the_scope():
+    scope = ScopeTracker(tap_threshold_ms=300)
+    assert scope.press(0) == PRESSED
+    assert scope.active
+    assert scope.release(100 * MS) == TAP
+    assert scope.toggled and scope.active
+    scope.press(1 * S)
+    assert scope.release(1 * S + 50 * MS) == TAP
+    assert not scope.active
+
+
+def test_long_press_is_a_hold_and_leaves_the_toggle_alone():
+    scope = ScopeTracker(tap_threshold_ms=300)
+    scope.press(0)
+    assert scope.release(300 * MS) == HOLD
+    assert not scope.toggled and not scope.active
+
+
+def test_repeated_press_and_stray_release_are_ignored():
+    scope = ScopeTracker()
+    assert scope.release(0) == IGNORED
+    scope.press(0)
+    assert scope.press(10 * MS) == IGNORED
+    assert scope.release(20 * MS) == TAP
+
+
+def test_open_scope_resets_after_the_timeout():
+    scope = ScopeTracker(tap_threshold_ms=300, reset_timeout_s=30)
+    assert scope.reset_deadline() is None
+    scope.press(0)
+    scope.release(100 * MS)
+    assert scope.reset_deadline() == 100 * MS + 30 * S
+    assert not scope.expire(100 * MS + 30 * S - 1)
+    assert scope.expire(100 * MS + 30 * S)
+    assert not scope.active
+    assert scope.reset_deadline() is None
+
+
+def test_reset_closes_a_held_and_toggled_scope():
+    scope = ScopeTracker()
+    scope.press(0)
+    scope.release(10 * MS)
+    scope.press(20 * MS)
+    scope.reset()
+    assert not scope.active
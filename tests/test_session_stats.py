@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from session_stats import PEEKS, SCOPE_TOGGLES, SessionStats, StatsWriter, all_time_totals
+
+
+def rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT peeks, scope_toggles, holds, hold_max_ms FROM windows").fetchall()
+    finally:
+        connection.close()
+
+
+def test_ring_size_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        SessionStats(ring_size=100)
+
+
+def test_a_lapped_hold_ring_counts_the_overwritten_samples_as_lost():
+    stats = SessionStats(ring_size=4)
+    for value in range(1, 7):
+        stats.hold(value * 1_000_000)
+    stats.aggregate()
+    assert stats.lost == 2
+    assert stats.hold_histogram.count == 4
+    assert stats.hold_histogram.max == 6_000_000
+    assert "Hold samples lost: 2" in stats.summary()
+
+
+def test_flush_writes_only_windows_with_activity(tmp_path):
+    stats = SessionStats()
+    writer = StatsWriter(stats, str(tmp_path / 'stats.sqlite3'))
+    connection = writer.connect()
+    try:
+        assert not writer.flush(connection)
+        stats.count(PEEKS)
+        stats.count(PEEKS)
+        stats.hold(40_000_000)
+        assert writer.flush(connection)
+        stats.count(SCOPE_TOGGLES)
+        assert writer.flush(connection)
+        assert not writer.flush(connection)
+    finally:
+        connection.close()
+    assert writer.rows == 2
+    assert rows(writer.path) == [(2, 0, 1, pytest.approx(40, rel=0.03)), (0, 1, 0, 0.0)]
+
+
+def test_stop_writes_the_partial_window_and_totals_add_up(tmp_path):
+    path = str(tmp_path / 'stats' / 'stats.sqlite3')
+    assert all_time_totals(path) is None
+    stats = SessionStats()
+    writer = StatsWriter(stats, path, window=60.0)
+    writer.start()
+    stats.count(PEEKS)
+    stats.hold(10_000_000)
+    writer.stop()
+    assert not writer.thread.is_alive()
+    assert writer.last_error is None
+    assert rows(path) == [(1, 0, 1, pytest.approx(10, rel=0.03))]
+
+    writer = StatsWriter(SessionStats(), path)
+    writer.start()
+    writer.stats.count(PEEKS)
+    writer.stop()
+    totals = all_time_totals(path)
+    assert totals['peeks'] == 2
+    assert totals['holds'] == 1
+    assert totals['scope_toggles'] == 0
+
+
+def test_an_unwritable_path_is_reported_not_raised(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    writer = StatsWriter(SessionStats(), str(blocker / 'stats.sqlite3'))
+    writer.start()
+    writer.stop()
+    assert writer.last_error is not None
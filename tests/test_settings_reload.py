@@ -0,0 +1,142 @@
+import io
+import json
+import threading
+
+import pytest
+
+from input_backend import MemoryInputBackend
+from peak_aim_headless import HeadlessAssistant
+from profiles import FakeForegroundProvider
+from settings_store import DEFAULT_SETTINGS, SettingsStore
+import settings_watcher
+from settings_watcher import SettingsWatcher
+
+
+def write_settings(path, **changes):
+    settings = dict(DEFAULT_SETTINGS, **changes)
+    path.write_text(json.dumps(settings))
+    return settings
+
+
+def test_reload_reports_outside_edits_only(tmp_path):
+    path = tmp_path / 'settings.json'
+    write_settings(path)
+    store = SettingsStore(str(path), legacy_path=None)
+    store.load()
+    assert store.reload() is None
+    write_settings(path, overlay_x=10)
+    previous, settings = store.reload()
+    assert previous['overlay_x'] == DEFAULT_SETTINGS['overlay_x']
+    assert settings['overlay_x'] == 10
+
+
+@pytest.mark.parametrize('text', ['{not json', '[]', '{"schema_version": "3"}', '{"schema_version": 3, "profiles": [7]}'])
+def test_reload_of_a_malformed_file_raises_value_error_and_keeps_it(tmp_path, text):
+    path = tmp_path / 'settings.json'
+    write_settings(path)
+    store = SettingsStore(str(path), legacy_path=None)
+    store.load()
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        store.reload()
+    assert path.read_text() == text
+
+
+def test_headless_reload_survives_a_malformed_file(tmp_path):
+    path = tmp_path / 'settings.json'
+    write_settings(path)
+    out = io.StringIO()
+    assistant = HeadlessAssistant(MemoryInputBackend(), SettingsStore(str(path), legacy_path=None),
+                                  FakeForegroundProvider(), out=out)
+    path.write_text('{"schema_version": null}')
+    assistant.reload_settings()
+    assert "Ignored unreadable settings.json" in out.getvalue()
+
+    write_settings(path, engine_mode='Polling')
+    assistant.reload_settings()
+    assert assistant.engine_mode == 'Polling'
+
+
+@pytest.mark.parametrize('polling', [False, True])
+def test_watcher_notices_edits_and_outlives_a_failing_callback(tmp_path, monkeypatch, polling):
+    if polling:
+        monkeypatch.setattr(settings_watcher, 'open_inotify', lambda directory: None)
+    path = tmp_path / 'settings.json'
+    write_settings(path)
+    changed = threading.Event()
+    calls = []
+
+    def on_change():
+        calls.append(path.read_text())
+        changed.set()
+        if len(calls) == 1:
+            raise ValueError("first reload fails")
+
+    watcher = SettingsWatcher(str(path), on_change, interval=0.02)
+    watcher.start()
+    try:
+        for overlay_x in (1, 20):
+            changed.clear()
+            write_settings(path, overlay_x=overlay_x)
+            assert changed.wait(5.0)
+    finally:
+        watcher.stop()
+    assert json.loads(calls[-1])['overlay_x'] == 20
+
+
+class FakeChangeNotification:
+    """ChangeNotification stand-in: signal() plays the directory change"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = False
+        self.stopped = False
+        self.closed = False
+
+    def signal(self):
+        with self.condition:
+            self.pending = True
+            self.condition.notify_all()
+
+    def wait(self, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending or self.stopped, timeout)
+            if self.stopped:
+                return settings_watcher.STOPPED
+            return settings_watcher.CHANGED if self.pending else None
+
+    def rearm(self):
+        with self.condition:
+            self.pending = False
+
+    def wake(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def close(self):
+        self.closed = True
+
+
+def test_change_notification_reloads_only_when_the_file_changed(tmp_path, monkeypatch):
+    notification = FakeChangeNotification()
+    monkeypatch.setattr(settings_watcher, 'open_inotify', lambda directory: None)
+    monkeypatch.setattr(settings_watcher, 'open_change_notification', lambda directory: notification)
+    path = tmp_path / 'settings.json'
+    write_settings(path)
+    changed = threading.Event()
+    watcher = SettingsWatcher(str(path), changed.set)
+    watcher.start()
+    try:
+        assert watcher.mode == 'notification'
+        # Another file in the directory changed
+        (tmp_path / 'other.json').write_text('{}')
+        notification.signal()
+        assert not changed.wait(0.5)
+        write_settings(path, overlay_x=30)
+        notification.signal()
+        assert changed.wait(5.0)
+    finally:
+        watcher.stop()
+    assert watcher.changes == 1
+    assert notification.closed
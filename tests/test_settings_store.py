@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from bindings import DEFAULT_BINDINGS
+from profiles import DEFAULT_PROFILE
+from settings_store import DEFAULT_SETTINGS, SCHEMA_VERSION, SettingsStore, migrate
+
+V1_SETTINGS = {
+    'macro_hotkey': 'F9',
+    'aim_button': 'P',
+    'overlay_x': 100,
+    'overlay_y': 200,
+    'overlay_bg': False,
+    'overlay_indicator': True,
+    'start_minimized': True,
+    'engine_mode': 'Polling',
+}
+
+
+def test_unversioned_v1_settings_migrate_to_one_profile():
+    settings = migrate(dict(V1_SETTINGS))
+    assert settings['schema_version'] == SCHEMA_VERSION == 3
+    assert 'macro_hotkey' not in settings and 'aim_button' not in settings and 'bindings' not in settings
+    [profile] = settings['profiles']
+    assert profile['name'] == DEFAULT_PROFILE['name'] == settings['active_profile']
+    assert profile['macro_hotkey'] == 'F9'
+    assert profile['aim_button'] == 'P'
+    assert profile['bindings'] == DEFAULT_BINDINGS
+    assert settings['engine_mode'] == 'Polling'
+
+
+def test_v2_bindings_move_into_the_profile():
+    rules = [{'name': "Lean", 'triggers': ['Z'], 'output': 'Aim Button'}]
+    settings = migrate({'schema_version': 2, 'aim_button': 'O', 'bindings': rules})
+    assert settings['profiles'][0]['bindings'] == rules
+
+
+def test_load_migrates_a_legacy_file_and_writes_it_to_the_new_path(tmp_path):
+    legacy = tmp_path / 'legacy.json'
+    legacy.write_text(json.dumps(V1_SETTINGS))
+    store = SettingsStore(str(tmp_path / 'config' / 'settings.json'), legacy_path=str(legacy))
+    settings, first_run = store.load()
+    store.flush()
+    assert not first_run
+    assert settings['overlay_x'] == 100
+    assert settings['record_stats'] == DEFAULT_SETTINGS['record_stats']
+    saved = json.loads((tmp_path / 'config' / 'settings.json').read_text())
+    assert saved['schema_version'] == SCHEMA_VERSION
+    assert saved['profiles'][0]['aim_button'] == 'P'
+
+
+def test_unreadable_settings_are_kept_aside(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{not json')
+    store = SettingsStore(str(path), legacy_path=None)
+    settings, first_run = store.load()
+    assert first_run
+    assert settings == DEFAULT_SETTINGS
+    assert [entry.name.startswith('settings.json.corrupt-') for entry in tmp_path.iterdir()] == [True]
+
+
+@pytest.mark.parametrize('stored', [
+    {'schema_version': None},
+    {'schema_version': '3'},
+    {'schema_version': 3, 'profiles': {'name': 'GameLoop'}},
+    {'schema_version': 3, 'profiles': ['GameLoop']},
+    {'schema_version': 3, 'profiles': [{'name': 'GameLoop', 'aim_button': 5}]},
+    {'schema_version': 3, 'profiles': [{'name': 'GameLoop', 'scope_reset_seconds': True}]},
+])
+def test_malformed_settings_are_kept_aside(tmp_path, stored):
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps(stored))
+    store = SettingsStore(str(path), legacy_path=None)
+    settings, first_run = store.load()
+    assert first_run
+    assert settings == DEFAULT_SETTINGS
+    assert not path.exists()
@@ -0,0 +1,42 @@
+import threading
+
+from status_bus import StatusBus
+
+
+def test_only_changes_notify():
+    notified = []
+    bus = StatusBus((False, False), lambda: notified.append(1))
+    bus.publish((False, False))
+    assert notified == []
+    bus.publish((True, False))
+    assert len(notified) == 1
+    assert bus.take() == (True, False)
+    bus.publish((True, False))
+    assert len(notified) == 1
+
+
+def test_changes_before_take_are_coalesced_into_the_latest_state():
+    notified = []
+    bus = StatusBus((False, False), lambda: notified.append(1))
+    bus.publish((True, False))
+    bus.publish((True, True))
+    bus.publish((False, True))
+    assert len(notified) == 1
+    assert bus.published == 1
+    assert bus.coalesced == 2
+    assert bus.take() == (False, True)
+    bus.publish((False, False))
+    assert len(notified) == 2
+
+
+def test_publishing_from_several_threads_never_loses_the_last_state():
+    bus = StatusBus(0)
+    threads = [threading.Thread(target=lambda start=start: [bus.publish(value) for value in range(start, start + 500)])
+               for start in (1, 1001, 2001)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    bus.publish(-1)
+    assert bus.take() == -1
+    assert bus.published == 1
@@ -0,0 +1,66 @@
+"""Timed press/release sequences run by the engine thread."""
+import sys
+
+STEP_PRESS = 1
+STEP_RELEASE = 0
+
+# Wake this long before a timeline step and spin for the rest; covers the
+# wakeup latency of a 1 ms system timer
+SPIN_MARGIN_NS = 2_000_000
+
+
+class TimelineRun:
+    """One in-flight sequence of a binding rule.
+
+    steps are (offset_ns, action, key) sorted by offset; each is due at
+    start_ns + offset_ns. pressed lists keys this run holds, in press order,
+    so a cancelled run can let go of exactly those keys.
+    """
+
+    def __init__(self, rule, steps, start_ns):
+        self.rule = rule
+        self.steps = steps
+        self.start_ns = start_ns
+        self.next_step = 0
+        self.pressed = []
+
+    @property
+    def finished(self):
+        return self.next_step >= len(self.steps)
+
+    def next_due(self):
+        """Absolute time of the next step, or None when every step has run"""
+        if self.finished:
+            return None
+        return self.start_ns + self.steps[self.next_step][0]
+
+
+class TimerResolution:
+    """Asks Windows for a 1 ms system timer while timelines are running.
+
+    The default 15.6 ms tick would make every sleep before a step overshoot
+    by up to a tick; other platforms already sleep with sub-ms accuracy.
+    """
+
+    def __init__(self):
+        self.raised = False
+
+    def raise_(self):
+        if self.raised or sys.platform != 'win32':
+            return
+        try:
+            import ctypes
+            ctypes.windll.winmm.timeBeginPeriod(1)
+            self.raised = True
+        except (OSError, AttributeError):
+            pass
+
+    def restore(self):
+        if not self.raised:
+            return
+        try:
+            import ctypes
+            ctypes.windll.winmm.timeEndPeriod(1)
+        except (OSError, AttributeError):
+            pass
+        self.raised = False